@@ -311,6 +311,7 @@ def api_lesson_search():
         from slide_module_simplified import LessonManager
         
         query = request.args.get('q', '').strip()
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
         
         if not query:
             return jsonify({
@@ -319,7 +320,7 @@ def api_lesson_search():
             }), 400
         
         lesson_manager = LessonManager()
-        results = lesson_manager.search_lessons(query)
+        results = lesson_manager.search_lessons(query, limit=limit)
         
         return jsonify({
             'success': True,
@@ -571,6 +572,10 @@ def manage_token_settings():
             
             db.session.commit()
             
+            # Apply the new limits to LLM prompts right away
+            from slide_module_simplified import get_context_window
+            get_context_window().apply_settings(settings)
+            
             # Get updated token usage statistics
             stats = get_token_usage_stats()
             
@@ -593,16 +598,17 @@ def get_token_usage_stats():
         from database import db
         from models import TokenSettings
         from slide_module_simplified import ConversationManager, get_system_prompt_manager
+        from slide_module_simplified.context_window import count_tokens
         
         # Get conversation manager instance
         conv_manager = ConversationManager()
         
         # Count tokens in conversation history
-        conversation_tokens = sum(len(msg['content']) // 4 for msg in conv_manager.conversation_history)
+        conversation_tokens = sum(count_tokens(msg['content']) for msg in conv_manager.conversation_history)
         
         # Count tokens in system prompt
         prompt_manager = get_system_prompt_manager()
-        system_prompt_tokens = len(prompt_manager.base_prompt) // 4 if prompt_manager.base_prompt else 0
+        system_prompt_tokens = count_tokens(prompt_manager.base_prompt) if prompt_manager.base_prompt else 0
         
         # Calculate total tokens
         total_tokens = conversation_tokens + system_prompt_tokens
@@ -6,16 +6,22 @@ import base64
 import tempfile
 import json
 import time
+import atexit
+import queue
+import threading
 import requests
 
 from flask_cors import CORS
 from config import Config
 from tts import TTSFactory, TTSProvider
-from tts.text_chunker import SmartTextChunker
+from tts.text_chunker import SmartTextChunker, IncrementalTextChunker
+from tts.pipeline import pipelined_stream
+from tts.cancellation import CancellationToken, cancellable_stream, cancellation_scope, cancellation_stats
 # Import core components and helpers from the simplified slide module
 from slide_module_simplified import (
     setup_slide_system,
     UserAuthManager, get_user_auth_manager, get_slide_content, LessonManager, LessonCoachingManager,
+    get_coaching_registry, get_prompt_cache_stats, get_context_window, get_conversation_summarizer, get_answer_cache,
     get_slide_controller, get_voice_interaction,
     DATABASE_AVAILABLE # Import DATABASE_AVAILABLE as it's used in app.py
 )
@@ -41,9 +47,24 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 # Initialize database
 init_db(app)
 
+# Bound LLM prompt history by the admin's token settings, re-read
+# periodically so edits saved through another worker apply here too
+def load_token_settings():
+    with app.app_context():
+        return TokenSettings.query.first()
+
+get_context_window().watch_settings(load_token_settings)
+
 # Initialize the guidance-based slide system with database enabled
 setup_slide_system(app, enable_database=True)
 
+from slide_module_simplified.database import get_connection_manager
+
+@app.teardown_request
+def close_db_connection(exc):
+    """Close this request thread's SQLite connection (the dev server starts a thread per request)"""
+    get_connection_manager().close_thread_connection()
+
 # Register admin interface
 try:
     from admin import init_admin_routes
@@ -75,14 +96,59 @@ slide_content = get_slide_content()
 
 
 
-# Dictionary to store lesson managers by lesson ID
-lesson_managers = {}
+# Coaching managers are reused per session (user or client session + lesson)
+coaching_registry = get_coaching_registry()
+
+def get_lesson_manager(lesson_id: str, user_id: str = None, session_id: str = None) -> LessonCoachingManager:
+    """Get or create the LessonCoachingManager for a session (per-lesson shared without one)"""
+    return coaching_registry.get(lesson_id, user_id=user_id, session_id=session_id)
+
+def get_chat_coaching_manager(lesson_id: str, data) -> tuple:
+    """
+    Coaching manager for a chat request
+
+    Authenticated users and clients that send a session_id keep their
+    manager (conversation state, profile) across turns, with the history
+    held server-side. Anonymous requests get a fresh manager, so no state
+    is shared between strangers.
+
+    Returns:
+        (manager, registry key args or None)
+    """
+    user_id = get_authenticated_user_id(request)
+    session_id = (data or {}).get('session_id')
+    if user_id or session_id:
+        manager = coaching_registry.get(lesson_id, user_id=user_id, session_id=session_id)
+        owner, _ = coaching_registry.make_key(lesson_id, user_id, session_id)
+        manager.attach_conversation(f"{owner}/{lesson_id}")
+        return manager, (lesson_id, user_id, session_id)
+    return coaching_registry.create_unregistered(lesson_id), None
+
+def sync_chat_history(manager, user_input: str, data, conversation_history):
+    """
+    Apply the client's history delta before a chat turn
+
+    Clients send the new message plus the seq of the last answer they
+    received; a full conversation_history is only needed with resync=true
+    (or from clients that predate seq numbers).
 
-def get_lesson_manager(lesson_id: str) -> LessonCoachingManager:
-    """Get or create a LessonCoachingManager instance for a lesson"""
-    if lesson_id not in lesson_managers:
-        lesson_managers[lesson_id] = LessonCoachingManager(lesson_id)
-    return lesson_managers[lesson_id]
+    Returns:
+        None when in sync, else a 409 response asking the client to resync
+    """
+    try:
+        seq = data.get('seq')
+        seq = int(seq) if seq not in (None, '') else None
+    except (TypeError, ValueError):
+        seq = None
+    resync = str(data.get('resync', '')).lower() in ('1', 'true')
+    server_seq = manager.sync_history(user_input, seq, conversation_history, resync=resync)
+    if server_seq is None:
+        return None
+    return jsonify({
+        'error': 'Conversation history out of sync',
+        'resync_required': True,
+        'seq': server_seq
+    }), 409
 
 def initialize_tts_provider():
     """
@@ -90,7 +156,12 @@ def initialize_tts_provider():
     """
     global tts_provider
     
-    # Clear any existing provider
+    # Close and clear any existing provider (releases pooled connections)
+    if tts_provider is not None:
+        try:
+            tts_provider.close()
+        except Exception as close_error:
+            print(f"   ⚠️  Failed to close previous provider: {close_error}")
     tts_provider = None
     
     print("🔧 Initializing TTS provider...")
@@ -189,6 +260,13 @@ def initialize_tts_provider():
 if not initialize_tts_provider():
     print("⚠️  TTS provider initialization failed, some features may not work")
 
+def shutdown_tts_provider():
+    """Close the TTS provider's pooled connections on process exit"""
+    if tts_provider is not None:
+        tts_provider.close()
+
+atexit.register(shutdown_tts_provider)
+
 # Create demo user for testing
 try:
     auth_manager = get_user_auth_manager()
@@ -395,7 +473,7 @@ def stream_synthesize():
         print("📤 Step 6: Creating streaming response...")
         
         response = Response(
-            generate_audio_stream(),
+            cancellable_stream(generate_audio_stream, '/stream', len(text)),
             mimetype='audio/mpeg',
             direct_passthrough=True
         )
@@ -494,16 +572,37 @@ def stream_chunked_synthesize():
             # Frontend sends 0.5-2.0, we need to convert to -0.5 to 1.0
             speed = str(speed_float - 1.0)  # 1.0 -> 0, 1.5 -> 0.5, 0.5 -> -0.5
         
+        # Pipelined mode prefetches the next k chunks concurrently (in-order output)
+        pipelined = data.get('pipelined', Config.TTS_PIPELINE_ENABLED) and len(text_chunks) > 1
+        lookahead = max(0, int(data.get('lookahead', Config.TTS_PIPELINE_LOOKAHEAD)))
+        
+        # Pass emotional_parameters from the request if available
+        emotional_parameters = data.get('emotional_parameters', {})
+        
         def generate_chunked():
             """Generator that yields audio from all chunks sequentially"""
             try:
+                if pipelined:
+                    print(f"🚀 Pipelined synthesis: {len(text_chunks)} chunks, lookahead {lookahead}")
+                    for audio_chunk in pipelined_stream(
+                        tts_provider,
+                        text_chunks,
+                        voice_id=voice_id,  # Use consistent voice
+                        lookahead=lookahead,
+                        max_buffer_bytes=Config.TTS_PIPELINE_MAX_BUFFER_KB * 1024,
+                        speed=speed,
+                        temperature=temperature,
+                        pitch=pitch,
+                        emotional_parameters=emotional_parameters
+                    ):
+                        yield audio_chunk
+                    print(f"✅ Completed {len(text_chunks)} pipelined chunks")
+                    return
+                
                 for i, chunk in enumerate(text_chunks):
                     print(f"🎵 Processing chunk {i+1}/{len(text_chunks)}: '{chunk.text[:30]}...'")
                     
                     # Generate audio for this chunk
-                    # Pass emotional_parameters from the request if available
-                    emotional_parameters = data.get('emotional_parameters', {})
-                    
                     chunk_generator = tts_provider.stream_sync_generator(
                         text=chunk.text,
                         voice_id=voice_id,  # Use consistent voice
@@ -514,11 +613,15 @@ def stream_chunked_synthesize():
                     )
                     
                     # Yield all audio data from this chunk
-                    for audio_chunk in chunk_generator:
-                        if audio_chunk:
-                            # Add logging for chunk size
-                            print(f"      -> Yielding audio chunk: {len(audio_chunk)} bytes")
-                            yield audio_chunk
+                    try:
+                        for audio_chunk in chunk_generator:
+                            if audio_chunk:
+                                # Add logging for chunk size
+                                print(f"      -> Yielding audio chunk: {len(audio_chunk)} bytes")
+                                yield audio_chunk
+                    finally:
+                        # Release the upstream connection even if the client disconnects
+                        chunk_generator.close()
                     
                     print(f"✅ Completed chunk {i+1}/{len(text_chunks)}")
                     
@@ -528,7 +631,7 @@ def stream_chunked_synthesize():
         
         # Return streaming response with proper headers
         return Response(
-            generate_chunked(),
+            cancellable_stream(generate_chunked, '/stream-chunked', sum(len(chunk.text) for chunk in text_chunks)),
             mimetype='audio/mpeg',
             headers={
                 'Content-Type': 'audio/mpeg',
@@ -539,6 +642,7 @@ def stream_chunked_synthesize():
                 'Connection': 'keep-alive',
                 'Keep-Alive': 'timeout=60',
                 'X-Voice-ID': voice_id,  # Add voice ID to headers for tracking
+                'X-TTS-Pipelined': str(bool(pipelined)).lower(),
                 'Accept-Ranges': 'none' # Explicitly disable range requests
             }
         )
@@ -547,6 +651,93 @@ def stream_chunked_synthesize():
         print(f"❌ Error in stream_chunked_synthesize: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/stream-timestamps', methods=['POST', 'OPTIONS'])
+def stream_timestamps_synthesize():
+    """
+    Streaming TTS with word timings for visualizer/caption sync
+
+    Returns NDJSON, one JSON object per line:
+        {"type": "audio", "data": "<base64 mp3>"}
+        {"type": "timestamps", "words": [{"word": "...", "start": 0, "end": 240}]}
+        {"type": "error", "message": "..."}
+        {"type": "done", "chunks": 12, "bytes": 48000, "words": 9}
+    Providers without word timings stream audio frames only.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    if not tts_provider:
+        print("❌ ERROR: TTS provider not initialized for /stream-timestamps")
+        return jsonify({'error': 'TTS provider not initialized'}), 500
+
+    data = request.get_json(silent=True) or {}
+    text = str(data.get('text', '')).strip()
+    voice_id = str(data.get('voice_id', '')).strip()
+    speed = str(data.get('speed', '1.0')).strip()
+    temperature = str(data.get('temperature', '0.25')).strip()
+    pitch = str(data.get('pitch', '1.0')).strip()
+
+    if not text:
+        return jsonify({'error': 'Text is required and cannot be empty'}), 400
+    if not voice_id:
+        voices = tts_provider.get_voices()
+        if not voices:
+            return jsonify({'error': 'Voice ID is required and no default available'}), 400
+        voice_id = voices[0]['id']
+
+    is_valid, error_msg = tts_provider.validate_text(text)
+    if not is_valid:
+        return jsonify({'error': f'Text validation failed: {error_msg}'}), 400
+
+    try:
+        if Config.TTS_PROVIDER == "unrealspeech":
+            # Convert frontend speed (0.5-2.0) to UnrealSpeech range (-0.5 to 1.0)
+            speed = str(float(speed) - 1.0)
+    except ValueError:
+        speed = "0.0" if Config.TTS_PROVIDER == "unrealspeech" else "1.0"
+
+    provider = tts_provider
+
+    def generate_frames():
+        start_time = time.time()
+        chunk_count = 0
+        total_bytes = 0
+        word_count = 0
+        try:
+            for frame in provider.stream_with_timestamps_sync(
+                text=text,
+                voice_id=voice_id,
+                speed=speed,
+                temperature=temperature,
+                pitch=pitch
+            ):
+                if frame['type'] == 'timestamps':
+                    word_count += len(frame['words'])
+                    yield json.dumps(frame) + '\n'
+                elif frame['data']:
+                    if chunk_count == 0:
+                        print(f"⚡ First timed audio chunk in {(time.time() - start_time) * 1000:.0f}ms")
+                    chunk_count += 1
+                    total_bytes += len(frame['data'])
+                    yield json.dumps({'type': 'audio', 'data': base64.b64encode(frame['data']).decode('ascii')}) + '\n'
+
+            print(f"✅ Timed stream complete: {chunk_count} chunks, {total_bytes} bytes, {word_count} words")
+            yield json.dumps({'type': 'done', 'chunks': chunk_count, 'bytes': total_bytes, 'words': word_count}) + '\n'
+        except Exception as e:
+            print(f"❌ Timed streaming error: {e}")
+            yield json.dumps({'type': 'error', 'message': str(e)}) + '\n'
+
+    return Response(
+        cancellable_stream(generate_frames, '/stream-timestamps', len(text)),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache, no-transform',
+            'X-Accel-Buffering': 'no',
+            'X-Voice-ID': voice_id,
+            'X-TTS-Timestamps': str(provider.supports_timestamps).lower()
+        }
+    )
+
 @app.route('/debug-current-audio', methods=['POST', 'OPTIONS'])
 def debug_current_audio():
     """Debug endpoint for TTS testing"""
@@ -815,8 +1006,8 @@ def slide_changed():
         new_slide = data.get('slide_number', 0)
         lesson_id = data.get('lesson_id', 'ai-ux-design')
         
-        # Update lesson manager with new slide
-        lesson_manager = get_lesson_manager(lesson_id)
+        # Update the session's lesson manager with new slide
+        lesson_manager = get_lesson_manager(lesson_id, get_authenticated_user_id(request), data.get('session_id'))
         lesson_manager.coaching_context.slide_number = new_slide
         
         return jsonify({
@@ -1261,7 +1452,11 @@ def debug_tts():
             'provider_type': type(tts_provider).__name__,
             'voice_count': len(voices) if voices else 0,
             'api_key_set': bool(Config.UNREALSPEECH_API_KEY),
-            'voices_sample': voices[:3] if voices else []
+            'voices_sample': voices[:3] if voices else [],
+            'pool_stats': tts_provider.get_pool_stats(),
+            'cache_stats': tts_provider.get_cache_stats() if hasattr(tts_provider, 'get_cache_stats') else None,
+            'hedge_stats': tts_provider.get_hedge_stats() if hasattr(tts_provider, 'get_hedge_stats') else None,
+            'cancellation_stats': cancellation_stats.get_stats()
         })
     except Exception as e:
         return jsonify({
@@ -1271,6 +1466,25 @@ def debug_tts():
         }), 500
 
 
+@app.route('/tts/cache', methods=['GET', 'DELETE'])
+def tts_cache():
+    """Get audio cache statistics (GET) or clear the cache (DELETE)"""
+    try:
+        if not tts_provider or not hasattr(tts_provider, 'get_cache_stats'):
+            return jsonify({'status': 'error', 'message': 'TTS audio cache not enabled'}), 404
+        
+        if request.method == 'DELETE':
+            tts_provider.cache.clear()
+            print("🧹 TTS audio cache cleared")
+        
+        return jsonify({
+            'status': 'success',
+            'cache_stats': tts_provider.get_cache_stats()
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 # NEW DEBUGGING ENDPOINTS FOR SYSTEM PROMPT & KNOWLEDGE BASE
 
 @app.route('/knowledge-base/status', methods=['GET'])
@@ -1544,34 +1758,35 @@ def lesson_chat(lesson_id):
     """
     try:
         # Handle both form data and JSON data
+        request_data = request.json if request.is_json else request.form
         if request.is_json:
             user_input = request.json.get('text', '')
             current_slide = request.json.get('current_slide', 0)
             slide_title = request.json.get('slide_title', '')
-            conversation_history = request.json.get('conversation_history', [])  # NEW: Get conversation history
+            conversation_history = request.json.get('conversation_history')  # Only sent on resync
         else:
             user_input = request.form.get('text', '')
             current_slide = int(request.form.get('current_slide', 0))
             slide_title = request.form.get('slide_title', '')
             # For form data, try to parse conversation history from JSON string
             try:
-                conversation_history = json.loads(request.form.get('conversation_history', '[]'))
-            except:
-                conversation_history = []
+                conversation_history = json.loads(request.form['conversation_history'])
+            except (KeyError, ValueError):
+                conversation_history = None
 
         if not user_input:
             return jsonify({'error': 'No input provided'}), 400
 
         print(f"🎓 Lesson chat [{lesson_id}]: '{user_input[:50]}...' | Slide {current_slide + 1}")
-        print(f"📚 Conversation history: {len(conversation_history)} messages")
+        if conversation_history:
+            print(f"📚 Conversation history: {len(conversation_history)} messages")
 
         # 👋 SPECIAL HANDLING: Check for greeting trigger
         if user_input == "START_AI_COACH_GREETING" or request.json.get('is_greeting_trigger'):
             print("👋 Handling lesson greeting trigger")
             
             try:
-                from slide_module_simplified import LessonCoachingManager
-                lesson_manager = LessonCoachingManager(lesson_id)
+                lesson_manager, _ = get_chat_coaching_manager(lesson_id, request_data)
                 
                 # Generate a personalized greeting for the lesson
                 greeting_response = lesson_manager.generate_lesson_greeting(
@@ -1607,18 +1822,17 @@ def lesson_chat(lesson_id):
                 })
 
         try:
-            # Use the new LessonCoachingManager
-            from slide_module_simplified import LessonCoachingManager
+            # Reuse this session's lesson manager
+            lesson_manager, registry_key = get_chat_coaching_manager(lesson_id, request_data)
+            out_of_sync = sync_chat_history(lesson_manager, user_input, request_data, conversation_history)
+            if out_of_sync:
+                return out_of_sync
             
-            # Get or create a lesson manager for this lesson
-            lesson_manager = LessonCoachingManager(lesson_id)
-            
-            # Process user input through lesson manager with conversation history
-            result = lesson_manager.process_user_input(
-                user_input, 
-                current_slide,
-                conversation_history=conversation_history  # NEW: Pass conversation history
-            )
+            # Process user input against the session's (now synced) history
+            result = lesson_manager.process_user_input(user_input, current_slide)
+            seq = lesson_manager.persist_turn(user_input, result['coaching_response'])
+            if registry_key:
+                coaching_registry.touch(*registry_key)
             
             return jsonify({
                 'response': result['coaching_response'],
@@ -1629,7 +1843,8 @@ def lesson_chat(lesson_id):
                 'current_slide': current_slide,
                 'slide_title': slide_title,
                 'slide_aware': True,
-                'coaching_used': True
+                'coaching_used': True,
+                'seq': seq
             })
             
         except Exception as e:
@@ -1660,6 +1875,215 @@ def lesson_chat(lesson_id):
             'lesson_id': lesson_id
         }), 500
 
+@app.route('/lesson/<lesson_id>/chat-stream', methods=['POST', 'OPTIONS'])
+def lesson_chat_stream(lesson_id):
+    """
+    🎓🎙️ LESSON CHAT + SPEAK: One round trip per turn
+
+    Streams LLM tokens from the LessonCoachingManager into the TTS provider
+    sentence by sentence, returning a single NDJSON stream that multiplexes
+    text deltas and base64 audio so playback starts while the model is
+    still generating. Events, one JSON object per line:
+        {"type": "text", "delta": "..."}
+        {"type": "audio", "chunk": 0, "data": "<base64 mp3>"}
+        {"type": "timestamps", "chunk": 0, "words": [{"word": "...", "start": 0, "end": 240}]}
+        {"type": "chunk_end", "chunk": 0, "text": "..."}
+        {"type": "error", "message": "..."}
+        {"type": "done", "response": "...", "chunks": 2, "seq": 7}
+
+    Clients send the new message and the seq of the last answer they saw;
+    a 409 with resync_required asks them to resend with their full
+    conversation_history and resync=true.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    data = request.get_json(silent=True) or {}
+    user_input = str(data.get('text', '')).strip()
+    conversation_history = data.get('conversation_history')
+
+    if not user_input:
+        return jsonify({'error': 'No input provided'}), 400
+    try:
+        current_slide = int(data.get('current_slide', 0) or 0)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'current_slide must be an integer'}), 400
+    if current_slide < 0:
+        return jsonify({'error': 'current_slide must not be negative'}), 400
+    if not tts_provider:
+        print("❌ ERROR: TTS provider not initialized for /chat-stream")
+        return jsonify({'error': 'TTS provider not initialized'}), 500
+
+    # Voice settings come from the request or the saved admin settings, so the
+    # client does not need a separate /tts/settings round trip
+    voice_id = data.get('voice_id')
+    speed = data.get('speed')
+    temperature = data.get('temperature')
+    if not voice_id or speed is None or temperature is None:
+        settings = TTSSettings.query.first()
+        voice_id = voice_id or (settings.voice_id if settings else 'ee966436-01ab-4810-a880-9e0a532e03b8')
+        speed = speed if speed is not None else (settings.speed if settings else '1.0')
+        temperature = temperature if temperature is not None else (settings.temperature if settings else '0.7')
+    speed = str(speed)
+    temperature = str(temperature)
+    pitch = str(data.get('pitch', '1.0'))
+
+    try:
+        if Config.TTS_PROVIDER == "unrealspeech":
+            # Convert frontend speed (0.5-2.0) to UnrealSpeech range (-0.5 to 1.0)
+            speed = str(float(speed) - 1.0)
+    except ValueError:
+        speed = "0.0" if Config.TTS_PROVIDER == "unrealspeech" else "1.0"
+
+    print(f"🎓🎙️ Lesson chat-stream [{lesson_id}]: '{user_input[:50]}...' | Slide {current_slide + 1}")
+
+    lesson_manager, registry_key = get_chat_coaching_manager(lesson_id, data)
+    out_of_sync = sync_chat_history(lesson_manager, user_input, data, conversation_history)
+    if out_of_sync:
+        return out_of_sync
+    provider = tts_provider
+
+    events = queue.Queue()
+    text_chunks = queue.Queue()
+    parts = []
+
+    # Cancelled when the client disconnects (barge-in); stops the LLM stream
+    # and aborts any in-flight TTS request
+    token = CancellationToken()
+    token.add_callback(lambda: text_chunks.put(None))
+
+    def run_llm():
+        """Stream LLM deltas to the client and completed sentences to TTS"""
+        chunker = IncrementalTextChunker(max_chunk_size=995)
+        llm_stream = lesson_manager.stream_user_input(user_input, current_slide)
+        seq = 0
+        try:
+            for delta in llm_stream:
+                if token.cancelled:
+                    break
+                parts.append(delta)
+                events.put({'type': 'text', 'delta': delta})
+                for chunk in chunker.feed(delta):
+                    text_chunks.put(chunk)
+            if not token.cancelled:
+                for chunk in chunker.flush():
+                    text_chunks.put(chunk)
+        except Exception as e:
+            print(f"❌ Chat-stream LLM error: {e}")
+            events.put({'type': 'error', 'message': str(e)})
+        finally:
+            # Closing the generator closes the upstream LLM response early
+            llm_stream.close()
+            try:
+                seq = lesson_manager.persist_turn(user_input, ''.join(parts))
+            except Exception as e:
+                print(f"❌ Chat-stream history write error: {e}")
+            if registry_key:
+                coaching_registry.touch(*registry_key)
+            text_chunks.put(None)
+            events.put({'type': '_llm_done', 'response': ''.join(parts), 'seq': seq})
+
+    def run_tts():
+        """Synthesize chunks in order as the LLM completes them"""
+        chunk_count = 0
+        try:
+            with cancellation_scope(token.child()):
+                chunk_count = synthesize_chunks()
+        except Exception as e:
+            print(f"❌ Chat-stream TTS error: {e}")
+            events.put({'type': 'error', 'message': f'Audio generation failed: {e}'})
+        finally:
+            events.put({'type': '_tts_done', 'chunks': chunk_count})
+
+    def synthesize_chunks():
+        """Synthesize queued chunks until the LLM finishes or the client leaves"""
+        chunk_count = 0
+        while not token.cancelled:
+            chunk = text_chunks.get()
+            if chunk is None:
+                break
+            generator = provider.stream_with_timestamps_sync(
+                text=chunk.text,
+                voice_id=voice_id,
+                speed=speed,
+                temperature=temperature,
+                pitch=pitch
+            )
+            try:
+                for frame in generator:
+                    if token.cancelled:
+                        break
+                    if frame['type'] == 'timestamps':
+                        events.put({'type': 'timestamps', 'chunk': chunk.index, 'words': frame['words']})
+                    elif frame['data']:
+                        events.put({
+                            'type': 'audio',
+                            'chunk': chunk.index,
+                            'data': base64.b64encode(frame['data']).decode('ascii')
+                        })
+            finally:
+                generator.close()
+            if token.cancelled:
+                break
+            events.put({'type': 'chunk_end', 'chunk': chunk.index, 'text': chunk.text})
+            chunk_count += 1
+        return chunk_count
+
+    def generate_events():
+        start_time = time.time()
+        first_audio_logged = False
+        response_text = ''
+        chunk_count = 0
+        seq = 0
+        pending = {'_llm_done', '_tts_done'}
+
+        workers = [
+            threading.Thread(target=run_llm, name=f"chat-stream-llm-{lesson_id}", daemon=True),
+            threading.Thread(target=run_tts, name=f"chat-stream-tts-{lesson_id}", daemon=True)
+        ]
+        for worker in workers:
+            worker.start()
+
+        while pending:
+            try:
+                event = events.get(timeout=1.0)
+            except queue.Empty:
+                # Blank heartbeat line (ignored by the client) so a
+                # disconnected client is noticed on the next write
+                yield '\n'
+                continue
+            event_type = event['type']
+
+            if event_type == '_llm_done':
+                response_text = event['response']
+                seq = event['seq']
+                pending.discard(event_type)
+                print(f"✅ LLM finished in {time.time() - start_time:.2f}s ({len(response_text)} chars)")
+                continue
+            if event_type == '_tts_done':
+                chunk_count = event['chunks']
+                pending.discard(event_type)
+                continue
+
+            if event_type == 'audio' and not first_audio_logged:
+                first_audio_logged = True
+                print(f"⚡ First audio after {time.time() - start_time:.2f}s")
+
+            yield json.dumps(event) + '\n'
+
+        yield json.dumps({'type': 'done', 'response': response_text, 'chunks': chunk_count, 'seq': seq}) + '\n'
+        print(f"✅ Chat-stream complete: {chunk_count} chunks in {time.time() - start_time:.2f}s")
+
+    return Response(
+        cancellable_stream(generate_events, '/chat-stream', lambda: sum(len(part) for part in parts), token=token),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache, no-transform',
+            'X-Accel-Buffering': 'no',
+            'X-Voice-ID': voice_id
+        }
+    )
+
 @app.route('/lesson/<lesson_id>/api/content')
 def lesson_api_content(lesson_id):
     """API endpoint to get lesson content for dynamic lessons"""
@@ -1734,10 +2158,12 @@ def debug_status():
             'slide_controller': 'available',
             'voice_interaction': 'available',
             'slide_content': 'available',
-            'lesson_managers': {
-                lesson_id: manager.get_status()
-                for lesson_id, manager in lesson_managers.items()
-            }
+            'lesson_managers': coaching_registry.status(),
+            'coaching_registry': coaching_registry.get_stats(),
+            'prompt_cache': get_prompt_cache_stats().get_stats(),
+            'context_window': get_context_window().get_stats(),
+            'conversation_summaries': get_conversation_summarizer().get_stats(),
+            'answer_cache': get_answer_cache().get_stats()
         }
         
         return jsonify(status)
@@ -1749,18 +2175,18 @@ def debug_status():
 def test_openai_connection():
     """Test the OpenAI API connection by listing models."""
     try:
-        from openai import OpenAI
         from config import Config
+        from llm_client import create_openai_client
         import logging
 
         logger = logging.getLogger(__name__)
 
         api_key = Config.OPENAI_API_KEY
-        if not api_key:
+        if not api_key and Config.LLM_BACKEND != "mock":
             logger.error("OPENAI_API_KEY is not set in config.py")
             return jsonify({'status': 'error', 'message': 'OpenAI API key not configured.'}), 500
 
-        client = OpenAI(api_key=api_key)
+        client = create_openai_client()
 
         logger.info("Attempting to list OpenAI models...")
         models = client.models.list()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request thread + event loop vs. the shared background loop
+
+Simulates N concurrent Flask request threads each consuming an async TTS
+stream through stream_sync_generator, and reports peak thread count and
+per-request overhead (wall time beyond the simulated provider time).
+
+Usage:
+    python benchmark_stream_bridge.py [--streams 200] [--chunks 20] [--chunk-delay-ms 5]
+"""
+
+import argparse
+import asyncio
+import queue
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from tts.base import TTSProvider
+
+
+class SimulatedProvider(TTSProvider):
+    """Provider whose stream yields fixed-size chunks with a fixed delay"""
+
+    def __init__(self, chunks: int, chunk_delay: float):
+        super().__init__(api_key="benchmark")
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+
+    async def synthesize(self, text, voice_id, **options):
+        return b"\x00" * 1024 * self.chunks
+
+    async def stream(self, text, voice_id, **options):
+        for _ in range(self.chunks):
+            await asyncio.sleep(self.chunk_delay)
+            yield b"\x00" * 1024
+
+    def get_voices(self):
+        return []
+
+    def validate_text(self, text):
+        return True, ""
+
+
+def legacy_stream_sync_generator(provider: TTSProvider, text: str, voice_id: str, **options):
+    """The previous implementation: a new thread, loop and unbounded queue per request"""
+    result_queue = queue.Queue()
+
+    def run_async():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        async def collect_chunks():
+            try:
+                async for chunk in provider.stream(text, voice_id, **options):
+                    if chunk:
+                        result_queue.put(('chunk', chunk))
+                result_queue.put(('done', None))
+            except Exception as e:
+                result_queue.put(('error', e))
+
+        loop.run_until_complete(collect_chunks())
+        loop.close()
+
+    thread = threading.Thread(target=run_async, daemon=True)
+    thread.start()
+
+    while True:
+        item_type, item_value = result_queue.get(timeout=30)
+        if item_type == 'chunk':
+            yield item_value
+        elif item_type == 'done':
+            break
+        else:
+            raise item_value
+
+    thread.join(timeout=1)
+
+
+def run_benchmark(label: str, stream_fn, streams: int, ideal_seconds: float) -> dict:
+    """Run `streams` concurrent consumers and collect thread/overhead metrics"""
+    durations = []
+    durations_lock = threading.Lock()
+    start_barrier = threading.Barrier(streams + 1)
+    peak_threads = threading.active_count()
+    sampling = True
+
+    def sample_threads():
+        nonlocal peak_threads
+        while sampling:
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.002)
+
+    def consumer():
+        start_barrier.wait()
+        started = time.perf_counter()
+        for _ in stream_fn():
+            pass
+        elapsed = time.perf_counter() - started
+        with durations_lock:
+            durations.append(elapsed)
+
+    baseline_threads = threading.active_count()
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+
+    consumers = [threading.Thread(target=consumer) for _ in range(streams)]
+    for thread in consumers:
+        thread.start()
+
+    wall_start = time.perf_counter()
+    start_barrier.wait()
+    for thread in consumers:
+        thread.join()
+    wall_time = time.perf_counter() - wall_start
+
+    sampling = False
+    sampler.join()
+
+    overheads_ms = [(d - ideal_seconds) * 1000 for d in durations]
+    return {
+        'label': label,
+        'streams': streams,
+        # Exclude the request threads themselves and the sampler
+        'extra_threads_peak': peak_threads - baseline_threads - streams - 1,
+        'overhead_p50_ms': statistics.median(overheads_ms),
+        'overhead_p95_ms': sorted(overheads_ms)[int(len(overheads_ms) * 0.95) - 1],
+        'wall_time_s': wall_time
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--streams', type=int, default=200, help='Concurrent streams (default 200)')
+    parser.add_argument('--chunks', type=int, default=20, help='Chunks per stream (default 20)')
+    parser.add_argument('--chunk-delay-ms', type=float, default=5, help='Provider delay per chunk (default 5ms)')
+    args = parser.parse_args()
+
+    provider = SimulatedProvider(args.chunks, args.chunk_delay_ms / 1000)
+    ideal_seconds = args.chunks * args.chunk_delay_ms / 1000
+
+    print("🏁 Stream bridge benchmark")
+    print(f"   {args.streams} concurrent streams x {args.chunks} chunks, {args.chunk_delay_ms}ms per chunk")
+    print()
+
+    results = [
+        run_benchmark(
+            'legacy (thread + loop per request)',
+            lambda: legacy_stream_sync_generator(provider, "text", "voice"),
+            args.streams, ideal_seconds
+        ),
+        run_benchmark(
+            'shared background loop',
+            lambda: provider.stream_sync_generator("text", "voice"),
+            args.streams, ideal_seconds
+        )
+    ]
+
+    print(f"{'mode':<38}{'extra threads':>15}{'p50 overhead':>15}{'p95 overhead':>15}{'wall':>10}")
+    for r in results:
+        print(f"{r['label']:<38}{r['extra_threads_peak']:>15}"
+              f"{r['overhead_p50_ms']:>12.1f} ms{r['overhead_p95_ms']:>12.1f} ms{r['wall_time_s']:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,13 +14,88 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     UNREALSPEECH_API_KEY = os.getenv("UNREALSPEECH_API_KEY")
     
+    # API base URLs (override to point at tts/mock_server.py / mock_llm_server.py for offline load tests)
+    UNREALSPEECH_BASE_URL = os.getenv("UNREALSPEECH_BASE_URL", "")
+    HUME_BASE_URL = os.getenv("HUME_BASE_URL", "")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+    
+    # LLM backend: "openai" or "mock" (in-process mock_llm_server.py, no network)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").lower()
+    LLM_MOCK_TTFT_MS = float(os.getenv("LLM_MOCK_TTFT_MS", "300"))
+    LLM_MOCK_TOKENS_PER_SECOND = float(os.getenv("LLM_MOCK_TOKENS_PER_SECOND", "50"))  # 0 = unthrottled
+    LLM_MOCK_MODE = os.getenv("LLM_MOCK_MODE", "canned")  # "canned" or "echo"
+    LLM_MOCK_RESPONSE = os.getenv("LLM_MOCK_RESPONSE", "")  # Overrides the canned response
+    
+    # Per-session coaching manager registry (LRU + idle TTL under a memory budget)
+    COACHING_MAX_SESSIONS = int(os.getenv("COACHING_MAX_SESSIONS", "500"))
+    COACHING_SESSION_TTL_SECONDS = float(os.getenv("COACHING_SESSION_TTL_SECONDS", "1800"))
+    COACHING_MEMORY_BUDGET_MB = float(os.getenv("COACHING_MEMORY_BUDGET_MB", "64"))
+    
+    # Conversation history token budget per TokenSettings.token_optimization_level
+    CONTEXT_TOKENS_AGGRESSIVE = int(os.getenv("CONTEXT_TOKENS_AGGRESSIVE", "600"))
+    CONTEXT_TOKENS_BALANCED = int(os.getenv("CONTEXT_TOKENS_BALANCED", "1500"))
+    CONTEXT_TOKENS_MINIMAL = int(os.getenv("CONTEXT_TOKENS_MINIMAL", "4000"))
+    # How often each worker re-reads TokenSettings, so admin edits reach every worker
+    CONTEXT_SETTINGS_REVALIDATE_SECONDS = float(os.getenv("CONTEXT_SETTINGS_REVALIDATE_SECONDS", "5.0"))
+    
+    # Rolling conversation summaries (TokenSettings.enable_context_summarization)
+    SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "local").lower()  # "local" (extractive, no API call) or "llm" (opt-in, billed)
+    SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+    SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "200"))
+    SUMMARY_MIN_MESSAGES = int(os.getenv("SUMMARY_MIN_MESSAGES", "4"))  # Fold at least this many at a time
+    
+    # Near-duplicate answer cache per (lesson, slide, prompt variant)
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.85"))  # Cosine similarity for a hit
+    ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+    ANSWER_CACHE_MAX_ENTRIES_PER_SLIDE = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES_PER_SLIDE", "64"))
+    
     # TTS Configuration
     TTS_PROVIDER = os.getenv("TTS_PROVIDER", "unrealspeech")  # Default to Unreal Speech
     
+    # TTS HTTP connection pool settings
+    TTS_POOL_LIMIT = int(os.getenv("TTS_POOL_LIMIT", "20"))
+    TTS_POOL_LIMIT_PER_HOST = int(os.getenv("TTS_POOL_LIMIT_PER_HOST", "10"))
+    TTS_KEEPALIVE_TIMEOUT = float(os.getenv("TTS_KEEPALIVE_TIMEOUT", "30"))
+    TTS_DNS_CACHE_TTL = int(os.getenv("TTS_DNS_CACHE_TTL", "300"))
+    
+    # Sentence-level TTS audio cache
+    TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+    TTS_CACHE_MEMORY_MB = int(os.getenv("TTS_CACHE_MEMORY_MB", "64"))
+    TTS_CACHE_DISK_MB = int(os.getenv("TTS_CACHE_DISK_MB", "512"))
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".tts_cache")  # Empty string disables the disk tier
+    
+    # Pipelined /stream-chunked synthesis (prefetch the next k chunks)
+    TTS_PIPELINE_ENABLED = os.getenv("TTS_PIPELINE_ENABLED", "true").lower() == "true"
+    TTS_PIPELINE_LOOKAHEAD = int(os.getenv("TTS_PIPELINE_LOOKAHEAD", "2"))
+    TTS_PIPELINE_MAX_BUFFER_KB = int(os.getenv("TTS_PIPELINE_MAX_BUFFER_KB", "512"))  # Per prefetched chunk
+    
+    # Hedged TTS requests (race a secondary provider when the first chunk is slow)
+    TTS_HEDGE_ENABLED = os.getenv("TTS_HEDGE_ENABLED", "false").lower() == "true"
+    TTS_HEDGE_PROVIDERS = os.getenv("TTS_HEDGE_PROVIDERS", "hume")  # Comma-separated, in preference order
+    TTS_HEDGE_AFTER_MS = float(os.getenv("TTS_HEDGE_AFTER_MS", "0"))  # 0 = adaptive (primary's p95 first chunk)
+    TTS_BREAKER_FAILURES = int(os.getenv("TTS_BREAKER_FAILURES", "3"))
+    TTS_BREAKER_SLOW_MS = float(os.getenv("TTS_BREAKER_SLOW_MS", "5000"))
+    TTS_BREAKER_COOLDOWN = float(os.getenv("TTS_BREAKER_COOLDOWN", "30"))
+    
+    # Mock TTS provider (TTS_PROVIDER=mock) timing profile
+    TTS_MOCK_TTFB_MS = float(os.getenv("TTS_MOCK_TTFB_MS", "150"))
+    TTS_MOCK_THROUGHPUT_KBPS = float(os.getenv("TTS_MOCK_THROUGHPUT_KBPS", "64"))  # 0 = unthrottled
+    TTS_MOCK_JITTER_MS = float(os.getenv("TTS_MOCK_JITTER_MS", "0"))
+    TTS_MOCK_ERROR_RATE = float(os.getenv("TTS_MOCK_ERROR_RATE", "0"))
+    TTS_MOCK_SEED = int(os.getenv("TTS_MOCK_SEED", "0"))
+    
     @classmethod
     def get_tts_config(cls) -> Dict[str, Any]:
         """Get TTS configuration for the current provider"""
-        if cls.TTS_PROVIDER.lower() == "unrealspeech":
+        config = cls.get_provider_config(cls.TTS_PROVIDER)
+        config["hedge"] = cls._get_hedge_config(config["provider"])
+        return config
+    
+    @classmethod
+    def get_provider_config(cls, provider_name: str) -> Dict[str, Any]:
+        """Get TTS configuration for a specific provider"""
+        if provider_name.lower() == "unrealspeech":
             if not cls.UNREALSPEECH_API_KEY:
                 print("⚠️  Unreal Speech API key not found, falling back to Hume AI")
                 return cls._get_hume_config()
@@ -29,15 +104,78 @@ class Config:
                 "api_key": cls.UNREALSPEECH_API_KEY,
                 "options": {
                     "default_voice": "af_sky",
-                    "bitrate": "192k"
-                }
+                    "bitrate": "192k",
+                    "pool_limit": cls.TTS_POOL_LIMIT,
+                    "pool_limit_per_host": cls.TTS_POOL_LIMIT_PER_HOST,
+                    "keepalive_timeout": cls.TTS_KEEPALIVE_TIMEOUT,
+                    "dns_cache_ttl": cls.TTS_DNS_CACHE_TTL,
+                    **({"base_url": cls.UNREALSPEECH_BASE_URL} if cls.UNREALSPEECH_BASE_URL else {})
+                },
+                "cache": cls._get_cache_config()
             }
-        elif cls.TTS_PROVIDER.lower() == "hume":
+        elif provider_name.lower() == "hume":
             return cls._get_hume_config()
-        elif cls.TTS_PROVIDER.lower() == "hume_evi3":
+        elif provider_name.lower() == "hume_evi3":
             return cls._get_hume_evi3_config()
+        elif provider_name.lower() == "mock":
+            return cls._get_mock_config()
         else:
-            raise ValueError(f"Unknown TTS provider: {cls.TTS_PROVIDER}")
+            raise ValueError(f"Unknown TTS provider: {provider_name}")
+    
+    @classmethod
+    def _get_hedge_config(cls, primary_provider: str) -> Dict[str, Any]:
+        """Get hedged-request configuration (secondaries exclude the primary)"""
+        secondaries = []
+        if cls.TTS_HEDGE_ENABLED:
+            for name in cls.TTS_HEDGE_PROVIDERS.split(","):
+                name = name.strip().lower()
+                if not name or name == primary_provider:
+                    continue
+                try:
+                    secondary = cls.get_provider_config(name)
+                except ValueError as e:
+                    print(f"⚠️  Skipping hedge provider: {e}")
+                    continue
+                # The unrealspeech config falls back to Hume without a key
+                if secondary.get("api_key") and secondary["provider"] == name:
+                    secondaries.append(secondary)
+        
+        return {
+            "enabled": cls.TTS_HEDGE_ENABLED and bool(secondaries),
+            "secondaries": secondaries,
+            "hedge_after_ms": cls.TTS_HEDGE_AFTER_MS,
+            "breaker": {
+                "failure_threshold": cls.TTS_BREAKER_FAILURES,
+                "slow_call_ms": cls.TTS_BREAKER_SLOW_MS,
+                "cooldown": cls.TTS_BREAKER_COOLDOWN
+            }
+        }
+    
+    @classmethod
+    def _get_cache_config(cls) -> Dict[str, Any]:
+        """Get TTS audio cache configuration"""
+        return {
+            "enabled": cls.TTS_CACHE_ENABLED,
+            "memory_mb": cls.TTS_CACHE_MEMORY_MB,
+            "disk_mb": cls.TTS_CACHE_DISK_MB,
+            "disk_dir": cls.TTS_CACHE_DIR
+        }
+    
+    @classmethod
+    def _get_mock_config(cls) -> Dict[str, Any]:
+        """Get mock TTS configuration (offline load testing)"""
+        return {
+            "provider": "mock",
+            "api_key": "mock",
+            "options": {
+                "ttfb_ms": cls.TTS_MOCK_TTFB_MS,
+                "throughput_kbps": cls.TTS_MOCK_THROUGHPUT_KBPS,
+                "jitter_ms": cls.TTS_MOCK_JITTER_MS,
+                "error_rate": cls.TTS_MOCK_ERROR_RATE,
+                "seed": cls.TTS_MOCK_SEED
+            },
+            "cache": cls._get_cache_config()
+        }
     
     @classmethod
     def _get_hume_config(cls) -> Dict[str, Any]:
@@ -46,8 +184,10 @@ class Config:
             "provider": "hume",
             "api_key": cls.HUME_API_KEY,
             "options": {
-                "default_voice": "friendly_casual"
-            }
+                "default_voice": "friendly_casual",
+                **({"base_url": cls.HUME_BASE_URL} if cls.HUME_BASE_URL else {})
+            },
+            "cache": cls._get_cache_config()
         }
     
     @classmethod
@@ -58,7 +198,8 @@ class Config:
             "api_key": cls.HUME_API_KEY,
             "options": {
                 "default_voice": "friendly_casual"
-            }
+            },
+            "cache": cls._get_cache_config()
         }
     
     @classmethod
@@ -80,6 +221,10 @@ class Config:
                 "hume": {
                     "available": bool(cls.HUME_API_KEY),
                     "api_key_set": bool(cls.HUME_API_KEY)
+                },
+                "mock": {
+                    "available": True,
+                    "api_key_set": False
                 }
             }
         }
@@ -1,6 +1,6 @@
 import os
-from openai import OpenAI
 from config import Config
+from llm_client import create_openai_client
 import logging
 import traceback
 
@@ -40,14 +40,7 @@ class ConversationManager:
     def client(self):
         """Lazy initialization of OpenAI client"""
         if self._client is None:
-            api_key = Config.OPENAI_API_KEY
-            if not api_key or api_key == "YOUR_OPENAI_API_KEY_HERE":
-                raise ValueError(
-                    "❌ OpenAI API key not set or invalid.\n"
-                    "🔑 Get a new key from: https://platform.openai.com/api-keys\n"
-                    "📝 Update OPENAI_API_KEY in config.py or set as environment variable"
-                )
-            self._client = OpenAI(api_key=api_key)
+            self._client = create_openai_client()
         return self._client
         
     def set_system_prompt(self, prompt: str, clear_history: bool = False):
@@ -79,16 +72,11 @@ class ConversationManager:
                 
                 return self._generate_transition_response()
 
-            # Prepare messages with system prompt and conversation history
+            # Prepare messages with system prompt and the history that fits the token budget
+            from slide_module_simplified.context_window import count_tokens, get_context_window
+            history = self.conversation_history + [{"role": "user", "content": user_input}]
             messages = [{"role": "system", "content": self.system_prompt}]
-            
-            # Add conversation history with context - using 10 messages for better personalization
-            # while still maintaining reasonable performance
-            for msg in self.conversation_history[-10:]:  # Increased from 5 to 10 messages
-                messages.append(msg)
-            
-            # Add current user input
-            messages.append({"role": "user", "content": user_input})
+            messages.extend(get_context_window().fit(history, count_tokens(self.system_prompt)))
 
             logger.debug(f"Prepared {len(messages)} messages for API call. System prompt length: {len(self.system_prompt)}")
             
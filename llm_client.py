@@ -0,0 +1,73 @@
+"""
+LLM client factory
+Builds OpenAI clients for the configured backend (OpenAI or the local mock)
+"""
+
+import threading
+
+from config import Config
+
+_mock_server = None
+_mock_lock = threading.Lock()
+_shared_client = None
+_client_lock = threading.Lock()
+
+
+def _get_mock_base_url() -> str:
+    """Start the in-process mock LLM server once and return its base URL"""
+    global _mock_server
+    with _mock_lock:
+        if _mock_server is None:
+            from mock_llm_server import MockLLMProfile, MockLLMServer
+            profile = MockLLMProfile(
+                ttft_ms=Config.LLM_MOCK_TTFT_MS,
+                tokens_per_second=Config.LLM_MOCK_TOKENS_PER_SECOND,
+                mode=Config.LLM_MOCK_MODE,
+                canned_response=Config.LLM_MOCK_RESPONSE or None
+            )
+            _mock_server = MockLLMServer(port=0, profile=profile).start()
+            print(f"🧪 Mock LLM backend running at {_mock_server.base_url} ({profile.get_config()})")
+        return _mock_server.base_url
+
+
+def create_openai_client():
+    """
+    Create an OpenAI client for the configured LLM backend
+
+    LLM_BACKEND=mock points the client at an in-process mock server, and
+    OPENAI_BASE_URL points it at any OpenAI-compatible endpoint (e.g. a
+    standalone mock_llm_server.py).
+
+    Raises:
+        ValueError: If the OpenAI backend is selected without an API key
+    """
+    from openai import OpenAI
+
+    if Config.LLM_BACKEND == "mock":
+        return OpenAI(api_key="mock", base_url=_get_mock_base_url())
+
+    api_key = Config.OPENAI_API_KEY
+    if not api_key or api_key == "YOUR_OPENAI_API_KEY_HERE":
+        raise ValueError(
+            "❌ OpenAI API key not set or invalid.\n"
+            "🔑 Get a new key from: https://platform.openai.com/api-keys\n"
+            "📝 Update OPENAI_API_KEY in config.py or set as environment variable"
+        )
+    if Config.OPENAI_BASE_URL:
+        return OpenAI(api_key=api_key, base_url=Config.OPENAI_BASE_URL)
+    return OpenAI(api_key=api_key)
+
+
+def get_shared_openai_client():
+    """
+    Process-wide OpenAI client, created on first use
+
+    The client is thread-safe and owns an HTTP connection pool, so sharing
+    one keeps connections warm across sessions.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _client_lock:
+            if _shared_client is None:
+                _shared_client = create_openai_client()
+    return _shared_client
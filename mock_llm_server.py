@@ -0,0 +1,329 @@
+"""
+Mock LLM Server
+Local OpenAI-compatible chat-completions stand-in for offline benchmarking
+
+Implements the subset of the OpenAI API the app uses, with deterministic
+output and a configurable time-to-first-token and token rate, so the full
+chat path (LessonCoachingManager, ConversationManager, /chat-stream) can be
+exercised and latency regressions reproduced without network access.
+
+Endpoints:
+    POST /v1/chat/completions   Non-streaming JSON or stream=True SSE
+                                (usage chunk when stream_options.include_usage)
+    GET  /v1/models             Model listing (used by /test-openai-connection)
+    GET  /health                Liveness and request counters
+
+Prefix caching:
+    Usage reports simulate provider prefix caching: prompt_tokens_details
+    .cached_tokens is the prefix shared with a recent request, counted like
+    OpenAI does (prompts of 1024+ tokens, in 128-token blocks).
+
+Usage:
+    python mock_llm_server.py --port 8766 --ttft-ms 300 --tokens-per-second 60 --mode echo
+    export OPENAI_BASE_URL=http://127.0.0.1:8766/v1
+
+Or set LLM_BACKEND=mock to run it in-process (see llm_client.py).
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+DEFAULT_CANNED_RESPONSE = (
+    "That's a great question! Wireframes are simple layouts that show where content "
+    "and navigation will go before any visual design happens. They help you test the "
+    "structure of a page quickly and cheaply. Would you like to try sketching one for "
+    "the home screen of your app?"
+)
+
+_TOKEN_PATTERN = re.compile(r'\s*\S+')
+
+# Simulated prefix cache: minimum cacheable prompt, cache granularity and
+# how many recent prompts are remembered
+PREFIX_CACHE_MIN_TOKENS = 1024
+PREFIX_CACHE_BLOCK_TOKENS = 128
+PREFIX_CACHE_ENTRIES = 256
+
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into word-sized pseudo tokens that concatenate back to text"""
+    return _TOKEN_PATTERN.findall(text)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+class MockLLMProfile:
+    """
+    Response content and timing for the mock LLM
+
+    Args:
+        ttft_ms: Delay before the first token
+        tokens_per_second: Streaming rate after the first token (0 = unthrottled)
+        mode: 'canned' (fixed response) or 'echo' (repeats the last user message)
+        canned_response: Text returned in canned mode
+    """
+
+    def __init__(self, ttft_ms: float = 300, tokens_per_second: float = 50,
+                 mode: str = 'canned', canned_response: Optional[str] = None):
+        if mode not in ('canned', 'echo'):
+            raise ValueError(f"Unknown mock LLM mode '{mode}'. Use 'canned' or 'echo'")
+        self.ttft_ms = float(ttft_ms)
+        self.tokens_per_second = float(tokens_per_second)
+        self.mode = mode
+        self.canned_response = canned_response or DEFAULT_CANNED_RESPONSE
+
+    def respond(self, messages: List[Dict]) -> str:
+        """Deterministic response for a chat request"""
+        if self.mode == 'echo':
+            last_user = next((m.get('content') for m in reversed(messages) if m.get('role') == 'user'), '')
+            return f"You said: {last_user}"
+        return self.canned_response
+
+    def token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def get_config(self) -> Dict:
+        return {
+            'ttft_ms': self.ttft_ms,
+            'tokens_per_second': self.tokens_per_second,
+            'mode': self.mode
+        }
+
+
+class _MockLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible request handler; profile and counters live on the server"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path.endswith('/models'):
+            self._send_json(200, {
+                'object': 'list',
+                'data': [{'id': model, 'object': 'model', 'created': 0, 'owned_by': 'mock'}
+                         for model in ('gpt-4', 'gpt-4.1-nano', 'gpt-4o-mini')]
+            })
+        elif path == '/health':
+            self._send_json(200, {'status': 'ok', 'stats': self.server.get_stats()})
+        else:
+            self._send_json(404, {'error': {'message': f'Unknown path {self.path}', 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if not path.endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': f'Unknown path {self.path}', 'type': 'invalid_request_error'}})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0) or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self._send_json(400, {'error': {'message': f'Invalid JSON body: {e}', 'type': 'invalid_request_error'}})
+            return
+
+        messages = body.get('messages') or []
+        model = body.get('model', 'gpt-4')
+        text = self.server.profile.respond(messages)
+        usage = {
+            'prompt_tokens': sum(estimate_tokens(str(m.get('content') or '')) + 4 for m in messages),
+            'completion_tokens': len(split_tokens(text)),
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        usage['prompt_tokens_details'] = {
+            'cached_tokens': self.server.cached_prefix_tokens(messages, usage['prompt_tokens'])
+        }
+        self.server.record(usage)
+
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        if body.get('stream'):
+            include_usage = bool((body.get('stream_options') or {}).get('include_usage'))
+            self._stream_completion(completion_id, model, text, usage if include_usage else None)
+        else:
+            self._send_completion(completion_id, model, text, usage)
+
+    def _send_json(self, status: int, body: Dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_completion(self, completion_id: str, model: str, text: str, usage: Dict) -> None:
+        profile = self.server.profile
+        time.sleep(profile.ttft_ms / 1000 + profile.token_delay() * max(0, usage['completion_tokens'] - 1))
+        self._send_json(200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': text},
+                'finish_reason': 'stop'
+            }],
+            'usage': usage
+        })
+
+    def _stream_completion(self, completion_id: str, model: str, text: str, usage: Optional[Dict]) -> None:
+        profile = self.server.profile
+        created = int(time.time())
+
+        def chunk(delta: Dict, finish_reason=None, chunk_usage=None) -> Dict:
+            return {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [] if chunk_usage else [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+                'usage': chunk_usage
+            }
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        try:
+            time.sleep(profile.ttft_ms / 1000)
+            self._write_event(chunk({'role': 'assistant', 'content': ''}))
+            for index, token in enumerate(split_tokens(text)):
+                if index:
+                    time.sleep(profile.token_delay())
+                self._write_event(chunk({'content': token}))
+            self._write_event(chunk({}, finish_reason='stop'))
+            if usage:
+                self._write_event(chunk({}, chunk_usage=usage))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading (e.g. barge-in)
+            self.close_connection = True
+
+    def _write_event(self, payload: Dict) -> None:
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """
+    Threaded OpenAI-compatible mock server
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        profile: Response/timing profile (defaults to MockLLMProfile())
+        verbose: Log every request
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8766,
+                 profile: Optional[MockLLMProfile] = None, verbose: bool = False):
+        super().__init__((host, port), _MockLLMHandler)
+        self.profile = profile or MockLLMProfile()
+        self.verbose = verbose
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0}
+        self._prefix_lock = threading.Lock()
+        self._recent_prompts = deque(maxlen=PREFIX_CACHE_ENTRIES)
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI client base_url for this server"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def cached_prefix_tokens(self, messages: List[Dict], prompt_tokens: int) -> int:
+        """Prompt tokens a prefix cache would serve for these messages"""
+        prompt = ''.join(f"{m.get('role')}\x00{m.get('content') or ''}\x00" for m in messages)
+        with self._prefix_lock:
+            shared = max((len(os.path.commonprefix([prompt, seen])) for seen in self._recent_prompts), default=0)
+            self._recent_prompts.append(prompt)
+        if prompt_tokens < PREFIX_CACHE_MIN_TOKENS:
+            return 0
+        cached = min(shared // 4, prompt_tokens) // PREFIX_CACHE_BLOCK_TOKENS * PREFIX_CACHE_BLOCK_TOKENS
+        return cached if cached >= PREFIX_CACHE_MIN_TOKENS else 0
+
+    def record(self, usage: Dict) -> None:
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats['prompt_tokens'] += usage['prompt_tokens']
+            self._stats['completion_tokens'] += usage['completion_tokens']
+            self._stats['cached_tokens'] += usage['prompt_tokens_details']['cached_tokens']
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['profile'] = self.profile.get_config()
+        return stats
+
+    def start(self) -> 'MockLLMServer':
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'MockLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat-completions server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--ttft-ms', type=float, default=300, help='Delay before the first token')
+    parser.add_argument('--tokens-per-second', type=float, default=50, help='Streaming rate (0 = unthrottled)')
+    parser.add_argument('--mode', choices=['canned', 'echo'], default='canned')
+    parser.add_argument('--response', help='Canned response text')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    profile = MockLLMProfile(
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        mode=args.mode,
+        canned_response=args.response
+    )
+    server = MockLLMServer(args.host, args.port, profile=profile, verbose=args.verbose)
+    print(f"🧪 Mock LLM server listening on {server.base_url}")
+    print(f"   OPENAI_BASE_URL={server.base_url}")
+    print(f"   Profile: {profile.get_config()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Mock LLM server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,11 @@ Note: AI provides guidance, user controls navigation via UI buttons
 from .slide_controller import SlideController, get_slide_controller
 from .voice_interaction import VoiceInteraction, get_voice_interaction, process_voice_input, has_navigation_intent
 from .lesson_coaching_manager import LessonCoachingManager
+from .coaching_registry import CoachingManagerRegistry, get_coaching_registry
+from .prompt_assembly import PromptCacheStats, get_prompt_cache_stats
+from .context_window import ContextBudget, ContextWindow, get_context_window
+from .summarizer import ConversationSummarizer, get_conversation_summarizer
+from .answer_cache import AnswerCache, get_answer_cache
 from .slide_content import SlideContent, get_slide_content
 from .routes import register_routes, get_blueprint, init_slide_system
 
@@ -46,12 +51,23 @@ __all__ = [
     'SlideController',
     'VoiceInteraction', 
     'LessonCoachingManager',
+    'CoachingManagerRegistry',
+    'PromptCacheStats',
+    'ContextWindow',
+    'ContextBudget',
+    'ConversationSummarizer',
+    'AnswerCache',
     'SlideContent',
     
     # Convenience functions
     'get_slide_controller',
     'get_voice_interaction',
     'get_slide_content',
+    'get_coaching_registry',
+    'get_prompt_cache_stats',
+    'get_context_window',
+    'get_conversation_summarizer',
+    'get_answer_cache',
     'process_voice_input',          # Returns guidance instead of control
     'has_navigation_intent',        # Detects navigation intent
     
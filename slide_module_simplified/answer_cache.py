@@ -0,0 +1,228 @@
+"""
+Answer Cache
+Reuses coaching answers for near-duplicate questions on the same slide,
+so repeated questions skip the LLM call
+"""
+
+import math
+import re
+import threading
+import time
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Filler that doesn't change what is being asked; question words are kept
+# so "why wireframes" and "what are wireframes" stay apart
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'do', 'does', 'did', 'of', 'to', 'in', 'on',
+    'for', 'and', 'or', 'me', 'my', 'you', 'your', 'we', 'us', 'can', 'could', 'would', 'please',
+    'tell', 'about', 'exactly', 'just', 'really', 'actually', 'so', 'um', 'uh', 'hey', 'hi', 'ok',
+})
+
+# Questions that lean on the conversation ("what does it mean?") have
+# different answers per learner, so they are never cached
+CONTEXT_WORDS = frozenset({
+    'it', 'its', 'this', 'that', 'these', 'those', 'they', 'them', 'he', 'she', 'above', 'previous',
+    'earlier', 'again', 'more', 'else', 'example', 'instead',
+})
+
+# Negation and contrast flip the meaning of an otherwise near-identical
+# question ("why is a wireframe not useful?"), which a bag of words can't see
+NEGATION_WORDS = frozenset({
+    'not', 'no', 'never', 'cannot', 'without', 'nor', 'neither', 'but', 'except', 'unlike', 'vs',
+    'versus', 'rather', 'difference', 'compare', 'compared', 'against', 'avoid', 'wrong', 'bad',
+})
+_NEGATED_CONTRACTION = re.compile(r"n['’]t\b")
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def question_terms(question: str) -> Optional[Dict[str, int]]:
+    """
+    Normalized term counts for a question
+
+    Returns:
+        Term -> count, or None if the question can't be cached (refers to
+        earlier turns, is negated or contrastive, or has no content words)
+    """
+    question = question.lower()
+    if _NEGATED_CONTRACTION.search(question):
+        return None
+    words = [w for w in _WORD.findall(question) if len(w) > 1]
+    if not words or any(w in CONTEXT_WORDS or w in NEGATION_WORDS for w in words):
+        return None
+    terms = Counter(_stem(w) for w in words if w not in STOPWORDS)
+    return dict(terms) or None
+
+
+def _norm(terms: Dict[str, int]) -> float:
+    return math.sqrt(sum(count * count for count in terms.values()))
+
+
+@dataclass(slots=True)
+class _Entry:
+    terms: Dict[str, int]
+    norm: float
+    question: str
+    answer: str
+    created_at: float
+    hits: int = 0
+
+
+class AnswerCache:
+    """
+    Near-duplicate answer cache per (lesson, slide, prompt variant)
+
+    Questions are reduced to normalized term vectors and matched by cosine
+    similarity against the answers already given on the same slide with
+    the same system prompt. Entries expire after ttl_seconds, and all of a
+    lesson's entries are dropped when its content version changes.
+    """
+
+    def __init__(self, threshold: float = Config.ANSWER_CACHE_THRESHOLD,
+                 ttl_seconds: float = Config.ANSWER_CACHE_TTL_SECONDS,
+                 max_entries_per_slide: int = Config.ANSWER_CACHE_MAX_ENTRIES_PER_SLIDE,
+                 enabled: bool = Config.ANSWER_CACHE_ENABLED):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_slide = max(1, max_entries_per_slide)
+        self.enabled = enabled
+        self._lessons: Dict[str, Dict[Tuple[int, Hashable], List[_Entry]]] = {}
+        self._versions: Dict[str, Any] = {}
+        self._lesson_counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'lookups': 0, 'hits': 0, 'misses': 0, 'uncacheable': 0, 'stores': 0,
+                       'expired': 0, 'evicted': 0, 'invalidations': 0}
+
+    def lookup(self, lesson_id: str, slide_number: int, variant_key: Hashable, question: str,
+               content_version: Any = None) -> Optional[str]:
+        """
+        Find a cached answer to a near-duplicate question
+
+        Args:
+            lesson_id: Lesson the question was asked in
+            slide_number: Slide the learner is on
+            variant_key: Identifies the system prompt variant in use
+            question: The learner's question
+            content_version: Lesson content version; a new one drops the lesson's answers
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        terms = question_terms(question)
+        with self._lock:
+            if terms is None:
+                self._stats['uncacheable'] += 1
+                return None
+            self._check_version(lesson_id, content_version)
+            counts = self._lesson_counts.setdefault(lesson_id, {'lookups': 0, 'hits': 0})
+            counts['lookups'] += 1
+            self._stats['lookups'] += 1
+
+            entries = self._lessons.get(lesson_id, {}).get((slide_number, variant_key), [])
+            self._expire(entries)
+            norm = _norm(terms)
+            best, best_score = None, self.threshold
+            for entry in entries:
+                # Cosine similarity of the term-count vectors
+                dot = sum(count * entry.terms.get(term, 0) for term, count in terms.items())
+                score = dot / (norm * entry.norm) if dot else 0.0
+                if score >= best_score:
+                    best, best_score = entry, score
+
+            if best is None:
+                self._stats['misses'] += 1
+                return None
+            best.hits += 1
+            counts['hits'] += 1
+            self._stats['hits'] += 1
+        logger.info(f"🎯 Answer cache hit [{lesson_id} slide {slide_number}] ({best_score:.2f}): {best.question!r}")
+        return best.answer
+
+    def store(self, lesson_id: str, slide_number: int, variant_key: Hashable, question: str, answer: str,
+              content_version: Any = None) -> bool:
+        """
+        Cache the answer to a question (same arguments as lookup)
+
+        Returns:
+            True if stored (False when disabled or the question can't be cached)
+        """
+        if not self.enabled or not answer:
+            return False
+        terms = question_terms(question)
+        if terms is None:
+            return False
+        with self._lock:
+            self._check_version(lesson_id, content_version)
+            entries = self._lessons.setdefault(lesson_id, {}).setdefault((slide_number, variant_key), [])
+            self._expire(entries)
+            entries.append(_Entry(terms, _norm(terms), question, answer, time.monotonic()))
+            if len(entries) > self.max_entries_per_slide:
+                # Evict the least-hit entry, oldest first among ties
+                entries.remove(min(entries, key=lambda entry: entry.hits))
+                self._stats['evicted'] += 1
+            self._stats['stores'] += 1
+        return True
+
+    def invalidate(self, lesson_id: str) -> None:
+        """Drop every cached answer for a lesson"""
+        with self._lock:
+            self._drop_lesson(lesson_id)
+
+    def _check_version(self, lesson_id: str, content_version: Any) -> None:
+        if content_version is None:
+            return
+        if self._versions.get(lesson_id, content_version) != content_version:
+            self._drop_lesson(lesson_id)
+            logger.info(f"🧹 Answer cache cleared for {lesson_id}: content changed")
+        self._versions[lesson_id] = content_version
+
+    def _drop_lesson(self, lesson_id: str) -> None:
+        if self._lessons.pop(lesson_id, None):
+            self._stats['invalidations'] += 1
+
+    def _expire(self, entries: List[_Entry]) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        live = [entry for entry in entries if entry.created_at > cutoff]
+        if len(live) < len(entries):
+            self._stats['expired'] += len(entries) - len(live)
+            entries[:] = live
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters, overall and per-lesson hit rates"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = sum(len(entries) for slides in self._lessons.values() for entries in slides.values())
+            lessons = {lesson_id: dict(counts) for lesson_id, counts in self._lesson_counts.items()}
+        for counts in lessons.values():
+            counts['hit_rate'] = round(counts['hits'] / counts['lookups'], 3) if counts['lookups'] else 0.0
+        stats['hit_rate'] = round(stats['hits'] / stats['lookups'], 3) if stats['lookups'] else 0.0
+        stats['lessons'] = lessons
+        stats['enabled'] = self.enabled
+        stats['threshold'] = self.threshold
+        stats['ttl_seconds'] = self.ttl_seconds
+        return stats
+
+
+answer_cache = AnswerCache()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get the global answer cache"""
+    return answer_cache
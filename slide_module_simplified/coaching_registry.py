@@ -0,0 +1,187 @@
+"""
+Coaching Manager Registry
+Reuses LessonCoachingManager instances per session with LRU/TTL eviction
+"""
+
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+
+if TYPE_CHECKING:
+    from .lesson_coaching_manager import LessonCoachingManager
+
+logger = logging.getLogger(__name__)
+
+RegistryKey = Tuple[str, str]
+
+
+class _Entry:
+    """Registry slot for one manager"""
+
+    __slots__ = ('manager', 'last_used', 'size')
+
+    def __init__(self, manager: 'LessonCoachingManager'):
+        self.manager = manager
+        self.last_used = time.monotonic()
+        self.size = manager.estimated_size()
+
+
+class CoachingManagerRegistry:
+    """
+    Bounded registry of coaching managers keyed by (session owner, lesson)
+
+    Managers keep their conversation state and user profile between turns
+    instead of being rebuilt per request. Idle entries expire after
+    idle_ttl_seconds; beyond max_sessions or the memory budget the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, max_sessions: int = Config.COACHING_MAX_SESSIONS,
+                 idle_ttl_seconds: float = Config.COACHING_SESSION_TTL_SECONDS,
+                 memory_budget_mb: float = Config.COACHING_MEMORY_BUDGET_MB,
+                 factory: Optional[Callable[[str], 'LessonCoachingManager']] = None):
+        self._factory = factory
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self._entries: 'OrderedDict[RegistryKey, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'created_unregistered': 0,
+                       'evicted_lru': 0, 'evicted_ttl': 0, 'evicted_memory': 0}
+
+    @staticmethod
+    def make_key(lesson_id: str, user_id: Optional[str] = None, session_id: Optional[str] = None) -> RegistryKey:
+        """Key for a session; without user or session id the lesson's shared entry"""
+        if user_id:
+            return (f"user:{user_id}", lesson_id)
+        if session_id:
+            return (f"session:{session_id}", lesson_id)
+        return ("shared", lesson_id)
+
+    def _create(self, lesson_id: str) -> 'LessonCoachingManager':
+        if self._factory is None:
+            from .lesson_coaching_manager import LessonCoachingManager
+            self._factory = LessonCoachingManager
+        return self._factory(lesson_id)
+
+    def get(self, lesson_id: str, user_id: Optional[str] = None,
+            session_id: Optional[str] = None) -> 'LessonCoachingManager':
+        """
+        Get the session's manager, creating it on first use
+
+        Args:
+            lesson_id: Lesson being coached
+            user_id: Authenticated user, if any
+            session_id: Client session id, used when there is no user
+
+        Returns:
+            LessonCoachingManager for this session
+        """
+        key = self.make_key(lesson_id, user_id, session_id)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used = now
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry.manager
+            self._stats['misses'] += 1
+
+        # Build outside the lock; a racing request for the same key keeps the first
+        manager = self._create(lesson_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(manager)
+                self._entries[key] = entry
+                self._bytes += entry.size
+                self._evict_over_budget()
+            return entry.manager
+
+    def create_unregistered(self, lesson_id: str) -> 'LessonCoachingManager':
+        """Manager for an anonymous one-off request (shares the LLM client, keeps no state)"""
+        with self._lock:
+            self._stats['created_unregistered'] += 1
+        return self._create(lesson_id)
+
+    def touch(self, lesson_id: str, user_id: Optional[str] = None, session_id: Optional[str] = None) -> None:
+        """Re-measure an entry after a turn grew its conversation state"""
+        key = self.make_key(lesson_id, user_id, session_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            size = entry.manager.estimated_size()
+            self._bytes += size - entry.size
+            entry.size = size
+            self._evict_over_budget()
+
+    def discard(self, lesson_id: str, user_id: Optional[str] = None, session_id: Optional[str] = None) -> bool:
+        """Drop a session's manager (e.g. on logout or reset)"""
+        with self._lock:
+            entry = self._entries.pop(self.make_key(lesson_id, user_id, session_id), None)
+            if entry is None:
+                return False
+            self._bytes -= entry.size
+            return True
+
+    def peek(self, lesson_id: str, user_id: Optional[str] = None,
+             session_id: Optional[str] = None) -> Optional['LessonCoachingManager']:
+        """Existing manager for a session, without creating or refreshing it"""
+        with self._lock:
+            entry = self._entries.get(self.make_key(lesson_id, user_id, session_id))
+            return entry.manager if entry else None
+
+    def _expire(self, now: float) -> None:
+        # Entries are in LRU order, so idle ones sit at the front
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if now - entry.last_used < self.idle_ttl_seconds:
+                break
+            self._drop_oldest('evicted_ttl')
+
+    def _evict_over_budget(self) -> None:
+        while len(self._entries) > self.max_sessions:
+            self._drop_oldest('evicted_lru')
+        while len(self._entries) > 1 and self._bytes > self.memory_budget_bytes:
+            self._drop_oldest('evicted_memory')
+
+    def _drop_oldest(self, reason: str) -> None:
+        key, entry = self._entries.popitem(last=False)
+        self._bytes -= entry.size
+        self._stats[reason] += 1
+        logger.debug(f"🧹 Evicted coaching manager {key} ({reason})")
+
+    def status(self) -> Dict[str, Any]:
+        """Per-session manager status for debug endpoints"""
+        with self._lock:
+            entries = list(self._entries.items())
+        return {f"{owner}/{lesson_id}": entry.manager.get_status() for (owner, lesson_id), entry in entries}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            stats = dict(self._stats)
+            stats['sessions'] = len(self._entries)
+            stats['estimated_bytes'] = self._bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['max_sessions'] = self.max_sessions
+        stats['idle_ttl_seconds'] = self.idle_ttl_seconds
+        stats['memory_budget_bytes'] = self.memory_budget_bytes
+        return stats
+
+
+coaching_registry = CoachingManagerRegistry()
+
+
+def get_coaching_registry() -> CoachingManagerRegistry:
+    """Get the global coaching manager registry"""
+    return coaching_registry
@@ -0,0 +1,220 @@
+"""
+Context Window
+Token-budgeted conversation history for LLM calls, driven by TokenSettings
+"""
+
+import threading
+import time
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from .database.slide_context import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Role and framing tokens the API adds per chat message
+MESSAGE_OVERHEAD_TOKENS = 4
+# Smallest useful remainder of a clipped message
+MIN_CLIP_TOKENS = 32
+TRUNCATION_MARKER = " …"
+
+
+def history_tokens_for_level(level: str) -> int:
+    """History token budget for a token_optimization_level"""
+    return {
+        'aggressive': Config.CONTEXT_TOKENS_AGGRESSIVE,
+        'minimal': Config.CONTEXT_TOKENS_MINIMAL,
+    }.get(level, Config.CONTEXT_TOKENS_BALANCED)
+
+
+@dataclass(frozen=True)
+class ContextBudget:
+    """Prompt limits from TokenSettings (defaults match the model's column defaults)"""
+    level: str = 'balanced'
+    history_tokens: int = Config.CONTEXT_TOKENS_BALANCED
+    max_messages: int = 5           # Prior messages kept, excluding the current input
+    system_prompt_tokens: int = 250  # max_system_prompt_length (chars) in tokens
+    pruning: bool = True
+    summarization: bool = True
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> 'ContextBudget':
+        """
+        Budget for a TokenSettings row
+
+        Args:
+            settings: TokenSettings (or any object with its fields); None for defaults
+        """
+        if settings is None:
+            return cls()
+        level = (settings.token_optimization_level or 'balanced').lower()
+        max_messages = settings.max_conversation_history
+        max_prompt_chars = settings.max_system_prompt_length
+        return cls(
+            level=level,
+            history_tokens=history_tokens_for_level(level),
+            max_messages=cls.max_messages if max_messages is None else max(0, int(max_messages)),
+            system_prompt_tokens=cls.system_prompt_tokens if max_prompt_chars is None else max(0, int(max_prompt_chars)) // 4,
+            pruning=cls.pruning if settings.enable_context_pruning is None else bool(settings.enable_context_pruning),
+            summarization=(cls.summarization if settings.enable_context_summarization is None
+                           else bool(settings.enable_context_summarization))
+        )
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return count_tokens(message.get('content') or '') + MESSAGE_OVERHEAD_TOKENS
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, marking the cut"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    max_tokens = max(1, max_tokens - count_tokens(TRUNCATION_MARKER))
+    end = len(text) * max_tokens // max(1, count_tokens(text))
+    while end > 0 and count_tokens(text[:end]) > max_tokens:
+        end = end * 9 // 10
+    return text[:end].rstrip() + TRUNCATION_MARKER
+
+
+class ContextWindow:
+    """
+    Selects the conversation history sent with each LLM call
+
+    Walks back from the newest message, keeping whole messages while they
+    fit the token budget and clipping the one that crosses it, so prompt
+    size stays bounded however long individual messages are.
+
+    Admin edits are applied directly in the worker that handles them; with
+    a settings loader (watch_settings) every other worker re-reads the
+    TokenSettings row at most every revalidate_seconds and adopts the new
+    budget when it changed.
+    """
+
+    def __init__(self, budget: ContextBudget = None,
+                 revalidate_seconds: float = Config.CONTEXT_SETTINGS_REVALIDATE_SECONDS):
+        self._budget = budget or ContextBudget()
+        self.revalidate_seconds = revalidate_seconds
+        self._load_settings: Optional[Callable[[], Any]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stats = {'calls': 0, 'messages_dropped': 0, 'messages_clipped': 0, 'history_tokens': 0,
+                       'settings_reloads': 0}
+
+    @property
+    def budget(self) -> ContextBudget:
+        """The current budget, re-read from TokenSettings when the last check is stale"""
+        if self._load_settings is not None and time.monotonic() - self._checked_at >= self.revalidate_seconds:
+            self._refresh()
+        return self._budget
+
+    def watch_settings(self, load_settings: Callable[[], Any]) -> ContextBudget:
+        """
+        Keep the budget in sync with the stored TokenSettings row
+
+        Args:
+            load_settings: Returns the current TokenSettings row (or None);
+                called from request threads, so it must open its own app context
+
+        Returns:
+            The budget from the row as it is now
+        """
+        self._load_settings = load_settings
+        return self.apply_settings(load_settings())
+
+    def apply_settings(self, settings: Any) -> ContextBudget:
+        """Adopt a TokenSettings row (at startup and after admin edits)"""
+        self._budget = ContextBudget.from_settings(settings)
+        self._checked_at = time.monotonic()
+        logger.info(f"🪟 Context budget: {self._budget}")
+        return self._budget
+
+    def _refresh(self) -> None:
+        # One thread re-reads; the others keep using the current budget meanwhile
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            budget = ContextBudget.from_settings(self._load_settings())
+            if budget != self._budget:
+                self._budget = budget
+                with self._lock:
+                    self._stats['settings_reloads'] += 1
+                logger.info(f"🪟 Context budget changed in TokenSettings: {budget}")
+        except Exception as e:
+            logger.error(f"❌ Failed to re-read token settings, keeping the current budget: {e}")
+        finally:
+            self._checked_at = time.monotonic()
+            self._refresh_lock.release()
+
+    def fit(self, history: List[Dict[str, str]], system_tokens: int = 0) -> List[Dict[str, str]]:
+        """
+        History that fits the budget
+
+        Args:
+            history: Conversation messages ending with the current user input,
+                which is always kept (clipped if it alone exceeds the budget)
+            system_tokens: Tokens in the system prompt; whatever exceeds
+                max_system_prompt_length comes out of the history budget
+
+        Returns:
+            Messages to send, oldest first
+        """
+        if not history:
+            return []
+        budget = self.budget
+        current, older = history[-1], history[:-1]
+        candidates = older[len(older) - budget.max_messages:] if budget.max_messages else []
+        dropped = len(older) - len(candidates)
+        clipped = 0
+
+        if not budget.pruning:
+            selected = candidates + [current]
+        else:
+            remaining = budget.history_tokens - max(0, system_tokens - budget.system_prompt_tokens)
+            remaining = max(remaining, MIN_CLIP_TOKENS + MESSAGE_OVERHEAD_TOKENS)
+            cost = message_tokens(current)
+            if cost > remaining:
+                current = {**current, 'content': clip_to_tokens(current['content'], remaining - MESSAGE_OVERHEAD_TOKENS)}
+                clipped += 1
+                cost = message_tokens(current)
+            remaining -= cost
+
+            kept = []
+            for message in reversed(candidates):
+                cost = message_tokens(message)
+                if cost <= remaining:
+                    kept.append(message)
+                    remaining -= cost
+                    continue
+                # Keep history contiguous: clip the boundary message, drop the rest
+                if remaining - MESSAGE_OVERHEAD_TOKENS >= MIN_CLIP_TOKENS:
+                    kept.append({**message, 'content': clip_to_tokens(message['content'],
+                                                                     remaining - MESSAGE_OVERHEAD_TOKENS)})
+                    clipped += 1
+                break
+            dropped += len(candidates) - len(kept)
+            selected = kept[::-1] + [current]
+
+        with self._lock:
+            self._stats['calls'] += 1
+            self._stats['messages_dropped'] += dropped
+            self._stats['messages_clipped'] += clipped
+            self._stats['history_tokens'] += sum(message_tokens(m) for m in selected)
+        return selected
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['avg_history_tokens'] = round(stats['history_tokens'] / stats['calls'], 1) if stats['calls'] else 0.0
+        stats['budget'] = asdict(self._budget)
+        return stats
+
+
+context_window = ContextWindow()
+
+
+def get_context_window() -> ContextWindow:
+    """Get the global context window"""
+    return context_window
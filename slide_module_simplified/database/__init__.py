@@ -1,5 +1,7 @@
 # Database module exports
-from .models import init_database, get_db_connection
+from .models import init_database, get_db_connection, check_database_health
+from .connection import get_connection_manager, get_connection_stats
+from .lesson_cache import LessonCache, lesson_cache
 from .lesson_manager import LessonManager, generate_lesson_id
 from .session_manager import SessionManager
 from .content_parser import ContentParser
@@ -16,6 +18,11 @@ __all__ = [
     'DATABASE_AVAILABLE',
     'init_database',
     'get_db_connection', 
+    'check_database_health',
+    'get_connection_manager',
+    'get_connection_stats',
+    'LessonCache',
+    'lesson_cache',
     'LessonManager',
     'SessionManager',
     'ContentParser',
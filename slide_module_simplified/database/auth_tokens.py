@@ -0,0 +1,236 @@
+"""
+Signed Auth Tokens
+Stateless HMAC-signed tokens with key rotation and per-user revocation epochs
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+TOKEN_VERSION = "v1"
+AUTH_TOKEN_TTL_DAYS = int(os.getenv("AUTH_TOKEN_TTL_DAYS", "30"))
+# "kid:secret,kid:secret" - the first key signs, the rest still verify.
+# Without it, keys are generated once and shared through the database.
+AUTH_TOKEN_KEYS = os.getenv("AUTH_TOKEN_KEYS", "")
+# How stale another worker's view of a revocation may be
+AUTH_EPOCH_REFRESH_SECONDS = float(os.getenv("AUTH_EPOCH_REFRESH_SECONDS", "5"))
+_KEY_RELOAD_INTERVAL = 5.0
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def is_signed_token(token: str) -> bool:
+    """Whether token uses the signed format (vs. a legacy opaque token)"""
+    return token.startswith(TOKEN_VERSION + ".") and token.count(".") == 3
+
+
+def create_auth_token_tables(cursor) -> None:
+    """Create the signing-key and revocation-epoch tables"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS auth_signing_keys (
+            kid TEXT PRIMARY KEY,
+            secret TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS auth_revocation_epochs (
+            user_id TEXT PRIMARY KEY,
+            epoch INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+class TokenSigner:
+    """
+    HMAC-SHA256 token signer with a rotating key set
+
+    Tokens look like v1.<kid>.<payload>.<signature>; the key id lets old
+    tokens keep verifying after the signing key is rotated.
+    """
+
+    def __init__(self, configured_keys: str = AUTH_TOKEN_KEYS):
+        self._configured = self._parse_keys(configured_keys)
+        self._lock = threading.Lock()
+        self._keys: Dict[str, bytes] = {}
+        self._signing_kid: Optional[str] = None
+        self._loaded_at = 0.0
+
+    @staticmethod
+    def _parse_keys(spec: str) -> List[Tuple[str, bytes]]:
+        keys = []
+        for entry in spec.split(','):
+            if ':' in entry:
+                kid, secret = entry.strip().split(':', 1)
+                keys.append((kid, secret.encode()))
+        return keys
+
+    def _load(self) -> None:
+        if self._configured:
+            keys = self._configured
+        else:
+            conn = get_db_connection()
+            try:
+                rows = conn.execute(
+                    'SELECT kid, secret FROM auth_signing_keys ORDER BY created_at DESC, rowid DESC'
+                ).fetchall()
+                if not rows:
+                    # INSERT OR IGNORE keeps concurrent workers on one key
+                    conn.execute('INSERT OR IGNORE INTO auth_signing_keys (kid, secret) VALUES (?, ?)',
+                                 ('k1', secrets.token_hex(32)))
+                    conn.commit()
+                    rows = conn.execute(
+                        'SELECT kid, secret FROM auth_signing_keys ORDER BY created_at DESC, rowid DESC'
+                    ).fetchall()
+            finally:
+                conn.close()
+            keys = [(row[0], row[1].encode()) for row in rows]
+
+        with self._lock:
+            self._keys = dict(keys)
+            self._signing_kid = keys[0][0]
+            self._loaded_at = time.monotonic()
+
+    def _key(self, kid: str) -> Optional[bytes]:
+        if self._signing_kid is None:
+            self._load()
+        key = self._keys.get(kid)
+        if key is None and not self._configured and time.monotonic() - self._loaded_at > _KEY_RELOAD_INTERVAL:
+            self._load()  # Another worker may have rotated keys
+            key = self._keys.get(kid)
+        return key
+
+    def sign(self, payload: Dict[str, Any]) -> str:
+        if self._signing_kid is None:
+            self._load()
+        kid = self._signing_kid
+        body = _b64encode(json.dumps(payload, separators=(',', ':')).encode())
+        signing_input = f"{TOKEN_VERSION}.{kid}.{body}"
+        signature = hmac.new(self._keys[kid], signing_input.encode(), hashlib.sha256).digest()
+        return f"{signing_input}.{_b64encode(signature)}"
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the payload if the signature is valid (expiry is not checked here)"""
+        try:
+            version, kid, body, signature = token.split('.')
+        except ValueError:
+            return None
+        if version != TOKEN_VERSION:
+            return None
+        key = self._key(kid)
+        if key is None:
+            return None
+        expected = hmac.new(key, f"{version}.{kid}.{body}".encode(), hashlib.sha256).digest()
+        try:
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                return None
+            return json.loads(_b64decode(body))
+        except (ValueError, TypeError):
+            return None
+
+    def rotate(self, keep: int = 2) -> str:
+        """
+        Start signing with a new database key, keeping the newest `keep` keys
+
+        Returns:
+            The new key id
+        """
+        if self._configured:
+            raise RuntimeError("Signing keys come from AUTH_TOKEN_KEYS; rotate them there")
+        kid = f"k{int(time.time())}{secrets.token_hex(2)}"
+        conn = get_db_connection()
+        try:
+            conn.execute('INSERT INTO auth_signing_keys (kid, secret) VALUES (?, ?)', (kid, secrets.token_hex(32)))
+            conn.execute('''
+                DELETE FROM auth_signing_keys WHERE kid NOT IN (
+                    SELECT kid FROM auth_signing_keys ORDER BY created_at DESC, rowid DESC LIMIT ?
+                )
+            ''', (max(keep, 1),))
+            conn.commit()
+        finally:
+            conn.close()
+        self._load()
+        logger.info(f"🔑 Rotated auth signing key to {kid}")
+        return kid
+
+
+class RevocationEpochs:
+    """
+    Per-user revocation epochs, cached in memory
+
+    A token is valid only while its epoch is at least the user's current
+    epoch; bumping the epoch revokes every token issued before. The whole
+    (small) table is reloaded at most every refresh_seconds, so verifying a
+    token normally touches no database.
+    """
+
+    def __init__(self, refresh_seconds: float = AUTH_EPOCH_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._epochs: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._stats = {'refreshes': 0, 'bumps': 0}
+
+    def _refresh(self) -> None:
+        conn = get_db_connection()
+        try:
+            epochs = {row[0]: row[1] for row in conn.execute('SELECT user_id, epoch FROM auth_revocation_epochs')}
+        finally:
+            conn.close()
+        with self._lock:
+            self._epochs = epochs
+            self._loaded_at = time.monotonic()
+            self._stats['refreshes'] += 1
+
+    def current(self, user_id: str) -> int:
+        """Cached epoch for user_id (0 if never revoked)"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._refresh()
+        return self._epochs.get(user_id, 0)
+
+    @staticmethod
+    def read(cursor, user_id: str) -> int:
+        """Authoritative epoch, read inside a write transaction (used when issuing)"""
+        row = cursor.execute('SELECT epoch FROM auth_revocation_epochs WHERE user_id = ?', (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, cursor, user_id: str) -> int:
+        """
+        Revoke all of a user's tokens (call in the write's transaction)
+
+        Returns:
+            The new epoch
+        """
+        cursor.execute('''
+            INSERT INTO auth_revocation_epochs (user_id, epoch, updated_at) VALUES (?, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT(user_id) DO UPDATE SET epoch = epoch + 1, updated_at = CURRENT_TIMESTAMP
+        ''', (user_id,))
+        epoch = self.read(cursor, user_id)
+        with self._lock:
+            self._epochs[user_id] = epoch
+            self._stats['bumps'] += 1
+        return epoch
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_users'] = len(self._epochs)
+        stats['refresh_seconds'] = self.refresh_seconds
+        return stats
@@ -0,0 +1,239 @@
+"""
+SQLite Connection Manager
+Reuses one tuned connection per thread instead of reconnecting per query
+"""
+import os
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pragmas applied once per connection (WAL and mmap persist for the file)
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE_MB = int(os.getenv("DB_MMAP_SIZE_MB", "128"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+
+class ManagedConnection:
+    """
+    Handle to the calling thread's persistent connection
+
+    Behaves like sqlite3.Connection, except that close() returns the
+    connection to its thread instead of closing it. Work that was not
+    committed when the outermost handle is released is rolled back, just
+    as closing a real connection would discard it.
+
+    Nested handles (acquired while the thread's connection is already in
+    use) share the outer caller's transaction. If that transaction is open,
+    the nested handle works inside a savepoint: its commit() only folds its
+    work into the outer transaction, its rollback() undoes only its own
+    work, and nothing reaches the database until the outermost caller
+    commits.
+    """
+
+    __slots__ = ('_conn', '_manager', '_released', '_savepoint')
+
+    def __init__(self, conn: sqlite3.Connection, manager: 'ConnectionManager',
+                 savepoint: Optional[str] = None):
+        self._conn = conn
+        self._manager = manager
+        self._released = False
+        self._savepoint = savepoint
+        if savepoint is not None:
+            conn.execute(f"SAVEPOINT {savepoint}")
+
+    def commit(self) -> None:
+        if self._savepoint is None:
+            self._conn.commit()
+            return
+        # Keep the work in the outer transaction and start a fresh savepoint
+        self._conn.execute(f"RELEASE SAVEPOINT {self._savepoint}")
+        self._conn.execute(f"SAVEPOINT {self._savepoint}")
+
+    def rollback(self) -> None:
+        if self._savepoint is None:
+            self._conn.rollback()
+            return
+        self._conn.execute(f"ROLLBACK TO SAVEPOINT {self._savepoint}")
+
+    def close(self) -> None:
+        if not self._released:
+            self._released = True
+            if self._savepoint is not None:
+                try:
+                    # Hand any remaining work to the outer transaction
+                    self._conn.execute(f"RELEASE SAVEPOINT {self._savepoint}")
+                except sqlite3.Error:
+                    pass  # The outer caller already ended its transaction
+            self._manager._release(self._conn)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __enter__(self) -> 'ManagedConnection':
+        if self._savepoint is None:
+            self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if self._savepoint is None:
+            return self._conn.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def __del__(self):
+        # Handles dropped without close() (early returns, exceptions)
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionManager:
+    """
+    Thread-local pool of persistent SQLite connections
+
+    Each thread keeps one connection configured for WAL, synchronous=NORMAL,
+    memory-mapped reads, a larger page cache and a busy timeout. sqlite3's
+    per-connection prepared-statement cache (cached_statements) only pays
+    off because connections now live across calls.
+    """
+
+    def __init__(self, busy_timeout_ms: int = DB_BUSY_TIMEOUT_MS, cache_size_kb: int = DB_CACHE_SIZE_KB,
+                 mmap_size_mb: int = DB_MMAP_SIZE_MB, statement_cache_size: int = DB_STATEMENT_CACHE_SIZE):
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size_mb = mmap_size_mb
+        self.statement_cache_size = statement_cache_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'reused': 0, 'closed': 0, 'rolled_back_on_release': 0}
+        self._open_connections = 0
+
+    def acquire(self, db_path: str) -> ManagedConnection:
+        """
+        Get a handle to this thread's connection for db_path
+
+        Args:
+            db_path: SQLite database file
+
+        Returns:
+            ManagedConnection; call close() when done, as before
+        """
+        local = self._local
+        conn = getattr(local, 'conn', None)
+
+        # Never share a connection with a forked child or across databases
+        if conn is not None and (local.pid != os.getpid() or local.db_path != db_path):
+            self._discard(conn)
+            conn = None
+
+        if conn is None:
+            conn = self._open(db_path)
+            local.conn, local.db_path, local.pid, local.depth = conn, db_path, os.getpid(), 0
+        else:
+            with self._lock:
+                self._stats['reused'] += 1
+            if local.depth == 0 and conn.in_transaction:
+                # Left over from a caller that never finished its transaction
+                conn.rollback()
+
+        # A nested handle must not commit or roll back the outer caller's transaction
+        savepoint = f"nested_{local.depth}" if local.depth > 0 and conn.in_transaction else None
+        local.depth += 1
+        return ManagedConnection(conn, self, savepoint)
+
+    def _open(self, db_path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(db_path, timeout=self.busy_timeout_ms / 1000,
+                               cached_statements=self.statement_cache_size)
+        conn.row_factory = sqlite3.Row  # Access columns by name
+        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ Could not enable WAL for {db_path}: {e}")
+        conn.execute("PRAGMA synchronous = NORMAL")  # Safe with WAL; fsync at checkpoints only
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size_mb) * 1024 * 1024}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        with self._lock:
+            self._stats['opened'] += 1
+            self._open_connections += 1
+        logger.info(f"🗄️ Opened SQLite connection for thread {threading.current_thread().name}")
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        local = self._local
+        if getattr(local, 'conn', None) is not conn:
+            return  # Connection was replaced (fork, path change, close_thread_connection)
+        local.depth = max(0, local.depth - 1)
+        if local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+            with self._lock:
+                self._stats['rolled_back_on_release'] += 1
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        self._local.conn = None
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._stats['closed'] += 1
+            self._open_connections -= 1
+
+    def close_thread_connection(self) -> None:
+        """
+        Close the calling thread's connection
+
+        Call it when a thread is done with the database: before a worker
+        exits, and on request teardown under servers that start a thread
+        per request (threads are not reused, so neither are connections).
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._discard(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection open/reuse counters and the active settings"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open_connections'] = self._open_connections
+        total = stats['opened'] + stats['reused']
+        stats['reuse_rate'] = round(stats['reused'] / total, 3) if total else 0.0
+        stats['settings'] = {
+            'journal_mode': 'wal',
+            'synchronous': 'normal',
+            'busy_timeout_ms': self.busy_timeout_ms,
+            'cache_size_kb': self.cache_size_kb,
+            'mmap_size_mb': self.mmap_size_mb,
+            'statement_cache_size': self.statement_cache_size
+        }
+        return stats
+
+
+_connection_manager: Optional[ConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_connection_manager() -> ConnectionManager:
+    """Get the process-wide connection manager"""
+    global _connection_manager
+    if _connection_manager is None:
+        with _manager_lock:
+            if _connection_manager is None:
+                _connection_manager = ConnectionManager()
+    return _connection_manager
+
+
+def get_connection_stats() -> Dict[str, Any]:
+    """Connection counters for health/debug endpoints"""
+    return get_connection_manager().get_stats()
@@ -0,0 +1,220 @@
+"""
+Conversation Store
+Server-held chat history per coaching session, appended one turn at a time
+"""
+import os
+import sqlite3
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Messages kept per conversation; older ones are pruned as turns are appended
+CONVERSATION_MAX_MESSAGES = int(os.getenv("CONVERSATION_MAX_MESSAGES", "40"))
+
+_ROLES = ('user', 'assistant', 'system')
+
+
+def create_conversation_table(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the conversation_messages and conversation_summaries tables
+
+    One row per message, clustered by (conversation_id, seq), so a turn
+    appends two small rows instead of rewriting the whole history. The
+    rolling summary of older turns is kept next to the messages.
+
+    Args:
+        cursor: Cursor inside init_database()'s transaction
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS conversation_messages (
+            conversation_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            PRIMARY KEY (conversation_id, seq)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS conversation_summaries (
+            conversation_id TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            through_seq INTEGER NOT NULL
+        )
+    ''')
+
+
+def clean_messages(messages: Iterable) -> List[Dict[str, str]]:
+    """Keep well-formed {'role', 'content'} messages from client-supplied history"""
+    cleaned = []
+    for message in messages or []:
+        if not isinstance(message, dict):
+            continue
+        role = message.get('role')
+        content = message.get('content')
+        if role in _ROLES and isinstance(content, str):
+            cleaned.append({'role': role, 'content': content})
+    return cleaned
+
+
+class ConversationStore:
+    """
+    Persistent conversation history keyed by conversation id
+
+    Every message gets a per-conversation sequence number that only grows,
+    including across resyncs, so a client's last-seen seq identifies exactly
+    which server history it has.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_messages: int = CONVERSATION_MAX_MESSAGES):
+        self._connect = connect
+        self.max_messages = max(2, max_messages)
+        self._lock = threading.Lock()
+        self._stats = {'loads': 0, 'appended': 0, 'resyncs': 0, 'summaries_saved': 0}
+
+    def load(self, conversation_id: str) -> Tuple[int, List[Dict[str, str]]]:
+        """
+        Load a conversation
+
+        Returns:
+            (last seq, messages oldest first); (0, []) for a new conversation
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                SELECT seq, role, content FROM conversation_messages
+                WHERE conversation_id = ? ORDER BY seq
+            ''', (conversation_id,)).fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            self._stats['loads'] += 1
+        if not rows:
+            return 0, []
+        return rows[-1][0], [{'role': role, 'content': content} for _, role, content in rows]
+
+    def load_summary(self, conversation_id: str) -> Tuple[str, int]:
+        """
+        Load a conversation's rolling summary
+
+        Returns:
+            (summary, seq of the last message it covers); ("", 0) if none
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT summary, through_seq FROM conversation_summaries WHERE conversation_id = ?',
+                (conversation_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return (row[0], row[1]) if row else ("", 0)
+
+    def save_summary(self, conversation_id: str, summary: str, through_seq: int) -> None:
+        """Store the rolling summary covering messages up to through_seq"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO conversation_summaries (conversation_id, summary, through_seq) VALUES (?, ?, ?)
+                ON CONFLICT(conversation_id) DO UPDATE SET summary = excluded.summary, through_seq = excluded.through_seq
+            ''', (conversation_id, summary, through_seq))
+            conn.commit()
+        finally:
+            conn.close()
+        with self._lock:
+            self._stats['summaries_saved'] += 1
+
+    def last_seq(self, conversation_id: str) -> int:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT MAX(seq) FROM conversation_messages WHERE conversation_id = ?', (conversation_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] or 0
+
+    def append(self, conversation_id: str, messages: List[Dict[str, str]]) -> int:
+        """
+        Append messages after the conversation's last seq
+
+        Returns:
+            Seq of the last message now stored
+        """
+        with self._lock:
+            self._stats['appended'] += len(messages)
+        return self._write(conversation_id, messages, replace=False)
+
+    def replace(self, conversation_id: str, messages: List[Dict[str, str]]) -> int:
+        """
+        Replace a conversation with a client's copy (resync)
+
+        Returns:
+            Seq of the last message now stored
+        """
+        with self._lock:
+            self._stats['resyncs'] += 1
+        return self._write(conversation_id, messages, replace=True)
+
+    def _write(self, conversation_id: str, messages: List[Dict[str, str]], replace: bool) -> int:
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            # Take the write lock before reading MAX(seq), so concurrent appends to
+            # one conversation (two tabs, chat + chat-stream) serialize instead of
+            # computing the same seq
+            if not conn.in_transaction:
+                cursor.execute('BEGIN IMMEDIATE')
+            last = cursor.execute(
+                'SELECT MAX(seq) FROM conversation_messages WHERE conversation_id = ?', (conversation_id,)
+            ).fetchone()[0] or 0
+            if replace:
+                cursor.execute('DELETE FROM conversation_messages WHERE conversation_id = ?', (conversation_id,))
+            messages = messages[-self.max_messages:]
+            cursor.executemany('''
+                INSERT INTO conversation_messages (conversation_id, seq, role, content)
+                VALUES (?, ?, ?, ?)
+            ''', [(conversation_id, last + n, m['role'], m['content']) for n, m in enumerate(messages, 1)])
+            last += len(messages)
+            cursor.execute(
+                'DELETE FROM conversation_messages WHERE conversation_id = ? AND seq <= ?',
+                (conversation_id, last - self.max_messages)
+            )
+            conn.commit()
+            return last
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def delete(self, conversation_id: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM conversation_messages WHERE conversation_id = ?', (conversation_id,))
+            conn.execute('DELETE FROM conversation_summaries WHERE conversation_id = ?', (conversation_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['max_messages'] = self.max_messages
+        return stats
+
+
+_conversation_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """Get the process-wide conversation store"""
+    global _conversation_store
+    if _conversation_store is None:
+        with _store_lock:
+            if _conversation_store is None:
+                from .models import get_db_connection
+                _conversation_store = ConversationStore(get_db_connection)
+    return _conversation_store
@@ -0,0 +1,142 @@
+"""
+Lesson Content Cache
+Read-through, in-process cache of immutable lesson snapshots
+"""
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How long a snapshot is served before its version is rechecked in SQLite.
+# Writes in this process invalidate immediately; this bounds staleness of
+# writes made by other worker processes.
+LESSON_CACHE_REVALIDATE_SECONDS = float(os.getenv("LESSON_CACHE_REVALIDATE_SECONDS", "1.0"))
+LESSON_CACHE_MAX_LESSONS = int(os.getenv("LESSON_CACHE_MAX_LESSONS", "256"))
+
+
+class LessonSnapshot:
+    """Immutable view of one lesson (metadata, slides, compiled contexts) at a content version"""
+
+    __slots__ = ('lesson_id', 'version', 'lesson', 'slides', '_by_number', '_contexts', 'checked_at')
+
+    def __init__(self, lesson_id: str, version: int, lesson: Dict[str, Any], slides: List[Dict[str, Any]],
+                 contexts: Optional[List[Dict[str, Any]]] = None):
+        self.lesson_id = lesson_id
+        self.version = version
+        self.lesson: Mapping[str, Any] = MappingProxyType(dict(lesson))
+        self.slides: Tuple[Mapping[str, Any], ...] = tuple(MappingProxyType(dict(slide)) for slide in slides)
+        self._by_number = {slide['slide_number']: slide for slide in self.slides}
+        self._contexts = {ctx['slide_number']: MappingProxyType(dict(ctx)) for ctx in contexts or ()}
+        self.checked_at = time.monotonic()
+
+    def lesson_dict(self) -> Dict[str, Any]:
+        """Lesson metadata with slides, as a fresh (mutable) dict"""
+        lesson = dict(self.lesson)
+        lesson['slides'] = self.slides_list()
+        return lesson
+
+    def slides_list(self) -> List[Dict[str, Any]]:
+        return [dict(slide) for slide in self.slides]
+
+    def slide(self, slide_number: int) -> Optional[Dict[str, Any]]:
+        slide = self._by_number.get(slide_number)
+        return dict(slide) if slide is not None else None
+
+    def slide_context(self, slide_number: int) -> Optional[Mapping[str, Any]]:
+        """Compiled context for a slide (read-only; the context string needs no copy)"""
+        return self._contexts.get(slide_number)
+
+
+class LessonCache:
+    """
+    Version-checked LRU cache of lesson snapshots
+
+    Each lessons row carries a content_version that every write takes from
+    a global counter in the same transaction, so versions are never reused,
+    even when a lesson is deleted and re-imported under the same id. A
+    cached snapshot is served without touching the database for
+    revalidate_seconds, then kept only if its version still matches a
+    primary-key lookup, so all workers converge on the published content.
+    """
+
+    def __init__(self, revalidate_seconds: float = LESSON_CACHE_REVALIDATE_SECONDS,
+                 max_lessons: int = LESSON_CACHE_MAX_LESSONS):
+        self.revalidate_seconds = revalidate_seconds
+        self.max_lessons = max_lessons
+        self._entries: 'OrderedDict[str, LessonSnapshot]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'loads': 0, 'invalidations': 0}
+
+    def get(self, lesson_id: str, read_version: Callable[[str], Optional[int]],
+            load: Callable[[str], Optional[LessonSnapshot]]) -> Optional[LessonSnapshot]:
+        """
+        Get the current snapshot for a lesson, loading it on a miss
+
+        Args:
+            lesson_id: Lesson to look up
+            read_version: Returns the lesson's stored content_version (None if deleted)
+            load: Reads a fresh snapshot from the database (None if missing)
+
+        Returns:
+            LessonSnapshot, or None if the lesson does not exist
+        """
+        with self._lock:
+            snapshot = self._entries.get(lesson_id)
+            if snapshot is not None and time.monotonic() - snapshot.checked_at < self.revalidate_seconds:
+                self._entries.move_to_end(lesson_id)
+                self._stats['hits'] += 1
+                return snapshot
+
+        if snapshot is not None:
+            version = read_version(lesson_id)
+            if version == snapshot.version:
+                with self._lock:
+                    snapshot.checked_at = time.monotonic()
+                    self._stats['revalidated'] += 1
+                return snapshot
+            if version is None:
+                self.invalidate(lesson_id)
+                return None
+
+        snapshot = load(lesson_id)
+        with self._lock:
+            self._stats['loads'] += 1
+            if snapshot is None:
+                self._entries.pop(lesson_id, None)
+                return None
+            current = self._entries.get(lesson_id)
+            # A concurrent loader may already hold a newer version
+            if current is None or current.version <= snapshot.version:
+                self._entries[lesson_id] = snapshot
+                self._entries.move_to_end(lesson_id)
+                while len(self._entries) > self.max_lessons:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, lesson_id: str) -> None:
+        """Drop a lesson after a write in this process"""
+        with self._lock:
+            if self._entries.pop(lesson_id, None) is not None:
+                self._stats['invalidations'] += 1
+        logger.debug(f"🧹 Lesson cache invalidated: {lesson_id}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['lessons'] = len(self._entries)
+        reads = stats['hits'] + stats['revalidated'] + stats['loads']
+        stats['hit_rate'] = round((stats['hits'] + stats['revalidated']) / reads, 3) if reads else 0.0
+        stats['revalidate_seconds'] = self.revalidate_seconds
+        return stats
+
+
+lesson_cache = LessonCache()
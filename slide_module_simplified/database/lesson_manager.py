@@ -8,7 +8,10 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 import os
 
-from .models import get_db_connection, json_serialize, json_deserialize
+from .models import get_db_connection, json_serialize, json_deserialize, next_content_version
+from .lesson_cache import LessonSnapshot, lesson_cache
+from . import search_index
+from .slide_context import compile_slide_context, store_slide_contexts
 from .content_parser import ContentParser, ParsedLesson
 
 logger = logging.getLogger(__name__)
@@ -60,15 +63,16 @@ class LessonManager:
                 # Insert lesson record
                 cursor.execute('''
                     INSERT OR REPLACE INTO lessons 
-                    (id, title, description, slide_count, is_published, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    (id, title, description, slide_count, is_published, updated_at, content_version)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     lesson_id,
                     parsed_lesson.title,
                     parsed_lesson.description,
                     parsed_lesson.total_slides,
                     publish,
-                    datetime.now()
+                    datetime.now(),
+                    next_content_version(cursor)
                 ))
                 
                 # Delete existing slides for this lesson
@@ -88,8 +92,18 @@ class LessonManager:
                         slide.notes
                     ))
                 
+                slide_rows = [(s.slide_number, s.title, s.content, s.notes) for s in parsed_lesson.slides]
+                search_index.index_lesson(
+                    cursor, lesson_id, parsed_lesson.title, parsed_lesson.description, slide_rows
+                )
+                
+                # Render each slide's coaching context once, here, not per chat turn
+                context_tokens = store_slide_contexts(cursor, lesson_id, slide_rows)
+                
                 conn.commit()
-                logger.info(f"📚 Created lesson '{lesson_id}' with {parsed_lesson.total_slides} slides")
+                lesson_cache.invalidate(lesson_id)
+                logger.info(f"📚 Created lesson '{lesson_id}' with {parsed_lesson.total_slides} slides "
+                            f"({context_tokens} context tokens)")
                 
                 return {
                     "success": True,
@@ -116,13 +130,47 @@ class LessonManager:
     def get_lesson(self, lesson_id: str) -> Optional[Dict[str, Any]]:
         """Get lesson metadata and slides"""
         try:
-            conn = get_db_connection()
+            snapshot = self._get_snapshot(lesson_id)
+            return snapshot.lesson_dict() if snapshot else None
+            
+        except Exception as e:
+            logger.error(f"Failed to get lesson {lesson_id}: {e}")
+            return None
+    
+    def _get_snapshot(self, lesson_id: str) -> Optional[LessonSnapshot]:
+        """Get the lesson's cached snapshot, reading through to SQLite when stale"""
+        return lesson_cache.get(lesson_id, self._read_content_version, self._load_snapshot)
+    
+    def get_content_version(self, lesson_id: str) -> Optional[int]:
+        """Content version of the lesson (bumped by every write), or None if missing"""
+        try:
+            snapshot = self._get_snapshot(lesson_id)
+            return snapshot.version if snapshot else None
+            
+        except Exception as e:
+            logger.error(f"Failed to get content version for {lesson_id}: {e}")
+            return None
+    
+    @staticmethod
+    def _read_content_version(lesson_id: str) -> Optional[int]:
+        conn = get_db_connection()
+        try:
+            row = conn.execute('SELECT content_version FROM lessons WHERE id = ?', (lesson_id,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _load_snapshot(lesson_id: str) -> Optional[LessonSnapshot]:
+        conn = get_db_connection()
+        try:
             cursor = conn.cursor()
             
-            # Get lesson metadata
+            # Read the version first: a concurrent write can only make the
+            # snapshot look older than its slides, which forces a reload
             cursor.execute('''
                 SELECT id, title, description, slide_count, created_at, 
-                       updated_at, is_published
+                       updated_at, is_published, content_version
                 FROM lessons WHERE id = ?
             ''', (lesson_id,))
             
@@ -131,8 +179,8 @@ class LessonManager:
                 return None
             
             lesson_data = dict(lesson_row)
+            version = lesson_data.pop('content_version')
             
-            # Get slides
             cursor.execute('''
                 SELECT slide_number, title, content, notes
                 FROM lesson_slides 
@@ -141,14 +189,22 @@ class LessonManager:
             ''', (lesson_id,))
             
             slides = [dict(row) for row in cursor.fetchall()]
-            lesson_data['slides'] = slides
             
-            conn.close()
-            return lesson_data
+            cursor.execute('''
+                SELECT slide_number, context, token_count, key_concepts, coaching_notes, questions_to_ask
+                FROM slide_contexts
+                WHERE lesson_id = ?
+            ''', (lesson_id,))
             
-        except Exception as e:
-            logger.error(f"Failed to get lesson {lesson_id}: {e}")
-            return None
+            contexts = []
+            for row in cursor.fetchall():
+                context = dict(row)
+                for field in ('key_concepts', 'coaching_notes', 'questions_to_ask'):
+                    context[field] = tuple(json_deserialize(context[field]) or ())
+                contexts.append(context)
+            return LessonSnapshot(lesson_id, version, lesson_data, slides, contexts)
+        finally:
+            conn.close()
     
     def list_lessons(self, published_only: bool = False) -> List[Dict[str, Any]]:
         """List all lessons with metadata"""
@@ -186,13 +242,14 @@ class LessonManager:
             
             cursor.execute('''
                 UPDATE lessons 
-                SET is_published = ?, updated_at = ?
+                SET is_published = ?, updated_at = ?, content_version = ?
                 WHERE id = ?
-            ''', (published, datetime.now(), lesson_id))
+            ''', (published, datetime.now(), next_content_version(cursor), lesson_id))
             
             success = cursor.rowcount > 0
             conn.commit()
             conn.close()
+            lesson_cache.invalidate(lesson_id)
             
             if success:
                 status = "published" if published else "unpublished"
@@ -214,8 +271,10 @@ class LessonManager:
             cursor.execute('DELETE FROM lessons WHERE id = ?', (lesson_id,))
             
             success = cursor.rowcount > 0
+            search_index.remove_lesson(cursor, lesson_id)
             conn.commit()
             conn.close()
+            lesson_cache.invalidate(lesson_id)
             
             if success:
                 logger.info(f"🗑️ Deleted lesson '{lesson_id}'")
@@ -229,20 +288,8 @@ class LessonManager:
     def get_lesson_slides(self, lesson_id: str) -> List[Dict[str, Any]]:
         """Get all slides for a lesson"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                SELECT slide_number, title, content, notes
-                FROM lesson_slides
-                WHERE lesson_id = ?
-                ORDER BY slide_number
-            ''', (lesson_id,))
-
-            slides = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-
-            return slides
+            snapshot = self._get_snapshot(lesson_id)
+            return snapshot.slides_list() if snapshot else []
 
         except Exception as e:
             logger.error(f"Failed to get slides for lesson {lesson_id}: {e}")
@@ -251,27 +298,52 @@ class LessonManager:
     def get_slide_content(self, lesson_id: str, slide_number: int) -> Optional[Dict[str, Any]]:
         """Get specific slide content"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                SELECT slide_number, title, content, notes
-                FROM lesson_slides
-                WHERE lesson_id = ? AND slide_number = ?
-            ''', (lesson_id, slide_number))
-
-            slide_row = cursor.fetchone()
-            conn.close()
-
-            return dict(slide_row) if slide_row else None
+            snapshot = self._get_snapshot(lesson_id)
+            return snapshot.slide(slide_number) if snapshot else None
 
         except Exception as e:
             logger.error(f"Failed to get slide {slide_number} for lesson {lesson_id}: {e}")
             return None
     
-    def search_lessons(self, query: str) -> List[Dict[str, Any]]:
-        """Search lessons by title, description, or content"""
+    def get_slide_context(self, lesson_id: str, slide_number: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a slide's precompiled coaching context
+        
+        Returns:
+            {'slide_number', 'context', 'token_count', 'key_concepts',
+             'coaching_notes', 'questions_to_ask'}, or None if the slide
+            does not exist
+        """
         try:
+            snapshot = self._get_snapshot(lesson_id)
+            if not snapshot:
+                return None
+            
+            compiled = snapshot.slide_context(slide_number)
+            if compiled is not None:
+                return dict(compiled)
+            
+            # Lessons written before compiled contexts existed
+            slide = snapshot.slide(slide_number)
+            if not slide:
+                return None
+            return compile_slide_context(slide_number, slide['title'], slide['content'], slide['notes'])
+            
+        except Exception as e:
+            logger.error(f"Failed to get context for slide {slide_number} of lesson {lesson_id}: {e}")
+            return None
+    
+    def search_lessons(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Search lessons by title, description, or content
+        
+        Uses the FTS5 index (BM25-ranked, with 'score', 'snippet' and
+        'matched_slides'); falls back to LIKE scans without FTS5.
+        """
+        try:
+            if search_index.is_available():
+                return search_index.search_lessons(query, limit=limit)
+            
             conn = get_db_connection()
             cursor = conn.cursor()
             
@@ -292,12 +364,29 @@ class LessonManager:
             results = [dict(row) for row in cursor.fetchall()]
             conn.close()
             
-            return results
+            return results[:limit]
             
         except Exception as e:
             logger.error(f"Failed to search lessons: {e}")
             return []
     
+    def search_slides(self, query: str, lesson_id: Optional[str] = None,
+                      limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """
+        BM25-ranked slide search, optionally within one lesson
+        
+        Returns:
+            Matching slides with 'score' and 'snippet', or None when the
+            FTS5 index is unavailable (callers fall back to scanning)
+        """
+        try:
+            if not search_index.is_available():
+                return None
+            return search_index.search_slides(query, lesson_id=lesson_id, limit=limit)
+        except Exception as e:
+            logger.error(f"Failed to search slides: {e}")
+            return None
+    
     def get_lesson_stats(self, lesson_id: str) -> Dict[str, Any]:
         """Get lesson statistics and metadata"""
         try:
@@ -8,6 +8,10 @@ import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import json
+from .connection import get_connection_manager, get_connection_stats
+from .lesson_cache import lesson_cache
+from .password_hashing import get_password_hasher
+from .write_behind import get_write_behind_stats
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +19,14 @@ logger = logging.getLogger(__name__)
 DB_PATH = "lessons.db"
 
 def get_db_connection() -> sqlite3.Connection:
-    """Get database connection with proper configuration"""
+    """
+    Get this thread's persistent database connection
+
+    The connection is opened once per thread and tuned (WAL, pragmas,
+    statement cache); close() hands it back rather than closing it.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # Access columns by name
-        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
-        return conn
+        return get_connection_manager().acquire(DB_PATH)
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
         raise
@@ -41,9 +47,30 @@ def init_database() -> bool:
                 slide_count INTEGER DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_published BOOLEAN DEFAULT 0
+                is_published BOOLEAN DEFAULT 0,
+                content_version INTEGER NOT NULL DEFAULT 0  -- From lesson_content_versions on every write (cache key)
+            )
+        ''')
+        
+        # Upgrade lessons tables created before content_version existed
+        lesson_columns = {row[1] for row in cursor.execute('PRAGMA table_info(lessons)')}
+        if 'content_version' not in lesson_columns:
+            cursor.execute('ALTER TABLE lessons ADD COLUMN content_version INTEGER NOT NULL DEFAULT 0')
+            logger.info("📝 Added lessons.content_version column")
+        
+        # Content versions come from one counter so a lesson that is deleted
+        # and re-imported under the same id never reuses a version another
+        # worker may still have cached
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lesson_content_versions (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
             )
         ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO lesson_content_versions (id, version)
+            SELECT 1, COALESCE(MAX(content_version), 0) FROM lessons
+        ''')
         
         # Create lesson slides table  
         cursor.execute('''
@@ -128,6 +155,18 @@ def init_database() -> bool:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_lesson ON user_sessions(lesson_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_interactions_session ON coaching_interactions(session_id)')
         
+        # Full-text search index over lessons and slides
+        from .search_index import create_search_index
+        create_search_index(cursor)
+        
+        # Precompiled per-slide coaching contexts
+        from .slide_context import create_slide_context_table
+        create_slide_context_table(cursor)
+        
+        # Server-held coaching conversation history
+        from .conversation_store import create_conversation_table
+        create_conversation_table(cursor)
+        
         conn.commit()
         conn.close()
         
@@ -138,6 +177,12 @@ def init_database() -> bool:
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+def next_content_version(cursor: sqlite3.Cursor) -> int:
+    """Take the next lesson content version (call inside the write's transaction)"""
+    cursor.execute('UPDATE lesson_content_versions SET version = version + 1 WHERE id = 1')
+    cursor.execute('SELECT version FROM lesson_content_versions WHERE id = 1')
+    return cursor.fetchone()[0]
+
 def check_database_health() -> Dict[str, Any]:
     """Check database connectivity and basic stats"""
     try:
@@ -164,6 +209,10 @@ def check_database_health() -> Dict[str, Any]:
                 "sessions": session_count,
                 "interactions": interaction_count
             },
+            "connections": get_connection_stats(),
+            "lesson_cache": lesson_cache.get_stats(),
+            "password_hashing": get_password_hasher().get_stats(),
+            "interaction_writes": get_write_behind_stats(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -0,0 +1,163 @@
+"""
+Password Hashing Pool
+Runs PBKDF2 in a bounded process pool so logins don't stall request threads
+"""
+import hashlib
+import hmac
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cost for new hashes; older hashes are upgraded on the next successful login
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "100000"))
+# Worker processes (0 hashes on the calling thread)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes allowed in flight (running + queued) before callers are turned away
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5.0"))
+
+# Cost of hashes stored before the iteration count was recorded
+LEGACY_ITERATIONS = 100000
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue stays full for the whole queue timeout"""
+    pass
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for PBKDF2-SHA256
+
+    hashlib.pbkdf2_hmac itself is submitted to the workers, so they never
+    import this package (which would initialize the database). A semaphore
+    bounds the backlog; queue_depth counts hashes waiting for a worker.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 queue_timeout: float = PASSWORD_HASH_QUEUE_TIMEOUT,
+                 iterations: int = PASSWORD_HASH_ITERATIONS):
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self.queue_timeout = queue_timeout
+        self.iterations = iterations
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._in_flight = 0
+        self._stats = {'hashed': 0, 'rejected': 0, 'upgraded': 0, 'max_queue_depth': 0,
+                       'total_wait_ms': 0.0, 'total_hash_ms': 0.0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            # A forked worker process must not reuse its parent's pool
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+                logger.info(f"🔐 Started password hashing pool with {self.workers} workers")
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def hash(self, password: str, salt: str, iterations: Optional[int] = None) -> str:
+        """
+        PBKDF2-SHA256 hex digest, computed off the calling thread
+
+        Raises:
+            PasswordHasherBusy: If no slot frees up within queue_timeout
+        """
+        iterations = iterations or self.iterations
+        args = ('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations)
+
+        queued_at = time.perf_counter()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._stats['rejected'] += 1
+            logger.warning("⚠️ Password hashing queue full, rejecting request")
+            raise PasswordHasherBusy("Password hashing queue is full")
+        try:
+            with self._lock:
+                self._in_flight += 1
+                depth = max(0, self._in_flight - self.workers)
+                self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], depth)
+            started = time.perf_counter()
+            if self.workers == 0:
+                digest = hashlib.pbkdf2_hmac(*args)
+            else:
+                try:
+                    digest = self._get_executor().submit(hashlib.pbkdf2_hmac, *args).result()
+                except BrokenProcessPool:
+                    logger.warning("⚠️ Password hashing pool broke, restarting it")
+                    self._reset_executor()
+                    digest = self._get_executor().submit(hashlib.pbkdf2_hmac, *args).result()
+            finished = time.perf_counter()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+        with self._lock:
+            self._stats['hashed'] += 1
+            self._stats['total_wait_ms'] += (started - queued_at) * 1000
+            self._stats['total_hash_ms'] += (finished - started) * 1000
+        return digest.hex()
+
+    def verify(self, password: str, salt: str, stored_hash: str, iterations: Optional[int]) -> bool:
+        """Constant-time check of password against a stored hash"""
+        candidate = self.hash(password, salt, iterations or LEGACY_ITERATIONS)
+        return hmac.compare_digest(candidate, stored_hash)
+
+    def needs_upgrade(self, iterations: Optional[int]) -> bool:
+        """Whether a hash stored at this cost should be rehashed at the current cost"""
+        return (iterations or LEGACY_ITERATIONS) < self.iterations
+
+    def record_upgrade(self) -> None:
+        with self._lock:
+            self._stats['upgraded'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            in_flight = self._in_flight
+        hashed = stats['hashed']
+        return {
+            'workers': self.workers,
+            'iterations': self.iterations,
+            'max_pending': self.max_pending,
+            'in_flight': in_flight,
+            'queue_depth': max(0, in_flight - self.workers),
+            'max_queue_depth': stats['max_queue_depth'],
+            'hashed': hashed,
+            'rejected': stats['rejected'],
+            'upgraded': stats['upgraded'],
+            'avg_wait_ms': round(stats['total_wait_ms'] / hashed, 2) if hashed else 0.0,
+            'avg_hash_ms': round(stats['total_hash_ms'] / hashed, 2) if hashed else 0.0
+        }
+
+    def shutdown(self) -> None:
+        self._reset_executor()
+
+
+_password_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hasher"""
+    global _password_hasher
+    if _password_hasher is None:
+        with _hasher_lock:
+            if _password_hasher is None:
+                _password_hasher = PasswordHasher()
+    return _password_hasher
@@ -0,0 +1,215 @@
+"""
+Lesson Search Index
+SQLite FTS5 full-text index over lesson metadata and slide content
+"""
+import re
+import sqlite3
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from .models import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "lesson_search"
+
+# One row per slide, plus a slide_number 0 row holding the lesson's own
+# title and description. bm25() weights follow the column order below.
+_COLUMNS = ("lesson_id", "slide_number", "lesson_title", "lesson_description", "slide_title", "content", "notes")
+_BM25_WEIGHTS = "0, 0, 10.0, 4.0, 8.0, 1.0, 0.5"
+_SNIPPET = f"snippet({FTS_TABLE}, -1, '<mark>', '</mark>', '…', 12)"
+_MAX_HITS = 500
+
+_available: Optional[bool] = None
+
+
+def create_search_index(cursor: sqlite3.Cursor) -> bool:
+    """
+    Create the FTS5 table and backfill it from existing lessons
+
+    Args:
+        cursor: Cursor inside init_database()'s transaction
+
+    Returns:
+        False if this SQLite build lacks FTS5 (search falls back to LIKE)
+    """
+    global _available
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                lesson_id UNINDEXED,
+                slide_number UNINDEXED,
+                lesson_title,
+                lesson_description,
+                slide_title,
+                content,
+                notes,
+                tokenize = 'porter unicode61'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"⚠️ FTS5 unavailable, lesson search will use LIKE scans: {e}")
+        _available = False
+        return False
+
+    indexed = cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}').fetchone()[0]
+    if not indexed:
+        lessons = cursor.execute('SELECT id, title, description FROM lessons').fetchall()
+        for lesson in lessons:
+            slides = cursor.execute('''
+                SELECT slide_number, title, content, notes
+                FROM lesson_slides WHERE lesson_id = ?
+            ''', (lesson[0],)).fetchall()
+            index_lesson(cursor, lesson[0], lesson[1], lesson[2], slides)
+        if lessons:
+            logger.info(f"🔎 Indexed {len(lessons)} existing lessons for full-text search")
+
+    _available = True
+    return True
+
+
+def is_available() -> bool:
+    """Whether the FTS5 index exists in the current database"""
+    global _available
+    if _available is None:
+        conn = get_db_connection()
+        try:
+            row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone()
+            _available = row is not None
+        finally:
+            conn.close()
+    return _available
+
+
+def index_lesson(cursor: sqlite3.Cursor, lesson_id: str, title: str, description: str,
+                 slides: Iterable) -> None:
+    """
+    Replace a lesson's index rows (call in the write's transaction)
+
+    Args:
+        cursor: Cursor of the transaction that writes the lesson
+        lesson_id: Lesson being written
+        title: Lesson title
+        description: Lesson description
+        slides: (slide_number, title, content, notes) rows
+    """
+    if _available is False:
+        return
+    remove_lesson(cursor, lesson_id)
+    rows = [(lesson_id, 0, title or '', description or '', '', '', '')]
+    rows.extend(
+        (lesson_id, slide_number, '', '', slide_title or '', content or '', notes or '')
+        for slide_number, slide_title, content, notes in slides
+    )
+    cursor.executemany(
+        f'INSERT INTO {FTS_TABLE} ({", ".join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+    )
+
+
+def remove_lesson(cursor: sqlite3.Cursor, lesson_id: str) -> None:
+    """Drop a lesson's index rows (call in the write's transaction)"""
+    if _available is False:
+        return
+    cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE lesson_id = ?', (lesson_id,))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 query
+
+    Every word must match (as a prefix, so partial words typed into a
+    search box still hit); FTS5 operators in user input are neutralized
+    by quoting.
+    """
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms[:16])
+
+
+def _search(match: str, where: str = '', params: tuple = ()) -> List[sqlite3.Row]:
+    conn = get_db_connection()
+    try:
+        return conn.execute(f'''
+            SELECT lesson_id, slide_number, slide_title,
+                   bm25({FTS_TABLE}, {_BM25_WEIGHTS}) AS rank,
+                   {_SNIPPET} AS snippet
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH ? {where}
+            ORDER BY rank
+            LIMIT {_MAX_HITS}
+        ''', (match,) + params).fetchall()
+    finally:
+        conn.close()
+
+
+def search_lessons(query: str, limit: int = 50, published_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    BM25-ranked lessons matching query
+
+    Returns:
+        Lesson rows (as list_lessons) with 'score' (higher is better),
+        'snippet' from the best-matching field and 'matched_slides'
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    best: Dict[str, Dict[str, Any]] = {}
+    for hit in _search(match):
+        entry = best.get(hit['lesson_id'])
+        if entry is None:
+            best[hit['lesson_id']] = entry = {
+                'score': round(-hit['rank'], 4),
+                'snippet': hit['snippet'],
+                'matched_slides': []
+            }
+        if hit['slide_number']:
+            entry['matched_slides'].append(hit['slide_number'])
+    if not best:
+        return []
+
+    conn = get_db_connection()
+    try:
+        placeholders = ', '.join('?' for _ in best)
+        query_sql = f'''
+            SELECT id, title, description, slide_count, created_at,
+                   updated_at, is_published
+            FROM lessons WHERE id IN ({placeholders})
+        '''
+        if published_only:
+            query_sql += ' AND is_published = 1'
+        lessons = {row['id']: dict(row) for row in conn.execute(query_sql, tuple(best))}
+    finally:
+        conn.close()
+
+    results = [{**lessons[lesson_id], **entry} for lesson_id, entry in best.items() if lesson_id in lessons]
+    return results[:limit]
+
+
+def search_slides(query: str, lesson_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    BM25-ranked slides matching query, optionally within one lesson
+
+    Returns:
+        {'lesson_id', 'slide_number', 'title', 'score', 'snippet'} dicts
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    where, params = 'AND slide_number > 0', ()
+    if lesson_id:
+        where += ' AND lesson_id = ?'
+        params = (lesson_id,)
+
+    return [
+        {
+            'lesson_id': hit['lesson_id'],
+            'slide_number': hit['slide_number'],
+            'title': hit['slide_title'],
+            'score': round(-hit['rank'], 4),
+            'snippet': hit['snippet']
+        }
+        for hit in _search(match, where, params)[:limit]
+    ]
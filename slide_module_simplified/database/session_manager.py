@@ -9,6 +9,9 @@ from datetime import datetime
 import uuid
 
 from .models import get_db_connection, json_serialize, json_deserialize
+from .write_behind import (
+    INTERACTION_DURABILITY, get_write_behind_queue, interaction_row, write_interactions
+)
 
 logger = logging.getLogger(__name__)
 
@@ -154,24 +157,29 @@ class SessionManager:
     def add_interaction(self, session_id: str, slide_number: int, 
                        user_input: str, ai_response: str, 
                        interaction_type: str = "general") -> bool:
-        """Record a coaching interaction"""
+        """
+        Record a coaching interaction and touch the session's activity
+        
+        In the default async durability mode the write is queued for the
+        next group commit; INTERACTION_DURABILITY=sync commits both in one
+        transaction before returning.
+        """
         try:
+            row = interaction_row(session_id, slide_number, user_input, ai_response, interaction_type)
+            
+            if INTERACTION_DURABILITY != "sync":
+                get_write_behind_queue().enqueue(row)
+                return True
+            
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            cursor.execute('''
-                INSERT INTO coaching_interactions
-                (session_id, slide_number, user_input, ai_response, interaction_type)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (session_id, slide_number, user_input, ai_response, interaction_type))
+            skipped = write_interactions(cursor, [row], {session_id: datetime.now()})
             
             conn.commit()
             conn.close()
             
-            # Also update session activity
-            self.update_session_activity(session_id)
-            
-            return True
+            return not skipped
             
         except Exception as e:
             logger.error(f"Failed to add interaction: {e}")
@@ -180,6 +188,8 @@ class SessionManager:
     def get_session_history(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent interactions for a session"""
         try:
+            get_write_behind_queue().flush_session(session_id)
+            
             conn = get_db_connection()
             cursor = conn.cursor()
             
@@ -207,7 +217,7 @@ class SessionManager:
             if not session:
                 return {}
             
-            history = self.get_session_history(session_id, limit=5)
+            history = self.get_session_history(session_id, limit=5)  # Flushes queued interactions
             
             # Calculate engagement metrics
             conn = get_db_connection()
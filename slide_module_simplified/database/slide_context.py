@@ -0,0 +1,169 @@
+"""
+Compiled Slide Context
+Per-slide coaching context rendered once at lesson ingest time
+"""
+import json
+import re
+import sqlite3
+import logging
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # Not installed, or encoding data unavailable offline
+    _ENCODING = None
+
+DEFAULT_LESSON_CONTEXT = (
+    "Interactive workshop focused on practical application and hands-on learning. "
+    "Emphasis on real-world examples and hands-on practice."
+)
+
+_BULLET = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+')
+
+
+def count_tokens(text: str) -> int:
+    """Token count for text (tiktoken when installed, else a calibrated estimate)"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    # cl100k averages ~4 characters and ~0.75 words per token on English
+    # prose; the larger estimate covers both short-word and long-word text
+    return max((len(text) + 3) // 4, (len(text.split()) * 4 + 2) // 3)
+
+
+def _content_lines(content: str) -> List[str]:
+    return [_BULLET.sub('', line).strip() for line in (content or '').split('\n') if line.strip()]
+
+
+def extract_key_concepts(content: str) -> List[str]:
+    """Key concepts of a slide: its first five substantive lines"""
+    return [line for line in _content_lines(content) if len(line) > 3][:5]
+
+
+def coaching_notes(content: str, notes: str) -> List[str]:
+    """Coaching notes for the AI: the author's notes plus standard prompts"""
+    result = []
+    if notes:
+        result.append(notes)
+    if content:
+        result.append("Explain the key points")
+        result.append("Provide relevant examples")
+    return result
+
+
+def suggested_questions(title: str, content: str) -> List[str]:
+    """Discussion questions to offer the learner"""
+    questions = []
+    if title:
+        questions.append(f"What do you think about {title}?")
+    if content:
+        questions.append("How would you apply this in your work?")
+        questions.append("What questions do you have about this topic?")
+    return questions
+
+
+def compile_slide_context(slide_number: int, title: str, content: str, notes: str,
+                          lesson_context: str = DEFAULT_LESSON_CONTEXT) -> Dict[str, Any]:
+    """
+    Render the coaching context block for one slide
+
+    Returns:
+        {'slide_number', 'context', 'token_count', 'key_concepts',
+         'coaching_notes', 'questions_to_ask'}
+    """
+    title = title or f"Slide {slide_number}"
+    key_concepts = extract_key_concepts(content)
+    notes_list = coaching_notes(content, notes)
+    questions = suggested_questions(title, content)
+
+    content_text = '\n'.join(f"- {line}" for line in _content_lines(content))
+    concepts_text = ', '.join(key_concepts) if key_concepts else 'None specified'
+    notes_text = '\n'.join(f"- {note}" for note in notes_list) if notes_list else 'No coaching notes available'
+    questions_text = '\n'.join(f"- {q}" for q in questions) if questions else 'No suggested questions'
+
+    context = f"""Slide Title: {title}
+Content:
+{content_text}
+
+Key Concepts: {concepts_text}
+Coaching Notes (for AI reference):
+{notes_text}
+
+Suggested Discussion Questions:
+{questions_text}
+
+General Workshop Context: {lesson_context}
+"""
+    return {
+        'slide_number': slide_number,
+        'context': context,
+        'token_count': count_tokens(context),
+        'key_concepts': key_concepts,
+        'coaching_notes': notes_list,
+        'questions_to_ask': questions
+    }
+
+
+def create_slide_context_table(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the slide_contexts table and compile any lessons missing from it
+
+    Args:
+        cursor: Cursor inside init_database()'s transaction
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS slide_contexts (
+            lesson_id TEXT NOT NULL,
+            slide_number INTEGER NOT NULL,
+            context TEXT NOT NULL,
+            token_count INTEGER NOT NULL,
+            key_concepts TEXT,      -- JSON array
+            coaching_notes TEXT,    -- JSON array
+            questions_to_ask TEXT,  -- JSON array
+            PRIMARY KEY (lesson_id, slide_number),
+            FOREIGN KEY (lesson_id) REFERENCES lessons(id) ON DELETE CASCADE
+        )
+    ''')
+
+    missing = cursor.execute('''
+        SELECT id FROM lessons
+        WHERE id NOT IN (SELECT DISTINCT lesson_id FROM slide_contexts)
+    ''').fetchall()
+    for (lesson_id,) in missing:
+        slides = cursor.execute('''
+            SELECT slide_number, title, content, notes
+            FROM lesson_slides WHERE lesson_id = ?
+        ''', (lesson_id,)).fetchall()
+        store_slide_contexts(cursor, lesson_id, slides)
+    if missing:
+        logger.info(f"🧩 Compiled slide contexts for {len(missing)} existing lessons")
+
+
+def store_slide_contexts(cursor: sqlite3.Cursor, lesson_id: str, slides: Iterable) -> int:
+    """
+    Replace a lesson's compiled contexts (call in the write's transaction)
+
+    Args:
+        cursor: Cursor of the transaction that writes the lesson
+        lesson_id: Lesson being written
+        slides: (slide_number, title, content, notes) rows
+
+    Returns:
+        Total tokens across the lesson's contexts
+    """
+    cursor.execute('DELETE FROM slide_contexts WHERE lesson_id = ?', (lesson_id,))
+    compiled = [compile_slide_context(*slide) for slide in slides]
+    cursor.executemany('''
+        INSERT INTO slide_contexts
+        (lesson_id, slide_number, context, token_count, key_concepts, coaching_notes, questions_to_ask)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (lesson_id, c['slide_number'], c['context'], c['token_count'], json.dumps(c['key_concepts']),
+         json.dumps(c['coaching_notes']), json.dumps(c['questions_to_ask']))
+        for c in compiled
+    ])
+    return sum(c['token_count'] for c in compiled)
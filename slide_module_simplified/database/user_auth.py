@@ -7,12 +7,17 @@ import logging
 import sqlite3
 import hashlib
 import secrets
+import time
 import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import re
 
 from .models import get_db_connection
+from .auth_tokens import (
+    AUTH_TOKEN_TTL_DAYS, RevocationEpochs, TokenSigner, create_auth_token_tables, is_signed_token
+)
+from .password_hashing import PasswordHasherBusy, get_password_hasher
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +26,8 @@ class UserAuthManager:
     
     def __init__(self):
         self._init_auth_tables()
+        self.token_signer = TokenSigner()
+        self.revocation_epochs = RevocationEpochs()
     
     def _init_auth_tables(self):
         """Initialize authentication tables"""
@@ -41,10 +48,17 @@ class UserAuthManager:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     last_login TIMESTAMP,
                     email_verified BOOLEAN DEFAULT 0,
-                    profile_complete BOOLEAN DEFAULT 0
+                    profile_complete BOOLEAN DEFAULT 0,
+                    hash_iterations INTEGER  -- PBKDF2 cost (NULL = legacy 100k)
                 )
             ''')
             
+            # Upgrade users tables created before hash_iterations existed
+            user_columns = [row[1] for row in cursor.execute("PRAGMA table_info(users)")]
+            if 'hash_iterations' not in user_columns:
+                cursor.execute('ALTER TABLE users ADD COLUMN hash_iterations INTEGER')
+                logger.info("📝 Added users.hash_iterations column")
+            
             # User profiles table for learning preferences
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS user_profiles (
@@ -114,6 +128,11 @@ class UserAuthManager:
                     FOREIGN KEY (user_id) REFERENCES users (user_id)
                 )
             ''')
+            # Legacy opaque tokens are still looked up by hash until they expire
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_auth_tokens_hash ON auth_tokens (token_hash)')
+            
+            # Signing keys and per-user revocation epochs for signed tokens
+            create_auth_token_tables(cursor)
             
             conn.commit()
             conn.close()
@@ -124,21 +143,29 @@ class UserAuthManager:
             logger.error(f"❌ Error initializing auth tables: {e}")
             raise
     
-    def _hash_password(self, password: str, salt: str = None) -> tuple[str, str]:
-        """Hash password with salt"""
+    def _hash_password(self, password: str, salt: str = None,
+                       iterations: int = None) -> tuple[str, str]:
+        """
+        Hash password with salt
+        
+        PBKDF2 runs in the shared hashing process pool at the configured
+        cost (PASSWORD_HASH_ITERATIONS) unless iterations is given.
+        
+        Raises:
+            PasswordHasherBusy: If the hashing queue is full
+        """
         if salt is None:
             salt = secrets.token_hex(32)
         
-        # Use PBKDF2 for password hashing
-        password_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt.encode('utf-8'),
-            100000  # 100k iterations
-        ).hex()
+        password_hash = get_password_hasher().hash(password, salt, iterations)
         
         return password_hash, salt
     
+    def _verify_password(self, password: str, salt: str, stored_hash: str,
+                         iterations: Optional[int]) -> bool:
+        """Check password against a stored hash of the given cost"""
+        return get_password_hasher().verify(password, salt, stored_hash, iterations)
+    
     def _validate_email(self, email: str) -> bool:
         """Validate email format"""
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -185,9 +212,10 @@ class UserAuthManager:
             password_hash, salt = self._hash_password(password)
             
             cursor.execute('''
-                INSERT INTO users (user_id, email, password_hash, salt, first_name, last_name)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (user_id, email.lower(), password_hash, salt, first_name, last_name))
+                INSERT INTO users (user_id, email, password_hash, salt, first_name, last_name, hash_iterations)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, email.lower(), password_hash, salt, first_name, last_name,
+                  get_password_hasher().iterations))
             
             # Create default profile
             cursor.execute('''
@@ -206,6 +234,8 @@ class UserAuthManager:
                 "message": "User registered successfully"
             }
             
+        except PasswordHasherBusy:
+            return {"success": False, "error": "Server is busy, please try again"}
         except Exception as e:
             logger.error(f"❌ Registration error: {e}")
             return {"success": False, "error": "Registration failed"}
@@ -218,7 +248,7 @@ class UserAuthManager:
             
             # Get user data
             cursor.execute('''
-                SELECT user_id, password_hash, salt, first_name, last_name, is_active
+                SELECT user_id, password_hash, salt, first_name, last_name, is_active, hash_iterations
                 FROM users WHERE email = ?
             ''', (email.lower(),))
             
@@ -227,19 +257,27 @@ class UserAuthManager:
                 conn.close()
                 return {"success": False, "error": "Invalid email or password"}
             
-            user_id, stored_hash, salt, first_name, last_name, is_active = user_data
+            user_id, stored_hash, salt, first_name, last_name, is_active, iterations = user_data
             
             if not is_active:
                 conn.close()
                 return {"success": False, "error": "Account is deactivated"}
             
             # Verify password
-            password_hash, _ = self._hash_password(password, salt)
-            
-            if password_hash != stored_hash:
+            if not self._verify_password(password, salt, stored_hash, iterations):
                 conn.close()
                 return {"success": False, "error": "Invalid email or password"}
             
+            # Rehash at the current cost while the plaintext is at hand
+            hasher = get_password_hasher()
+            if hasher.needs_upgrade(iterations):
+                new_hash, new_salt = self._hash_password(password)
+                cursor.execute('''
+                    UPDATE users SET password_hash = ?, salt = ?, hash_iterations = ? WHERE user_id = ?
+                ''', (new_hash, new_salt, hasher.iterations, user_id))
+                hasher.record_upgrade()
+                logger.info(f"🔐 Upgraded password hash for {email} to {hasher.iterations} iterations")
+            
             # Update last login
             cursor.execute('''
                 UPDATE users SET last_login = ? WHERE user_id = ?
@@ -264,26 +302,47 @@ class UserAuthManager:
                 }
             }
             
+        except PasswordHasherBusy:
+            return {"success": False, "error": "Server is busy, please try again"}
         except Exception as e:
             logger.error(f"❌ Authentication error: {e}")
             return {"success": False, "error": "Authentication failed"}
     
     def _generate_auth_token(self, user_id: str, cursor) -> str:
-        """Generate authentication token"""
-        token = secrets.token_urlsafe(32)
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
-        expires_at = datetime.now() + timedelta(days=30)  # 30 day expiration
+        """
+        Generate a signed authentication token
         
-        cursor.execute('''
-            INSERT INTO auth_tokens (token_id, user_id, token_hash, expires_at)
-            VALUES (?, ?, ?, ?)
-        ''', (str(uuid.uuid4()), user_id, token_hash, expires_at))
-        
-        return token
+        The token carries the user id, expiry and the user's revocation
+        epoch, so verify_token() needs no database lookup.
+        """
+        now = int(time.time())
+        return self.token_signer.sign({
+            "uid": user_id,
+            "ep": self.revocation_epochs.read(cursor, user_id),
+            "iat": now,
+            "exp": now + AUTH_TOKEN_TTL_DAYS * 86400,
+            "jti": secrets.token_urlsafe(8)
+        })
+    
+    def _decode_signed_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Payload of a valid, unexpired signed token"""
+        payload = self.token_signer.verify(token)
+        if not payload or not isinstance(payload.get("uid"), str):
+            return None
+        if payload.get("exp", 0) <= time.time():
+            return None
+        return payload
     
     def verify_token(self, token: str) -> Optional[str]:
         """Verify authentication token and return user_id"""
         try:
+            if is_signed_token(token):
+                payload = self._decode_signed_token(token)
+                if payload and payload.get("ep", -1) >= self.revocation_epochs.current(payload["uid"]):
+                    return payload["uid"]
+                return None
+            
+            # Legacy opaque token issued before signed tokens
             token_hash = hashlib.sha256(token.encode()).hexdigest()
             
             conn = get_db_connection()
@@ -421,7 +480,7 @@ class UserAuthManager:
             
             # Verify old password
             cursor.execute('''
-                SELECT password_hash, salt FROM users WHERE user_id = ?
+                SELECT password_hash, salt, hash_iterations FROM users WHERE user_id = ?
             ''', (user_id,))
             
             result = cursor.fetchone()
@@ -429,10 +488,9 @@ class UserAuthManager:
                 conn.close()
                 return {"success": False, "error": "User not found"}
             
-            stored_hash, salt = result
-            old_password_hash, _ = self._hash_password(old_password, salt)
+            stored_hash, salt, iterations = result
             
-            if old_password_hash != stored_hash:
+            if not self._verify_password(old_password, salt, stored_hash, iterations):
                 conn.close()
                 return {"success": False, "error": "Current password is incorrect"}
             
@@ -440,13 +498,14 @@ class UserAuthManager:
             new_password_hash, new_salt = self._hash_password(new_password)
             
             cursor.execute('''
-                UPDATE users SET password_hash = ?, salt = ? WHERE user_id = ?
-            ''', (new_password_hash, new_salt, user_id))
+                UPDATE users SET password_hash = ?, salt = ?, hash_iterations = ? WHERE user_id = ?
+            ''', (new_password_hash, new_salt, get_password_hasher().iterations, user_id))
             
             # Invalidate all existing tokens (force re-login)
             cursor.execute('''
                 UPDATE auth_tokens SET is_active = 0 WHERE user_id = ?
             ''', (user_id,))
+            self.revocation_epochs.bump(cursor, user_id)
             
             conn.commit()
             conn.close()
@@ -455,21 +514,34 @@ class UserAuthManager:
             
             return {"success": True, "message": "Password changed successfully"}
             
+        except PasswordHasherBusy:
+            return {"success": False, "error": "Server is busy, please try again"}
         except Exception as e:
             logger.error(f"❌ Password change error: {e}")
             return {"success": False, "error": "Password change failed"}
     
     def logout_user(self, token: str) -> bool:
-        """Logout user by invalidating token"""
+        """
+        Logout user by invalidating token
+        
+        Signed tokens cannot be revoked one at a time, so logging out bumps
+        the user's revocation epoch and signs out all of their sessions.
+        """
         try:
-            token_hash = hashlib.sha256(token.encode()).hexdigest()
-            
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            cursor.execute('''
-                UPDATE auth_tokens SET is_active = 0 WHERE token_hash = ?
-            ''', (token_hash,))
+            if is_signed_token(token):
+                payload = self._decode_signed_token(token)
+                if not payload:
+                    conn.close()
+                    return False
+                self.revocation_epochs.bump(cursor, payload["uid"])
+            else:
+                token_hash = hashlib.sha256(token.encode()).hexdigest()
+                cursor.execute('''
+                    UPDATE auth_tokens SET is_active = 0 WHERE token_hash = ?
+                ''', (token_hash,))
             
             conn.commit()
             conn.close()
@@ -0,0 +1,222 @@
+"""
+Write-Behind Interaction Queue
+Batches coaching interactions and session activity into group commits
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "async" batches writes off the request path; "sync" commits every
+# interaction before add_interaction returns (for deployments that cannot
+# lose the last flush interval on a crash)
+INTERACTION_DURABILITY = os.getenv("INTERACTION_DURABILITY", "async").lower()
+WRITE_BEHIND_FLUSH_MS = int(os.getenv("WRITE_BEHIND_FLUSH_MS", "200"))
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+# Queued interactions before callers flush inline (bounds memory)
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "5000"))
+
+_INSERT_INTERACTION = '''
+    INSERT INTO coaching_interactions
+    (session_id, slide_number, user_input, ai_response, interaction_type, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_TOUCH_SESSION = 'UPDATE user_sessions SET last_activity = ? WHERE session_id = ?'
+
+
+def interaction_row(session_id: str, slide_number: int, user_input: str, ai_response: str,
+                    interaction_type: str) -> Tuple:
+    """Insert parameters, stamped now (the row may be committed later)"""
+    # Same UTC format as the column's CURRENT_TIMESTAMP default
+    timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    return (session_id, slide_number, user_input, ai_response, interaction_type, timestamp)
+
+
+def write_interactions(cursor: sqlite3.Cursor, rows: List[Tuple],
+                       activity: Dict[str, datetime]) -> int:
+    """
+    Insert interactions and touch sessions (caller commits)
+
+    Returns:
+        Number of interactions skipped because their session no longer exists
+    """
+    skipped = 0
+    if not cursor.connection.in_transaction:
+        cursor.execute('BEGIN')
+    cursor.execute('SAVEPOINT write_interactions')
+    try:
+        cursor.executemany(_INSERT_INTERACTION, rows)
+    except sqlite3.IntegrityError:
+        # One deleted session shouldn't sink the whole batch. executemany
+        # stops at the failing row with the rows before it inserted, so undo
+        # those before retrying row by row
+        cursor.execute('ROLLBACK TO SAVEPOINT write_interactions')
+        for row in rows:
+            try:
+                cursor.execute(_INSERT_INTERACTION, row)
+            except sqlite3.IntegrityError:
+                skipped += 1
+    cursor.execute('RELEASE SAVEPOINT write_interactions')
+    cursor.executemany(_TOUCH_SESSION, [(at, session_id) for session_id, at in activity.items()])
+    return skipped
+
+
+class WriteBehindQueue:
+    """
+    Group-commit queue for coaching interactions
+
+    Request threads append rows and return immediately; a background thread
+    writes everything queued in one transaction every flush interval, so a
+    burst of chat turns costs one commit instead of two per turn. Session
+    activity updates are coalesced per session. When the queue is full the
+    caller flushes inline, so memory stays bounded without dropping writes;
+    only rows requeued after a failed commit that no longer fit are dropped.
+    """
+
+    def __init__(self, connect: Callable[[], Any], flush_ms: int = WRITE_BEHIND_FLUSH_MS,
+                 max_batch: int = WRITE_BEHIND_MAX_BATCH, max_pending: int = WRITE_BEHIND_MAX_PENDING):
+        self._connect = connect
+        self.flush_interval = flush_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.max_pending = max(1, max_pending)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._rows: List[Tuple] = []
+        self._activity: Dict[str, datetime] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {'enqueued': 0, 'written': 0, 'skipped': 0, 'dropped': 0, 'flushes': 0,
+                       'inline_flushes': 0, 'failed_flushes': 0, 'max_pending_seen': 0}
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="interaction-write-behind", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, row: Tuple) -> None:
+        """Queue one interaction row (from interaction_row) and touch its session"""
+        with self._lock:
+            self._rows.append(row)
+            self._activity[row[0]] = datetime.now()
+            pending = len(self._rows)
+            self._stats['enqueued'] += 1
+            self._stats['max_pending_seen'] = max(self._stats['max_pending_seen'], pending)
+            self._ensure_thread()
+
+        if pending >= self.max_pending:
+            with self._lock:
+                self._stats['inline_flushes'] += 1
+            self.flush()
+        elif pending >= self.max_batch:
+            self._wake.set()
+
+    def has_pending(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._activity
+
+    def flush_session(self, session_id: str) -> None:
+        """Flush if session_id has queued writes (read-your-writes for history)"""
+        if self.has_pending(session_id):
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far in one transaction
+
+        Returns:
+            Number of interactions written
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                activity, self._activity = self._activity, {}
+            if not rows and not activity:
+                return 0
+
+            conn = self._connect()
+            try:
+                skipped = write_interactions(conn.cursor(), rows, activity)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                with self._lock:
+                    self._stats['failed_flushes'] += 1
+                    # Requeue ahead of newer writes, within the memory bound
+                    room = max(0, self.max_pending - len(self._rows))
+                    self._rows[:0] = rows[:room]
+                    dropped = max(0, len(rows) - room)
+                    self._stats['dropped'] += dropped
+                    for session_id, at in activity.items():
+                        self._activity.setdefault(session_id, at)
+                logger.error(f"❌ Interaction group commit failed ({len(rows)} rows): {e}")
+                if dropped:
+                    logger.error(f"❌ Dropped {dropped} interactions that no longer fit in the queue")
+                return 0
+            finally:
+                conn.close()
+
+        with self._lock:
+            self._stats['flushes'] += 1
+            self._stats['written'] += len(rows) - skipped
+            self._stats['skipped'] += skipped
+        if skipped:
+            logger.warning(f"⚠️ Skipped {skipped} interactions for deleted sessions")
+        return len(rows) - skipped
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Interaction write-behind error: {e}")
+
+    def shutdown(self) -> None:
+        """Stop the background thread and flush what is left"""
+        self._stopping = True
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=5)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._rows)
+        stats['flush_ms'] = int(self.flush_interval * 1000)
+        stats['max_pending'] = self.max_pending
+        stats['rows_per_flush'] = round(stats['written'] / stats['flushes'], 2) if stats['flushes'] else 0.0
+        return stats
+
+
+_write_behind: Optional[WriteBehindQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_write_behind_queue() -> WriteBehindQueue:
+    """Get the process-wide interaction queue (flushed at interpreter exit)"""
+    global _write_behind
+    if _write_behind is None:
+        with _queue_lock:
+            if _write_behind is None:
+                from .models import get_db_connection
+                _write_behind = WriteBehindQueue(get_db_connection)
+                atexit.register(_write_behind.shutdown)
+    return _write_behind
+
+
+def get_write_behind_stats() -> Dict[str, Any]:
+    """Queue counters for health/debug endpoints"""
+    stats = get_write_behind_queue().get_stats()
+    stats['durability'] = INTERACTION_DURABILITY
+    return stats
@@ -1,20 +1,27 @@
 import logging
 import os
 import re # Added re for name extraction
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from dataclasses import dataclass, field
 from .slide_controller import get_slide_controller # Keep for navigation info
 from .voice_interaction import get_voice_interaction # Keep for intent detection
 from conversation import ConversationManager # Might still be useful for basic non-lesson chat
-from .system_prompt_manager import get_system_prompt_manager
+from .system_prompt_manager import PromptVariant, get_system_prompt_manager
 from .database.lesson_manager import LessonManager # Direct access to database manager
+from .database.conversation_store import clean_messages, get_conversation_store
 from config import Config # Import Config for OpenAI key
-from openai import OpenAI # Import OpenAI client
+from llm_client import get_shared_openai_client # OpenAI client for the configured backend
+from .prompt_assembly import RESPONSE_GUIDELINES, assemble_messages, get_prompt_cache_stats
+from .context_window import get_context_window
+from .summarizer import get_conversation_summarizer
+from .answer_cache import get_answer_cache
+from .database.slide_context import count_tokens
 import traceback # Import traceback for logging errors
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     """User profile for personalization"""
     name: Optional[str] = None
@@ -24,7 +31,7 @@ class UserProfile:
     goals: List[str] = field(default_factory=list)
     previous_interactions: List[Dict] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class CoachingContext:
     """Current coaching session context"""
     slide_number: int = 0
@@ -34,23 +41,65 @@ class CoachingContext:
     personalization_notes: List[str] = field(default_factory=list)
     current_lesson_id: str = "" # Track current lesson ID
 
+# Default coaching prompts when the database has none
+DEFAULT_COACHING_PROMPTS: Dict[str, Any] = {
+    "slide_intro": {
+        "beginner": "Let me walk you through this concept step by step.",
+        "intermediate": "You might find this builds on what you already know about...",
+        "advanced": "This concept connects to some advanced topics you're likely familiar with."
+    },
+    "engagement": {
+        "low": "I notice you might need a moment. Would you like me to explain this differently?",
+        "neutral": "How are you feeling about this concept so far?",
+        "high": "Great! I can see you're engaged. Let's dive deeper."
+    },
+    "navigation_encouragement": {
+        "general": "Take your time to absorb this information. When you're ready to continue, just click the 'Next' button.",
+        "ready_to_move": "It sounds like you're ready to move forward! Go ahead and click 'Next' when you want to continue.",
+        "review_suggestion": "If you'd like to review the previous slide, click the 'Previous' button. Otherwise, click 'Next' to continue.",
+        "location_help": "You can see which slide we're on in the navigation area at the top of the screen."
+    },
+    "personalized_welcome": {
+        "returning_user": "Welcome back, {name}! I remember you're interested in {interests} and have {experience_level} experience. Ready to continue where we left off?",
+        "new_user": "Hello {name}! Thanks for telling me about your {experience_level} experience level and interest in {interests}. I'll personalize our learning journey accordingly."
+    }
+}
+
+# Questions about lesson content; their answers are shared through the answer cache
+LEARNING_KEYWORDS = ("explain", "tell me about", "what is", "what are", "why is", "how does", "define",
+                     "describe", "clarify", "understand", "meaning", "relevance")
+
+# Stateless, so one instance serves every manager
+_shared_lesson_manager = LessonManager()
+
 class LessonCoachingManager:
     """
     Combined Lesson Coaching and Conversation Manager
     Handles user input, context, slide content, and LLM interaction for a specific lesson.
+    Instances are reused per session through coaching_registry.
     """
 
+    __slots__ = ('lesson_id', 'slide_controller', 'voice_interaction', 'lesson_manager', 'user_profile',
+                 'coaching_context', '_client', 'conversation_history', 'model', 'coaching_prompts',
+                 'conversation_id', 'history_seq', 'conversation_summary', '_summary_dirty', '_history_lock')
+
     def __init__(self, lesson_id: str):
         self.lesson_id = lesson_id
         self.slide_controller = get_slide_controller() # Keep as it provides navigation info
         self.voice_interaction = get_voice_interaction() # Keep for intent detection
-        self.lesson_manager = LessonManager() # Direct access to database manager
+        self.lesson_manager = _shared_lesson_manager # Direct access to database manager
         self.user_profile = UserProfile() # Keep user profile
         self.coaching_context = CoachingContext(current_lesson_id=lesson_id) # Keep coaching context
 
         # Initialize LLM client and history management directly
         self._client = None # Lazy initialization of OpenAI client
         self.conversation_history = [] # Manage history directly
+        self.conversation_id = None # Set when the history is held server-side
+        self.history_seq = 0 # Seq of the last persisted message
+        self.conversation_summary = "" # Rolling summary of turns folded out of the history
+        self._summary_dirty = False # Summary changed since it was last persisted
+        # Guards history and summary: the summarizer callback runs on its own thread
+        self._history_lock = threading.RLock()
         self.model = "gpt-4" # Using reliable model
 
         # Load base prompts and potentially user profile data on initialization
@@ -66,45 +115,17 @@ class LessonCoachingManager:
             if prompts:
                 return prompts
         except Exception as e:
-            logger.warning(f"⚠️ Could not load coaching prompts from database: {e}")
+            logger.debug(f"Could not load coaching prompts from database: {e}")
 
-        # Return minimal default prompts if database fails
+        # Minimal defaults, shared by every manager
         # These should ideally be in the database for production
-        return {
-            "slide_intro": {
-                "beginner": "Let me walk you through this concept step by step.",
-                "intermediate": "You might find this builds on what you already know about...",
-                "advanced": "This concept connects to some advanced topics you're likely familiar with."
-            },
-            "engagement": {
-                "low": "I notice you might need a moment. Would you like me to explain this differently?",
-                "neutral": "How are you feeling about this concept so far?",
-                "high": "Great! I can see you're engaged. Let's dive deeper."
-            },
-            "navigation_encouragement": {
-                "general": "Take your time to absorb this information. When you're ready to continue, just click the 'Next' button.",
-                "ready_to_move": "It sounds like you're ready to move forward! Go ahead and click 'Next' when you want to continue.",
-                "review_suggestion": "If you'd like to review the previous slide, click the 'Previous' button. Otherwise, click 'Next' to continue.",
-                "location_help": "You can see which slide we're on in the navigation area at the top of the screen."
-            },
-             "personalized_welcome": {
-                "returning_user": "Welcome back, {name}! I remember you're interested in {interests} and have {experience_level} experience. Ready to continue where we left off?",
-                "new_user": "Hello {name}! Thanks for telling me about your {experience_level} experience level and interest in {interests}. I'll personalize our learning journey accordingly."
-            }
-        }
+        return DEFAULT_COACHING_PROMPTS
 
     @property
     def client(self):
-        """Lazy initialization of OpenAI client"""
+        """Lazy initialization of OpenAI client (shared by all managers)"""
         if self._client is None:
-            api_key = Config.OPENAI_API_KEY
-            if not api_key or api_key == "YOUR_OPENAI_API_KEY_HERE":
-                raise ValueError(
-                    "❌ OpenAI API key not set or invalid.\n"
-                    "🔑 Get a new key from: https://platform.openai.com/api-keys\n"
-                    "📝 Update OPENAI_API_KEY in config.py or set as environment variable"
-                )
-            self._client = OpenAI(api_key=api_key)
+            self._client = get_shared_openai_client()
         return self._client
 
     def update_user_profile(self, updates: Dict[str, Any]) -> None:
@@ -115,31 +136,104 @@ class LessonCoachingManager:
         logger.info(f"👤 User profile updated: {updates}")
         # Note: Persistent storage of user profile would be handled elsewhere
 
+    def attach_conversation(self, conversation_id: str) -> None:
+        """Load this session's server-held history (once per manager)"""
+        if self.conversation_id == conversation_id:
+            return
+        seq, messages, summary = self._load_conversation(conversation_id)
+        with self._history_lock:
+            self.history_seq = seq
+            self.conversation_history = messages[-20:]
+            self.conversation_summary = summary
+            self._summary_dirty = False
+            self.conversation_id = conversation_id
+        logger.info(f"📚 Attached conversation {conversation_id} at seq {self.history_seq}")
+
+    @staticmethod
+    def _load_conversation(conversation_id: str) -> Tuple[int, List[Dict], str]:
+        """Load server history: (last seq, messages the summary doesn't cover, summary)"""
+        store = get_conversation_store()
+        seq, messages = store.load(conversation_id)
+        summary, through_seq = store.load_summary(conversation_id)
+        first_seq = seq - len(messages) + 1
+        return seq, messages[max(0, through_seq - first_seq + 1):], summary
+
+    def sync_history(self, user_input: str, client_seq: Optional[int] = None,
+                     client_history: List[Dict] = None, resync: bool = False) -> Optional[int]:
+        """
+        Reconcile the client's view of the conversation before a turn
+
+        Clients send only the new message and the last seq they saw. A full
+        client history is accepted on resync, and from older clients that
+        send no seq.
+
+        Args:
+            user_input: The new user message
+            client_seq: Last seq the client received, if any
+            client_history: Client-side conversation history, if sent
+            resync: Client is replacing the server history with its own
+
+        Returns:
+            None when in sync, else the server's seq (the client must resync)
+        """
+        if resync or (client_seq is None and client_history):
+            messages = clean_messages(client_history)
+            # The current message is added by the turn itself
+            if messages and messages[-1] == {"role": "user", "content": user_input}:
+                messages.pop()
+            with self._history_lock:
+                if self.conversation_id is not None:
+                    self.history_seq = get_conversation_store().replace(self.conversation_id, messages)
+                self.conversation_history = messages[-20:]
+            return None
+
+        if client_seq is None or self.conversation_id is None:
+            return None
+        if int(client_seq) != self.history_seq:
+            # Another worker may have served this session; re-read before giving up
+            seq, messages, summary = self._load_conversation(self.conversation_id)
+            with self._history_lock:
+                self.history_seq = seq
+                self.conversation_history = messages[-20:]
+                self.conversation_summary = summary
+                self._summary_dirty = False
+            if int(client_seq) != self.history_seq:
+                logger.info(f"🔀 History out of sync for {self.conversation_id}: client {client_seq}, server {self.history_seq}")
+                return self.history_seq
+        return None
+
+    def persist_turn(self, user_input: str, response: str) -> int:
+        """
+        Persist a completed turn to the server-held history
+
+        Returns:
+            Seq of the stored answer (0 if this manager keeps no server history)
+        """
+        if self.conversation_id is None:
+            return 0
+        turn = [{"role": "user", "content": user_input}, {"role": "assistant", "content": response}]
+        store = get_conversation_store()
+        with self._history_lock:
+            self.history_seq = store.append(self.conversation_id, turn)
+            # The history now ends at history_seq; the summary covers everything before it
+            if self._summary_dirty and self.conversation_history[-2:] == turn:
+                store.save_summary(self.conversation_id, self.conversation_summary,
+                                   self.history_seq - len(self.conversation_history))
+                self._summary_dirty = False
+        return self.history_seq
+
     def process_user_input(self, user_input: str, current_slide: int, input_type: str = "text", conversation_history: List[Dict] = None) -> Dict[str, Any]:
         """
         Process user input, get slide context, and generate personalized coaching response.
         """
-        self.coaching_context.slide_number = current_slide # Update current slide in context
+        self._begin_turn(user_input, current_slide, conversation_history)
         user_input_lower = user_input.lower()
 
-        # NEW: Update conversation history if provided
-        if conversation_history:
-            logger.info(f"📚 Received {len(conversation_history)} messages in conversation history")
-            # Clear existing history and use the provided one
-            self.conversation_history = conversation_history
-            # Add current user input if not already the last message
-            if not self.conversation_history or self.conversation_history[-1].get("content") != user_input:
-                self.conversation_history.append({"role": "user", "content": user_input})
-        else:
-            # If no history provided, just add current input
-            self.add_message("user", user_input)
-
         # Define keywords for learning intents (questions about content) and location intents
-        learning_keywords = ["explain", "tell me about", "what is", "why is", "how does", "define", "describe", "clarify", "understand", "meaning", "relevance"]
         location_keywords = ["which slide", "what slide", "current slide", "we are on"] # Add keywords related to slide location
 
         # Check for learning intent keywords
-        has_learning_intent_keywords = any(keyword in user_input_lower for keyword in learning_keywords)
+        has_learning_intent_keywords = any(keyword in user_input_lower for keyword in LEARNING_KEYWORDS)
 
         # Check for location intent keywords
         has_location_intent_keywords = any(keyword in user_input_lower for keyword in location_keywords)
@@ -173,6 +267,42 @@ class LessonCoachingManager:
 
     # Removed _handle_learning_interaction as logic is now combined
 
+    def stream_user_input(self, user_input: str, current_slide: int, conversation_history: List[Dict] = None) -> Iterator[str]:
+        """
+        Streaming variant of process_user_input
+
+        Yields the coaching response as text deltas as the LLM generates them,
+        so callers can start speaking before the full answer is available.
+
+        Args:
+            user_input: The user's message
+            current_slide: Current slide index (0-based)
+            conversation_history: Optional client-side conversation history
+
+        Yields:
+            Text deltas of the coaching response
+        """
+        self._begin_turn(user_input, current_slide, conversation_history)
+        yield from self._stream_personalized_response(user_input)
+
+    def _begin_turn(self, user_input: str, current_slide: int, conversation_history: List[Dict] = None) -> None:
+        """Update slide context and conversation history for a new user turn"""
+        self.coaching_context.slide_number = current_slide # Update current slide in context
+
+        # NEW: Update conversation history if provided
+        with self._history_lock:
+            if conversation_history:
+                logger.info(f"📚 Received {len(conversation_history)} messages in conversation history")
+                # Clear existing history and use the provided one
+                self.conversation_history = conversation_history
+                # Add current user input if not already the last message
+                if not self.conversation_history or self.conversation_history[-1].get("content") != user_input:
+                    self.conversation_history.append({"role": "user", "content": user_input})
+            else:
+                # If no history provided, just add current input
+                self.add_message("user", user_input)
+
+
     def _analyze_user_input(self, user_input: str) -> None:
         """Analyze user input to update personalization"""
         # This logic remains largely the same
@@ -239,8 +369,8 @@ class LessonCoachingManager:
         # Note: Persistent storage of profile changes would be handled elsewhere
 
 
-    def _generate_personalized_response(self, user_input: str) -> str:
-        """Generate coaching response using the LLM with combined logic"""
+    def _build_llm_messages(self, user_input: str) -> List[Dict[str, str]]:
+        """Build the system prompt and message list for an LLM call"""
         # 1. Get slide context from the database (using 1-based index)
         try:
             slide_context_str = self._get_slide_context_from_db(self.coaching_context.slide_number, self.lesson_id)
@@ -248,78 +378,130 @@ class LessonCoachingManager:
              logger.error(f"❌ Error fetching slide context in _generate_personalized_response: {e}")
              slide_context_str = f"Could not retrieve specific content for this slide due to an internal error. ({e})"
 
-        # 2. Gather other context for the LLM
-        context = {
-            "slide_number": self.coaching_context.slide_number,
-            "experience_level": self.user_profile.experience_level,
-            "interests": self.user_profile.interests,
-            "learning_style": self.user_profile.learning_style,
-            "recent_questions": self.coaching_context.user_questions[-3:], # Last 3 questions
-            "name": self.user_profile.name,
-            "engagement_level": self.coaching_context.engagement_level,
+        # 2. Per-learner context (see _get_user_segment)
+
+        # 3. Get the prompt variant for this learner's contexts
+        variant = self._resolve_prompt_variant()
+        base_prompt = variant.base_prompt if variant else ""
+        modifiers = variant.modifiers if variant else ()
+        if not base_prompt:
+            base_prompt = "You are a helpful AI assistant specialized in UX design and AI tools."
+            logger.warning("⚠️ Centralized system prompt not available, using default.")
+
+        # 4. Compose the prompt segments, most stable first (see prompt_assembly)
+        segments = {
+            "base": base_prompt,
+            "modifiers": "\n\n".join(modifiers),
+            "guidelines": RESPONSE_GUIDELINES,
+            "lesson": self._get_lesson_segment(),
+            "slide": f"""## CURRENT CONTEXT:
+- You are on Slide {self.coaching_context.slide_number + 1} of the workshop
+- Slide Content: {slide_context_str}""",
+            "summary": f"""## EARLIER IN THIS SESSION:
+{self.conversation_summary}""" if self.conversation_summary and get_context_window().budget.summarization else "",
+            "user": self._get_user_segment()
         }
 
-        # 3. Get the system prompt with active modifiers
+        # 5. Conversation history ending with the current user input, fitted to the token budget
+        with self._history_lock:
+            history = list(self.conversation_history)
+        if history and (history[-1].get("role") != "user" or history[-1].get("content") != user_input):
+            if history[-1].get("role") == "user":
+                history.pop()
+            history.append({"role": "user", "content": user_input})
+        elif not history:
+            history.append({"role": "user", "content": user_input})
+
+        system_tokens = sum(count_tokens(text) for text in segments.values())
+        messages = assemble_messages(segments, get_context_window().fit(history, system_tokens))
+        logger.debug(f"Prepared {len(messages)} messages for API call. System prompt length: {len(messages[0]['content'])}")
+        return messages
+
+    def _resolve_prompt_variant(self) -> Optional[PromptVariant]:
+        """System prompt variant for this learner (None if the prompt manager is unavailable)"""
         try:
-            from .system_prompt_manager import get_system_prompt_manager
             prompt_manager = get_system_prompt_manager()
-            
-            # Activate relevant contexts based on user profile
-            prompt_manager.activate_context('coaching')
-            if self.user_profile.experience_level == 'beginner':
-                prompt_manager.activate_context('beginner')
-            elif self.user_profile.experience_level == 'advanced':
-                prompt_manager.activate_context('advanced')
-
-            # Get the full prompt with all active modifiers
-            base_prompt = prompt_manager.get_full_prompt()
-            if not base_prompt:
-                base_prompt = "You are a helpful AI assistant specialized in UX design and AI tools."
-                logger.warning("⚠️ Centralized system prompt not available, using default.")
-
+            # Contexts apply to this request only; the shared manager is not modified
+            contexts = {'coaching'}
+            if self.user_profile.experience_level in ('beginner', 'advanced'):
+                contexts.add(self.user_profile.experience_level)
+            return prompt_manager.resolve(contexts)
         except Exception as e:
             logger.warning(f"⚠️ Error with centralized prompt manager: {e}")
-            base_prompt = "You are a helpful AI assistant specialized in UX design and AI tools."
+            return None
+
+    def _get_user_segment(self) -> str:
+        """Per-learner prompt segment (changes from turn to turn)"""
+        recent_questions = self.coaching_context.user_questions[-3:] # Last 3 questions
+        return f"""## USER CONTEXT:
+- Experience Level: {self.user_profile.experience_level}
+- Learning Style: {self.user_profile.learning_style}
+- Name: {self.user_profile.name if self.user_profile.name else 'Not provided'}
+- Engagement: {self.coaching_context.engagement_level}
+- Recent Questions: {', '.join(recent_questions) if recent_questions else 'None'}"""
+
+    def _answer_cache_key(self, user_input: str) -> Optional[tuple]:
+        """
+        Answer cache key for a question: (slide, (variant text, user segment), content version)
 
-        # 4. Compose final system prompt for the LLM API call
-        system_prompt = f"""{base_prompt}
+        Answers are shared only between learners who would get the same
+        prompt: same system prompt variant and same user context.
 
-## CURRENT CONTEXT:
-- You are on Slide {self.coaching_context.slide_number + 1} of the workshop
-- Slide Content: {slide_context_str}
-
-## USER CONTEXT:
-- Experience Level: {context['experience_level']}
-- Learning Style: {context['learning_style']}
-- Name: {context['name'] if context['name'] else 'Not provided'}
-- Engagement: {context['engagement_level']}
-- Recent Questions: {', '.join(context['recent_questions']) if context['recent_questions'] else 'None'}
-
-## RESPONSE GUIDELINES:
-- Keep responses focused on the current slide content
-- Maintain a conversational and encouraging tone
-- Ask relevant questions to check understanding
-- Adapt your explanation style to the user's experience level
-- Do not mention technical terms like "database" or "markdown file"
-"""
-
-        # 5. Prepare messages for the LLM API
-        messages = []
-        messages.append({"role": "system", "content": system_prompt})
-
-        # Add recent conversation history
-        history_limit = 10
-        messages.extend(self.conversation_history[max(0, len(self.conversation_history) - history_limit):])
-
-        # Ensure the last message is the current user input
-        if messages and (messages[-1].get("role") != "user" or messages[-1].get("content") != user_input):
-            if messages and messages[-1].get("role") == "user":
-                messages.pop()
-            messages.append({"role": "user", "content": user_input})
-        elif not messages:
-            messages.append({"role": "user", "content": user_input})
+        Content versions are never reused (not even when a lesson is deleted
+        and re-imported), so a new version always drops the old answers.
 
-        logger.debug(f"Prepared {len(messages)} messages for API call. System prompt length: {len(system_prompt)}")
+        Returns:
+            None if the answer shouldn't be shared (not a content question,
+            the session has a rolling summary the answer may draw on, or the
+            lesson's version can't be read, e.g. it was deleted)
+        """
+        if not any(keyword in user_input.lower() for keyword in LEARNING_KEYWORDS):
+            return None
+        if self.conversation_summary:
+            return None
+        content_version = self.lesson_manager.get_content_version(self.lesson_id)
+        if content_version is None:
+            return None
+        variant = self._resolve_prompt_variant()
+        return (self.coaching_context.slide_number, (variant.text if variant else "", self._get_user_segment()),
+                content_version)
+
+    def _get_cached_answer(self, user_input: str, cache_key: Optional[tuple]) -> Optional[str]:
+        if cache_key is None:
+            return None
+        slide_number, variant_key, content_version = cache_key
+        return get_answer_cache().lookup(self.lesson_id, slide_number, variant_key, user_input, content_version)
+
+    def _cache_answer(self, user_input: str, cache_key: Optional[tuple], answer: str) -> None:
+        # Personal answers (addressing the learner by name) are not shared
+        if cache_key is None or not answer or (self.user_profile.name and self.user_profile.name.lower() in answer.lower()):
+            return
+        slide_number, variant_key, content_version = cache_key
+        get_answer_cache().store(self.lesson_id, slide_number, variant_key, user_input, answer, content_version)
+
+    def _get_lesson_segment(self) -> str:
+        """Lesson-level prompt segment (same for every slide of the lesson)"""
+        try:
+            lesson = self.lesson_manager.get_lesson(self.lesson_id)
+        except Exception as e:
+            logger.debug(f"Could not load lesson {self.lesson_id} for prompt: {e}")
+            lesson = None
+        if not lesson:
+            return ""
+        return f"""## LESSON:
+- Title: {lesson.get('title') or self.lesson_id}
+- Description: {lesson.get('description') or 'Not provided'}"""
+
+    def _generate_personalized_response(self, user_input: str) -> str:
+        """Generate coaching response using the LLM with combined logic"""
+        cache_key = self._answer_cache_key(user_input)
+        cached = self._get_cached_answer(user_input, cache_key)
+        if cached is not None:
+            self.add_message("assistant", cached)
+            self._maybe_summarize()
+            return cached
+
+        messages = self._build_llm_messages(user_input)
 
         # 6. Call the OpenAI API
         try:
@@ -329,7 +511,9 @@ class LessonCoachingManager:
                 temperature=0.7
             )
             ai_response = response.choices[0].message.content
+            get_prompt_cache_stats().record(self.lesson_id, response.usage)
             logger.info("✅ Received response from LLM")
+            self._cache_answer(user_input, cache_key, ai_response)
 
         except Exception as e:
             logger.error(f"❌ Error calling LLM API: {e}")
@@ -337,75 +521,80 @@ class LessonCoachingManager:
             import traceback
             logger.error(traceback.format_exc())
 
-        # 7. Store the interaction in history
-        self.add_message("user", user_input)
+        # 7. Store the answer in history (_begin_turn added the user message)
         self.add_message("assistant", ai_response)
+        self._maybe_summarize()
 
         return ai_response
 
+    def _stream_personalized_response(self, user_input: str) -> Iterator[str]:
+        """Stream a coaching response from the LLM as text deltas"""
+        cache_key = self._answer_cache_key(user_input)
+        cached = self._get_cached_answer(user_input, cache_key)
+        if cached is not None:
+            self.add_message("assistant", cached)
+            self._maybe_summarize()
+            yield cached
+            return
+
+        messages = self._build_llm_messages(user_input)
+
+        parts = []
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.7,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            try:
+                for event in stream:
+                    if not event.choices:
+                        # Final chunk carries usage, including cached prompt tokens
+                        if event.usage:
+                            get_prompt_cache_stats().record(self.lesson_id, event.usage)
+                        continue
+                    delta = event.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            finally:
+                stream.close()
+            logger.info("✅ Streamed response from LLM")
+            self._cache_answer(user_input, cache_key, "".join(parts))
+
+        except GeneratorExit:
+            # Consumer went away mid-answer: keep whatever was generated
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error streaming from LLM API: {e}")
+            logger.error(traceback.format_exc())
+            fallback = "I apologize, but I encountered an error trying to generate a response. Please try again!"
+            if not parts:
+                parts.append(fallback)
+                yield fallback
+        finally:
+            # 7. Store the answer in history (_begin_turn added the user message)
+            self.add_message("assistant", "".join(parts))
+            self._maybe_summarize()
+
 
     def _get_slide_context_from_db(self, slide_number: int, lesson_id: str) -> str:
-        """Get slide content from database for AI responses"""
+        """Get the slide's precompiled coaching context for AI responses"""
         # Adjust slide_number to be 1-based for database lookup
         db_slide_number = slide_number + 1
-        logger.info(f"Attempting to get slide context for slide {slide_number + 1} (DB: {db_slide_number}) from database for lesson {lesson_id}")
         try:
-            # lesson_manager is already initialized in __init__
-            slide_data = self.lesson_manager.get_slide_content(lesson_id=lesson_id, slide_number=db_slide_number)
+            # Rendered at lesson ingest and served from the lesson cache
+            compiled = self.lesson_manager.get_slide_context(lesson_id=lesson_id, slide_number=db_slide_number)
 
-            if not slide_data:
+            if not compiled:
                 logger.warning(f"⚠️ No slide content found in database for slide {slide_number + 1} (DB: {db_slide_number}), lesson {lesson_id}")
                 # If no data found, return a specific message for the AI
                 return f"No specific content found for Slide {slide_number + 1} in the database."
 
-
-            # Build context string from database content
-            content_list = slide_data.get('content', [])
-            content_text = '\n'.join([f"- {item}" for item in content_list])
-
-            key_concepts = slide_data.get('key_concepts', [])
-            concepts_text = ', '.join(key_concepts) if key_concepts else 'None specified'
-
-            coaching_notes = slide_data.get('coaching_notes', [])
-            notes_text = '\n'.join([f"- {note}" for note in coaching_notes]) if coaching_notes else 'No coaching notes available'
-
-            questions = slide_data.get('questions_to_ask', [])
-            questions_text = '\n'.join([f"- {q}" for q in questions]) if questions else 'No suggested questions'
-
-            # Get lesson context from database - assuming LessonManager has this method
-            try:
-                # Assuming LessonManager has get_lesson_context method
-                lesson_context = self.lesson_manager.get_lesson_context(lesson_id)
-                logger.debug(f"Retrieved lesson context for lesson {lesson_id}")
-            except AttributeError:
-                logger.warning("LessonManager has no get_lesson_context method. Using default.")
-                lesson_context = "Interactive workshop focused on practical application and hands-on learning. Emphasis on real-world examples and hands-on practice."
-            except Exception as e:
-                 logger.warning(f"Error getting lesson context: {e}. Using default.")
-                 lesson_context = "Interactive workshop focused on practical application and hands-on learning. Emphasis on real-world examples and hands-on practice."
-
-
-            # Use a regular f-string and double braces for literal curly braces
-            # Correcting the nested f-string syntax for the title fallback
-            slide_title = slide_data.get('title', f'Slide {slide_number + 1}')
-            context_string = f"""Slide Title: {slide_title}
-Content:
-{content_text}
-
-Key Concepts: {concepts_text}
-Coaching Notes (for AI reference):
-{notes_text}
-
-Suggested Discussion Questions:
-{questions_text}
-
-General Workshop Context: {lesson_context}
-"""
-
-
-            logger.info(f"✅ Using database content for slide {slide_number + 1}")
-            logger.debug(f"Database context string preview:\n{context_string[:500]}...")
-            return context_string
+            logger.debug(f"Using compiled context for slide {slide_number + 1} ({compiled['token_count']} tokens)")
+            return compiled['context']
 
         except Exception as e:
             # If database access fails, log the error and return a minimal context string
@@ -415,15 +604,44 @@ General Workshop Context: {lesson_context}
 
     def add_message(self, role: str, content: str):
         """Add a message to the conversation history."""
-        # Simple history management
-        self.conversation_history.append({"role": role, "content": content})
-        # Optional: Limit history length to manage memory/token usage
-        self.conversation_history = self.conversation_history[-20:] # Keep last 20 messages
+        with self._history_lock:
+            # Simple history management
+            self.conversation_history.append({"role": role, "content": content})
+            # Limit history length to manage memory/token usage (in place, so the
+            # summarizer's callback and request threads share one list)
+            del self.conversation_history[:-20] # Keep last 20 messages
+
+    def _maybe_summarize(self) -> None:
+        """Fold messages that left the context window into the rolling summary (in the background)"""
+        budget = get_context_window().budget
+        if not budget.summarization:
+            return
+        with self._history_lock:
+            history = self.conversation_history
+            overflow = history[:max(0, len(history) - budget.max_messages)]
+            summary = self.conversation_summary
+        if len(overflow) < Config.SUMMARY_MIN_MESSAGES:
+            return
+        get_conversation_summarizer().submit(self, summary, overflow, self._apply_summary)
+
+    def _apply_summary(self, folded: List[Dict], summary: str) -> None:
+        """Summarizer callback (summarizer thread): adopt the summary and drop the messages it covers"""
+        with self._history_lock:
+            history = self.conversation_history
+            # Skip if the history was replaced or trimmed meanwhile (e.g. a resync)
+            if len(history) < len(folded) or any(a is not b for a, b in zip(history, folded)):
+                return
+            self.conversation_summary = summary
+            self._summary_dirty = True  # Persisted with the next turn
+            del history[:len(folded)]
+        logger.info(f"🧾 Folded {len(folded)} messages into the conversation summary ({len(summary)} chars)")
 
 
     def clear_history(self):
         """Clear the conversation history."""
-        self.conversation_history = []
+        with self._history_lock:
+            self.conversation_history = []
+            self.conversation_summary = ""
         logger.info("🗑️ Conversation history cleared")
 
     def generate_lesson_greeting(self, current_slide: int = 0, lesson_context: Dict = None) -> str:
@@ -478,12 +696,21 @@ Shall we dive in?"""
             # Fallback greeting
             return f"Welcome to this lesson! I'm your AI coach and I'm here to help you learn. We're starting with slide {current_slide + 1}. Feel free to ask me questions about anything you see here!"
     
+    def estimated_size(self) -> int:
+        """Rough bytes held by this manager's session state (for registry budgets)"""
+        history = sum(len(str(message.get("content", ""))) for message in self.conversation_history)
+        history += len(self.conversation_summary)
+        questions = sum(len(q) for q in self.coaching_context.user_questions)
+        return 2048 + history + questions
+
     def get_status(self):
         """Get current status of the LessonCoachingManager"""
         return {
             'lesson_id': self.lesson_id,
             'current_slide': self.coaching_context.slide_number,
             'conversation_history_length': len(self.conversation_history),
+            'conversation_summary_length': len(self.conversation_summary),
+            'history_seq': self.history_seq,
             'user_experience_level': self.user_profile.experience_level,
             'user_interests': self.user_profile.interests,
             'engagement_level': self.coaching_context.engagement_level,
@@ -0,0 +1,116 @@
+"""
+Prompt Assembly
+Lays out coaching prompts from most to least stable so provider prefix
+caching covers as much of each request as possible
+"""
+
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Most stable first: the base prompt changes only when an admin edits it,
+# the rolling summary every few turns, the user context every turn
+SEGMENT_ORDER = ('base', 'modifiers', 'guidelines', 'lesson', 'slide', 'summary', 'user')
+
+# Segments sent next to the newest turn instead of in the system prompt, so
+# they don't invalidate the cached system prompt + conversation prefix
+VOLATILE_SEGMENTS = ('user',)
+
+RESPONSE_GUIDELINES = """## RESPONSE GUIDELINES:
+- Keep responses focused on the current slide content
+- Maintain a conversational and encouraging tone
+- Ask relevant questions to check understanding
+- Adapt your explanation style to the user's experience level
+- Do not mention technical terms like "database" or "markdown file\""""
+
+
+def assemble_messages(segments: Dict[str, str], history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Build the message list for a chat completion
+
+    Layout: one system message with the stable segments in SEGMENT_ORDER,
+    the conversation history, then the volatile segments as a system
+    message just before the newest user message.
+
+    Args:
+        segments: Segment name -> text (empty segments are skipped)
+        history: Conversation messages, ending with the current user message
+
+    Returns:
+        Messages for the API call
+
+    Raises:
+        ValueError: For a segment name not in SEGMENT_ORDER
+    """
+    unknown = set(segments) - set(SEGMENT_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown prompt segments: {sorted(unknown)}")
+
+    stable = [segments[name].strip() for name in SEGMENT_ORDER
+              if name not in VOLATILE_SEGMENTS and segments.get(name)]
+    volatile = [segments[name].strip() for name in VOLATILE_SEGMENTS if segments.get(name)]
+
+    messages = [{"role": "system", "content": "\n\n".join(stable)}]
+    messages.extend(history[:-1])
+    if volatile:
+        messages.append({"role": "system", "content": "\n\n".join(volatile)})
+    messages.extend(history[-1:])
+    return messages
+
+
+def _usage_field(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class PromptCacheStats:
+    """Per-lesson prompt and cached-token counters from API usage reports"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lessons: Dict[str, Dict[str, int]] = {}
+
+    def record(self, lesson_id: str, usage: Any) -> Optional[int]:
+        """
+        Record one request's usage (an SDK usage object or dict)
+
+        Returns:
+            Cached prompt tokens, or None if the response carried no usage
+        """
+        prompt_tokens = _usage_field(usage, 'prompt_tokens')
+        if prompt_tokens is None:
+            return None
+        cached_tokens = _usage_field(_usage_field(usage, 'prompt_tokens_details'), 'cached_tokens') or 0
+
+        with self._lock:
+            lesson = self._lessons.setdefault(lesson_id, {
+                'requests': 0, 'cache_hits': 0, 'prompt_tokens': 0, 'cached_tokens': 0
+            })
+            lesson['requests'] += 1
+            lesson['cache_hits'] += 1 if cached_tokens else 0
+            lesson['prompt_tokens'] += prompt_tokens
+            lesson['cached_tokens'] += cached_tokens
+        logger.debug(f"🧮 Prompt cache [{lesson_id}]: {cached_tokens}/{prompt_tokens} tokens cached")
+        return cached_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters and prefix-cache hit ratio (cached / prompt tokens) per lesson"""
+        with self._lock:
+            lessons = {lesson_id: dict(counts) for lesson_id, counts in self._lessons.items()}
+        for counts in lessons.values():
+            prompt_tokens = counts['prompt_tokens']
+            counts['hit_ratio'] = round(counts['cached_tokens'] / prompt_tokens, 3) if prompt_tokens else 0.0
+        return lessons
+
+
+prompt_cache_stats = PromptCacheStats()
+
+
+def get_prompt_cache_stats() -> PromptCacheStats:
+    """Get the global prompt cache counters"""
+    return prompt_cache_stats
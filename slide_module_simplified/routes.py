@@ -11,6 +11,7 @@ import logging
 from .slide_controller import get_slide_controller
 from .voice_interaction import get_voice_interaction, process_voice_input, has_navigation_intent
 from .lesson_coaching_manager import LessonCoachingManager
+from .coaching_registry import get_coaching_registry
 from .slide_content import get_slide_content
 
 logger = logging.getLogger(__name__)
@@ -23,14 +24,12 @@ slide_controller = get_slide_controller()
 voice_interaction = get_voice_interaction()
 slide_content = get_slide_content()
 
-# Dictionary to store lesson coaching managers by lesson ID
-lesson_managers = {}
+# Lesson coaching managers, shared with the app's per-session registry
+coaching_registry = get_coaching_registry()
 
 def get_lesson_manager(lesson_id: str) -> LessonCoachingManager:
-    """Get or create a LessonCoachingManager instance for a lesson"""
-    if lesson_id not in lesson_managers:
-        lesson_managers[lesson_id] = LessonCoachingManager(lesson_id)
-    return lesson_managers[lesson_id]
+    """Get or create the shared LessonCoachingManager for a lesson"""
+    return coaching_registry.get(lesson_id)
 
 @slide_routes.route('/slides')
 def show_slides():
@@ -263,8 +262,9 @@ def reset_session():
     """Reset the current session"""
     try:
         lesson_id = request.args.get('lesson_id', 'ai-ux-design')
-        if lesson_id in lesson_managers:
-            lesson_managers[lesson_id].clear_history()
+        lesson_manager = coaching_registry.peek(lesson_id)
+        if lesson_manager:
+            lesson_manager.clear_history()
         
         return jsonify({
             "success": True,
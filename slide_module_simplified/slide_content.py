@@ -3,8 +3,12 @@ Slide Content and Knowledge Base
 Contains slide content for AI coaching context
 """
 
+import logging
 from typing import Dict, Any, List, Optional
 from .database.lesson_manager import LessonManager
+from .database import slide_context
+
+logger = logging.getLogger(__name__)
 
 class SlideContent:
     """
@@ -35,13 +39,19 @@ class SlideContent:
         # Find the slide in current slides
         for slide in self.current_slides:
             if slide['slide_number'] == slide_number:
+                # Derived fields were compiled when the lesson was ingested
+                compiled = self.lesson_manager.get_slide_context(self.current_lesson_id, slide_number)
+                if not compiled:
+                    compiled = slide_context.compile_slide_context(
+                        slide_number, slide['title'], slide['content'], slide['notes']
+                    )
                 return {
                     "title": slide['title'],
                     "content": slide['content'],
                     "notes": slide['notes'],
-                    "key_concepts": self._extract_key_concepts(slide['content']),
-                    "coaching_notes": self._generate_coaching_notes(slide),
-                    "questions_to_ask": self._generate_questions(slide)
+                    "key_concepts": list(compiled['key_concepts']),
+                    "coaching_notes": list(compiled['coaching_notes']),
+                    "questions_to_ask": list(compiled['questions_to_ask'])
                 }
         
         return self._get_default_slide()
@@ -67,69 +77,15 @@ class SlideContent:
     
     def _extract_key_concepts(self, content: str) -> List[str]:
         """Extract key concepts from slide content"""
-        try:
-            # Try to get key concepts from database
-            concepts = self.lesson_manager.extract_key_concepts(content)
-            if concepts:
-                return concepts
-        except Exception as e:
-            logger.warning(f"⚠️ Could not extract key concepts from database: {e}")
-        
-        # Fallback to simple extraction
-        if not content:
-            return []
-            
-        concepts = []
-        for line in content.split('\n'):
-            line = line.strip()
-            if line and len(line) > 3:  # Avoid very short lines
-                concepts.append(line)
-        
-        return concepts[:5]  # Limit to top 5 concepts
+        return slide_context.extract_key_concepts(content)
     
     def _generate_coaching_notes(self, slide: Dict[str, Any]) -> List[str]:
         """Generate coaching notes based on slide content"""
-        try:
-            # Try to get coaching notes from database
-            notes = self.lesson_manager.get_coaching_notes(slide)
-            if notes:
-                return notes
-        except Exception as e:
-            logger.warning(f"⚠️ Could not get coaching notes from database: {e}")
-        
-        # Fallback to basic notes
-        notes = []
-        
-        if slide.get('notes'):
-            notes.append(slide['notes'])
-        
-        if slide.get('content'):
-            notes.append("Explain the key points")
-            notes.append("Provide relevant examples")
-        
-        return notes
+        return slide_context.coaching_notes(slide.get('content'), slide.get('notes'))
     
     def _generate_questions(self, slide: Dict[str, Any]) -> List[str]:
         """Generate relevant questions based on slide content"""
-        try:
-            # Try to get questions from database
-            questions = self.lesson_manager.get_suggested_questions(slide)
-            if questions:
-                return questions
-        except Exception as e:
-            logger.warning(f"⚠️ Could not get suggested questions from database: {e}")
-        
-        # Fallback to basic questions
-        questions = []
-        
-        if slide.get('title'):
-            questions.append(f"What do you think about {slide['title']}?")
-        
-        if slide.get('content'):
-            questions.append("How would you apply this in your work?")
-            questions.append("What questions do you have about this topic?")
-        
-        return questions
+        return slide_context.suggested_questions(slide.get('title'), slide.get('content'))
     
     def get_slide_title(self, slide_number: int) -> str:
         """Get title for a specific slide"""
@@ -175,6 +131,19 @@ class SlideContent:
         """Search slide content for specific topics"""
         if not self.current_slides:
             return []
+        
+        # BM25-ranked full-text search when the FTS5 index is available
+        indexed = self.lesson_manager.search_slides(query, lesson_id=self.current_lesson_id)
+        if indexed is not None:
+            return [
+                {
+                    "slide_number": hit['slide_number'],
+                    "title": hit['title'],
+                    "relevance": hit['score'],
+                    "snippet": hit['snippet']
+                }
+                for hit in indexed
+            ]
             
         query_lower = query.lower()
         results = []
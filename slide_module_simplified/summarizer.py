@@ -0,0 +1,159 @@
+"""
+Conversation Summarizer
+Folds turns that scrolled out of the context window into a running summary,
+off the request path
+"""
+
+import re
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from config import Config
+from .context_window import clip_to_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a coaching conversation. Merge the new turns into "
+    "the summary so far. Keep the learner's name, background, goals, questions asked, "
+    "misunderstandings and what has already been explained. Write plain prose, at most "
+    "{max_words} words, with no preamble."
+)
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def _first_sentence(text: str) -> str:
+    return _SENTENCE_END.split(text.strip(), 1)[0] if text else ''
+
+
+def local_summary(previous: str, messages: List[Dict[str, str]], max_tokens: int) -> str:
+    """
+    Extractive stand-in for the summary model (no API call)
+
+    Keeps the first sentence of each folded message, newest last, and clips
+    from the front so the most recent context survives.
+    """
+    lines = [previous] if previous else []
+    for message in messages:
+        sentence = _first_sentence(message.get('content') or '')
+        if sentence:
+            speaker = 'Learner' if message.get('role') == 'user' else 'Coach'
+            lines.append(f"{speaker}: {sentence}")
+    text = ' '.join(lines)
+    if not text:
+        return ''
+    # Clip the oldest material: reverse word order, clip, restore
+    words = text.split()
+    kept = clip_to_tokens(' '.join(reversed(words)), max_tokens).removesuffix(' …').split()
+    return ' '.join(reversed(kept)) if len(kept) < len(words) else text
+
+
+class ConversationSummarizer:
+    """
+    Background worker that keeps per-session rolling summaries
+
+    Sessions submit the messages that left their context window; a worker
+    thread merges them into the session's summary with a small model (or
+    the local extractive stand-in) and hands the result back through a
+    callback. At most one job per session is queued at a time.
+    """
+
+    def __init__(self, backend: str = Config.SUMMARY_BACKEND, model: str = Config.SUMMARY_MODEL,
+                 max_tokens: int = Config.SUMMARY_MAX_TOKENS, client_factory: Optional[Callable[[], Any]] = None):
+        self.backend = backend
+        self.model = model
+        self.max_tokens = max(16, max_tokens)
+        self._client_factory = client_factory
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-summarizer")
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'completed': 0, 'skipped_busy': 0,
+                       'messages_folded': 0, 'llm_failures': 0}
+
+    def submit(self, key: Hashable, previous: str, messages: List[Dict[str, str]],
+               on_done: Callable[[List[Dict[str, str]], str], None]) -> bool:
+        """
+        Queue messages to fold into a session's summary
+
+        Args:
+            key: Session identity (one job per key at a time)
+            previous: The session's current summary
+            messages: Messages to fold, oldest first
+            on_done: Called from the worker with (messages, new summary)
+
+        Returns:
+            False if the session already has a job queued
+        """
+        with self._lock:
+            if key in self._pending:
+                self._stats['skipped_busy'] += 1
+                return False
+            self._pending.add(key)
+            self._stats['submitted'] += 1
+        self._executor.submit(self._run, key, previous, list(messages), on_done)
+        return True
+
+    def _run(self, key: Hashable, previous: str, messages: List[Dict[str, str]],
+             on_done: Callable[[List[Dict[str, str]], str], None]) -> None:
+        try:
+            summary = self.summarize(previous, messages)
+            on_done(messages, summary)
+            with self._lock:
+                self._stats['completed'] += 1
+                self._stats['messages_folded'] += len(messages)
+        except Exception as e:
+            logger.error(f"❌ Conversation summary failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def summarize(self, previous: str, messages: List[Dict[str, str]]) -> str:
+        """Merge messages into the previous summary (bounded to max_tokens)"""
+        if self.backend == 'llm':
+            try:
+                return clip_to_tokens(self._summarize_with_llm(previous, messages), self.max_tokens)
+            except Exception as e:
+                with self._lock:
+                    self._stats['llm_failures'] += 1
+                logger.warning(f"⚠️ Summary model unavailable, using local summary: {e}")
+        return local_summary(previous, messages, self.max_tokens)
+
+    def _summarize_with_llm(self, previous: str, messages: List[Dict[str, str]]) -> str:
+        if self._client_factory is None:
+            from llm_client import get_shared_openai_client
+            self._client_factory = get_shared_openai_client
+        turns = '\n'.join(
+            f"{'Learner' if m.get('role') == 'user' else 'Coach'}: {m.get('content') or ''}" for m in messages
+        )
+        response = self._client_factory().chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT.format(max_words=self.max_tokens * 3 // 4)},
+                {"role": "user", "content": f"Summary so far:\n{previous or 'None'}\n\nNew turns:\n{turns}"}
+            ],
+            temperature=0.2,
+            max_tokens=self.max_tokens
+        )
+        return (response.choices[0].message.content or '').strip()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        stats['backend'] = self.backend
+        stats['model'] = self.model if self.backend == 'llm' else None
+        return stats
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+conversation_summarizer = ConversationSummarizer()
+
+
+def get_conversation_summarizer() -> ConversationSummarizer:
+    """Get the global conversation summarizer"""
+    return conversation_summarizer
@@ -1,9 +1,11 @@
 """
 System Prompt Manager - Centralizes all system prompt handling
 """
-from typing import Dict, Optional, List
+from typing import Dict, FrozenSet, Iterable, Optional, List, Tuple
+from dataclasses import dataclass
 import json
 import logging
+import threading
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -20,13 +22,33 @@ except ImportError:
     json_deserialize = None
     logger.warning("⚠️ Database components not available for SystemPromptManager")
 
+# Distinct context sets kept before the variant cache is reset
+MAX_PROMPT_VARIANTS = 64
+
+@dataclass(frozen=True)
+class PromptVariant:
+    """A system prompt compiled for one set of contexts"""
+    contexts: FrozenSet[str]
+    base_prompt: str
+    modifiers: Tuple[str, ...]  # Modifier texts, sorted by context name
+    text: str
+
 class SystemPromptManager:
-    """Manages system prompts and their modifications across the application"""
+    """
+    Manages system prompts and their modifications across the application
+
+    Requests resolve the prompt for their own contexts with resolve(), which
+    has no side effects; compiled variants are memoized per context set and
+    dropped whenever the base prompt or modifiers change. active_contexts
+    are admin-selected defaults applied to every variant.
+    """
     
     def __init__(self):
         self.base_prompt = ""
-        self.modifiers = {}  # Store prompt modifiers by context
-        self.active_contexts = set()  # Track which contexts are active
+        self.modifiers = {}  # Store prompt modifiers by context (replaced, never mutated)
+        self.active_contexts = frozenset()  # Default contexts (replaced, never mutated)
+        self._variants: Dict[FrozenSet[str], PromptVariant] = {}
+        self._variant_lock = threading.Lock()
         self._load_settings()
         
     def _load_settings(self):
@@ -56,6 +78,7 @@ class SystemPromptManager:
                         "The database may be corrupted. Please contact your system administrator."
                     )
 
+                self._invalidate_variants()
                 logger.info("✅ Loaded system settings from database")
                 logger.info(f"Loaded base prompt (first 50 chars): {self.base_prompt[:50]}...")
                 logger.info(f"Loaded {len(self.modifiers)} modifiers.")
@@ -131,35 +154,41 @@ class SystemPromptManager:
         
     def set_base_prompt(self, prompt: str) -> None:
         """Set the base system prompt and save to DB"""
-        self.base_prompt = prompt
+        with self._variant_lock:
+            self.base_prompt = prompt
+            self._variants = {}
         logger.info(f"Base system prompt updated in memory: {len(prompt)} chars")
         logger.info(f"Attempting to save base prompt to DB (first 50 chars): {self.base_prompt[:50]}...")
         self._save_settings() # Save changes to database
         
     def add_modifier(self, context: str, modifier: str) -> None:
         """Add a prompt modifier for a specific context and save to DB"""
-        self.modifiers[context] = modifier
+        with self._variant_lock:
+            self.modifiers = {**self.modifiers, context: modifier}
+            self._variants = {}
         logger.info(f"Added prompt modifier for context: {context} in memory")
         self._save_settings() # Save changes to database
         
     def remove_modifier(self, context: str) -> None:
         """Remove a prompt modifier and save to DB"""
         if context in self.modifiers:
-            del self.modifiers[context]
+            with self._variant_lock:
+                self.modifiers = {name: text for name, text in self.modifiers.items() if name != context}
+                self._variants = {}
             logger.info(f"Removed prompt modifier for context: {context} from memory")
             self._save_settings() # Save changes to database
             
     def activate_context(self, context: str) -> None:
         """Activate a context's modifier"""
         if context in self.modifiers:
-            self.active_contexts.add(context)
+            self.active_contexts = self.active_contexts | {context}
             logger.info(f"Activated context: {context}")
             # Activation is only in-memory, no DB save needed
             
     def deactivate_context(self, context: str) -> None:
         """Deactivate a context's modifier"""
         if context in self.active_contexts:
-            self.active_contexts.remove(context)
+            self.active_contexts = self.active_contexts - {context}
             logger.info(f"Deactivated context: {context}")
             # Deactivation is only in-memory, no DB save needed
             
@@ -168,16 +197,42 @@ class SystemPromptManager:
         if not self.base_prompt:
             logger.warning("No base prompt set")
             return ""
-            
-        # Start with base prompt
-        full_prompt = self.base_prompt
-        
-        # Add active modifiers
-        for context in self.active_contexts:
-            if context in self.modifiers:
-                full_prompt += f"\n\n{self.modifiers[context]}"
-                
-        return full_prompt
+        return self.resolve().text
+
+    def resolve(self, contexts: Iterable[str] = ()) -> PromptVariant:
+        """
+        Get the prompt variant for a request's contexts (plus the defaults)
+
+        Args:
+            contexts: Context names for this request; unknown ones are ignored
+
+        Returns:
+            Immutable PromptVariant, shared by every request with the same contexts
+        """
+        requested = frozenset(contexts) | self.active_contexts
+        variant = self._variants.get(requested)
+        if variant is not None:
+            return variant
+
+        with self._variant_lock:
+            variant = self._variants.get(requested)
+            if variant is None:
+                variant = self._compile_variant(requested)
+                if len(self._variants) >= MAX_PROMPT_VARIANTS:
+                    self._variants = {}
+                self._variants = {**self._variants, requested: variant}
+        return variant
+
+    def _compile_variant(self, requested: FrozenSet[str]) -> PromptVariant:
+        # Sorted so every variant with the same contexts has the same prefix
+        names = sorted(context for context in requested if context in self.modifiers)
+        modifiers = tuple(self.modifiers[name] for name in names)
+        text = "\n\n".join((self.base_prompt,) + modifiers) if self.base_prompt else ""
+        return PromptVariant(frozenset(names), self.base_prompt, modifiers, text)
+
+    def _invalidate_variants(self) -> None:
+        with self._variant_lock:
+            self._variants = {}
         
     def get_status(self) -> Dict:
         """Get current system prompt status"""
@@ -185,7 +240,8 @@ class SystemPromptManager:
             'base_prompt_length': len(self.base_prompt) if self.base_prompt else 0,
             'active_contexts': list(self.active_contexts),
             'available_modifiers': list(self.modifiers.keys()),
-            'full_prompt_length': len(self.get_full_prompt())
+            'full_prompt_length': len(self.get_full_prompt()),
+            'cached_variants': len(self._variants)
         }
 
     def initialize_database(self) -> None:
@@ -494,11 +494,6 @@ const ChatModule = {
             const formData = new FormData();
             formData.append('text', messageText);
             
-            // NEW: Add conversation history to provide context
-            const recentContext = ConversationMemory.getRecentContext(10); // Get last 10 messages
-            formData.append('conversation_history', JSON.stringify(recentContext));
-            console.log('📚 Sending conversation history:', recentContext);
-            
             // Add current slide index and context if available
             if (window.currentSlideData) {
                 // *** Add the current slide index as 'current_slide' ***
@@ -537,25 +532,41 @@ const ChatModule = {
                 console.log('👤 Sending anonymous request');
             }
             
+            // 🎙️ Voice mode in a lesson: chat and speech in a single streamed round trip
+            const chatContainer = document.getElementById('chatContainer');
+            const isVoiceMode = chatContainer && !chatContainer.classList.contains('expanded');
+            if (isVoiceMode && window.lessonContext && window.lessonContext.isLessonMode && window.lessonContext.lessonId) {
+                const streamed = await ChatModule.streamLessonChatAndSpeak(messageText);
+                if (streamed) {
+                    return;
+                }
+                console.log('🔄 Chat-stream unavailable - falling back to separate chat and TTS requests');
+            }
+            
             // Send request to backend
-            const response = await fetch(chatEndpoint, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    text: messageText,
-                    current_slide: window.currentSlideData ? window.currentSlideData.index : 0,
-                    conversation_history: recentContext,
-                    slide_context: window.currentSlideData ? `[SLIDE_CONTEXT: Currently viewing slide ${window.currentSlideData.index + 1}/${window.currentSlideData.totalSlides}: "${window.currentSlideData.title}"]` : ''
-                })
-            });
+            const requestBody = {
+                text: messageText,
+                current_slide: window.currentSlideData ? window.currentSlideData.index : 0,
+                slide_context: window.currentSlideData ? `[SLIDE_CONTEXT: Currently viewing slide ${window.currentSlideData.index + 1}/${window.currentSlideData.totalSlides}: "${window.currentSlideData.title}"]` : ''
+            };
+            const lessonId = window.lessonContext && window.lessonContext.isLessonMode ? window.lessonContext.lessonId : null;
+            // Lesson history is held server-side: send only the new message
+            const response = lessonId
+                ? await ChatSync.post(chatEndpoint, lessonId, requestBody)
+                : await fetch(chatEndpoint, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(requestBody)
+                });
             
             if (!response.ok) {
                 throw new Error(`Server error: ${response.status}`);
             }
             
             const data = await response.json();
+            if (lessonId) {
+                ChatSync.setSeq(lessonId, data.seq);
+            }
             const aiResponse = data.response || 'Sorry, I could not process your request.';
             
             // Step 2: Determine mode and handle response appropriately
@@ -568,6 +579,167 @@ const ChatModule = {
         }
     },
 
+    // Stream the lesson answer and its audio from /lesson/<id>/chat-stream.
+    // Audio for each sentence is queued and played as soon as it arrives, while
+    // the model is still generating. Returns false if nothing was received so
+    // the caller can fall back to the separate chat + TTS requests.
+    async streamLessonChatAndSpeak(messageText) {
+        const lessonId = window.lessonContext.lessonId;
+        const endpoint = `/lesson/${encodeURIComponent(lessonId)}/chat-stream`;
+        const controller = new AbortController();
+        const startTime = Date.now();
+        let receivedAny = false;
+        let responseText = '';
+        
+        // Sentence audio queue, played back to back
+        const chunkAudio = {};
+        const chunkWords = {};
+        const playQueue = [];
+        let playing = false;
+        let streamDone = false;
+        
+        const finishSpeaking = () => {
+            AppState.isAISpeaking = false;
+            AppState.currentAudioElement = null;
+            AppState.conversationState = 'ready';
+            UIControls.updateButtonState();
+            if (window.ttsVisualizer) {
+                window.ttsVisualizer.stop();
+            }
+            SpeechModule.onAIFinishedSpeaking();
+        };
+        
+        const playNext = () => {
+            if (AppState.isInterrupted) {
+                controller.abort();
+                playQueue.length = 0;
+                playing = false;
+                return;
+            }
+            if (playQueue.length === 0) {
+                playing = false;
+                if (streamDone) {
+                    console.log('🔇 AI finished speaking');
+                    finishSpeaking();
+                }
+                return;
+            }
+            
+            playing = true;
+            const next = playQueue.shift();
+            const audioUrl = URL.createObjectURL(next.blob);
+            const audio = new Audio(audioUrl);
+            AppState.currentAudioElement = audio;
+            
+            // Word timings from the server keep the visualizer in sync with speech
+            if (window.ttsVisualizer && next.words.length) {
+                window.ttsVisualizer.syncWithTimestamps(audio, next.words);
+            }
+            AppState.isAISpeaking = true;
+            AppState.conversationState = 'speaking';
+            UIControls.updateButtonState();
+            
+            audio.onended = () => {
+                URL.revokeObjectURL(audioUrl);
+                playNext();
+            };
+            audio.onerror = (error) => {
+                console.error('Audio playback error:', error);
+                URL.revokeObjectURL(audioUrl);
+                playNext();
+            };
+            audio.play().catch((error) => {
+                console.error('Audio playback failed:', error);
+                playNext();
+            });
+        };
+        
+        try {
+            ChatModule.updateStatusMessage('🎙️ Generating speech<span class="thinking-dots"></span>', 'ai-generating-speech');
+            
+            const response = await ChatSync.post(endpoint, lessonId, {
+                text: messageText,
+                current_slide: window.currentSlideData ? window.currentSlideData.index : 0
+            }, { signal: controller.signal });
+            
+            if (!response.ok || !response.body) {
+                throw new Error(`Chat-stream failed: ${response.status}`);
+            }
+            
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffered = '';
+            
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffered += decoder.decode(value, { stream: true });
+                
+                let newline;
+                while ((newline = buffered.indexOf('\n')) >= 0) {
+                    const line = buffered.slice(0, newline).trim();
+                    buffered = buffered.slice(newline + 1);
+                    if (!line) continue;
+                    
+                    const event = JSON.parse(line);
+                    receivedAny = true;
+                    
+                    if (event.type === 'text') {
+                        responseText += event.delta;
+                    } else if (event.type === 'audio') {
+                        const bytes = Uint8Array.from(atob(event.data), c => c.charCodeAt(0));
+                        (chunkAudio[event.chunk] = chunkAudio[event.chunk] || []).push(bytes);
+                    } else if (event.type === 'timestamps') {
+                        (chunkWords[event.chunk] = chunkWords[event.chunk] || []).push(...event.words);
+                    } else if (event.type === 'chunk_end') {
+                        const parts = chunkAudio[event.chunk] || [];
+                        const words = chunkWords[event.chunk] || [];
+                        delete chunkAudio[event.chunk];
+                        delete chunkWords[event.chunk];
+                        if (parts.length === 0) continue;
+                        
+                        if (!playing && playQueue.length === 0 && !AppState.isAISpeaking) {
+                            console.log(`⚡ First audio ready in ${Date.now() - startTime}ms`);
+                            ChatModule.clearStatusMessage();
+                            if (window.ttsVisualizer && window.showVisualizer) {
+                                window.showVisualizer(event.text, 160, 50);
+                            }
+                        }
+                        playQueue.push({ blob: new Blob(parts, { type: 'audio/mpeg' }), words });
+                        if (!playing) playNext();
+                    } else if (event.type === 'error') {
+                        console.error('Chat-stream error:', event.message);
+                    } else if (event.type === 'done') {
+                        responseText = event.response || responseText;
+                        ChatSync.setSeq(lessonId, event.seq);
+                    }
+                }
+            }
+        } catch (error) {
+            if (error.name === 'AbortError') {
+                console.log('🛑 Chat-stream aborted');
+            } else {
+                console.error('Chat-stream error:', error);
+            }
+            if (!receivedAny) {
+                ChatModule.clearStatusMessage();
+                return false;
+            }
+        }
+        
+        streamDone = true;
+        ChatModule.clearStatusMessage();
+        console.log(`✅ Chat-stream finished in ${Date.now() - startTime}ms`);
+        
+        if (responseText) {
+            await ChatModule.addMessage(responseText, false, 'typewriter');
+        }
+        if (!playing) {
+            finishSpeaking();
+        }
+        return true;
+    },
+
     // Handle AI response based on current mode and TTS availability
     async handleAIResponse(aiResponse, isError = false) {
         const chatContainer = document.getElementById('chatContainer');
@@ -1615,17 +1787,14 @@ const SpeechModule = {
             const chatEndpoint = `/lesson/${encodeURIComponent(lessonId)}/chat`;
             console.log(`📞 Sending greeting request to: ${chatEndpoint}`);
             
-            // NEW: Get conversation history for context
-            const recentContext = ConversationMemory.getRecentContext(10);
-            
-            // Send special greeting trigger to backend
+            // Send special greeting trigger to backend (greetings don't touch the history)
             const response = await fetch(chatEndpoint, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     text: "START_AI_COACH_GREETING",
                     is_greeting_trigger: true,
-                    conversation_history: recentContext, // NEW: Include conversation history
+                    session_id: ChatSync.sessionId(),
                     current_slide: window.currentSlideData?.index || 0
                 })
             });
@@ -2188,6 +2357,58 @@ document.addEventListener('DOMContentLoaded', async () => {
     console.log('✅ CoCreate AI Coach initialized successfully!');
 });
 
+// ============================================================================
+// Chat History Sync
+// ============================================================================
+// The server keeps each session's lesson conversation. Turns carry only the
+// new message and the seq of the last answer this client received; on a 409
+// the client resends once with its own history to resync.
+const ChatSync = {
+    sessionId() {
+        let id = localStorage.getItem('coaching_session_id');
+        if (!id) {
+            id = window.crypto && crypto.randomUUID
+                ? crypto.randomUUID()
+                : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+            localStorage.setItem('coaching_session_id', id);
+        }
+        return id;
+    },
+
+    getSeq(lessonId) {
+        const seq = sessionStorage.getItem(`coaching_seq:${lessonId}`);
+        return seq === null ? null : Number(seq);
+    },
+
+    setSeq(lessonId, seq) {
+        if (typeof seq === 'number' && seq > 0) {
+            sessionStorage.setItem(`coaching_seq:${lessonId}`, String(seq));
+        }
+    },
+
+    // POST a lesson chat turn, resyncing once if the server history diverged
+    async post(endpoint, lessonId, body, options = {}) {
+        const send = (extra) => fetch(endpoint, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                ...body,
+                session_id: this.sessionId(),
+                seq: this.getSeq(lessonId),
+                ...extra
+            }),
+            ...options
+        });
+
+        const response = await send({});
+        if (response.status !== 409) {
+            return response;
+        }
+        console.log('🔀 Conversation history out of sync - resending full history');
+        return send({ resync: true, conversation_history: ConversationMemory.getRecentContext(10) });
+    }
+};
+
 // NEW: Conversation Memory Management
 const ConversationMemory = {
     // Initialize conversation memory
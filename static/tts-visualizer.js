@@ -22,6 +22,13 @@ class TTSVisualizer {
         this.lastFrameTime = 0;
         this.phase = 0;
         
+        // Word-timing sync (see syncWithTimestamps)
+        this.level = 1;
+        this.timedAudio = null;
+        this.wordTimings = [];
+        this.activeWordIndex = -1;
+        this.onWord = null;
+        
         // Initialize canvas size
         this.resize();
         window.addEventListener('resize', () => this.resize());
@@ -64,7 +71,59 @@ class TTSVisualizer {
         this.animate();
     }
     
+    /**
+     * Drive the visualization from server word timings instead of text estimates
+     * @param {HTMLAudioElement} audio - Element playing the timed audio
+     * @param {Array} words - [{word, start, end}] with times in ms from audio start
+     * @param {Function} onWord - Optional callback(word, index) for captions
+     */
+    syncWithTimestamps(audio, words, onWord = null) {
+        this.timedAudio = audio;
+        this.wordTimings = (words || []).filter(w => w && w.word);
+        this.activeWordIndex = -1;
+        this.onWord = onWord;
+        if (this.wordTimings.length) {
+            this.textAnalysis = this.analyzeText(this.wordTimings.map(w => w.word).join(' '));
+        }
+    }
+    
+    clearTimestamps() {
+        this.timedAudio = null;
+        this.wordTimings = [];
+        this.activeWordIndex = -1;
+        this.onWord = null;
+        this.level = 1;
+    }
+    
+    updateTimedLevel() {
+        if (!this.timedAudio || !this.wordTimings.length) {
+            this.level = 1;
+            return;
+        }
+        
+        const nowMs = this.timedAudio.currentTime * 1000;
+        let index = -1;
+        for (let i = 0; i < this.wordTimings.length; i++) {
+            const timing = this.wordTimings[i];
+            const end = timing.end != null ? timing.end : (this.wordTimings[i + 1] ? this.wordTimings[i + 1].start : timing.start + 400);
+            if (nowMs >= timing.start && nowMs < end) {
+                index = i;
+                break;
+            }
+        }
+        
+        // Full movement while a word is spoken, near-still in the gaps
+        this.level = index >= 0 ? 1 : 0.15;
+        if (index >= 0 && index !== this.activeWordIndex) {
+            this.activeWordIndex = index;
+            if (this.onWord) {
+                this.onWord(this.wordTimings[index].word, index);
+            }
+        }
+    }
+    
     stop() {
+        this.clearTimestamps();
         this.isActive = false;
         if (this.animationFrame) {
             cancelAnimationFrame(this.animationFrame);
@@ -106,6 +165,7 @@ class TTSVisualizer {
         this.lastFrameTime = now;
         
         this.phase += deltaTime * this.options.speed;
+        this.updateTimedLevel();
         
         // Clear canvas
         this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
@@ -143,7 +203,7 @@ class TTSVisualizer {
             const patternIndex = Math.floor(i / barCount * this.textAnalysis.length);
             const pattern = this.textAnalysis[patternIndex] || this.textAnalysis[0];
             
-            const amplitude = pattern.amplitude * Math.sin(this.phase * pattern.frequency);
+            const amplitude = this.level * pattern.amplitude * Math.sin(this.phase * pattern.frequency);
             const barHeight = Math.abs(amplitude) * height * this.options.height * pattern.emphasis;
             
             this.ctx.fillStyle = this.getColor(amplitude);
@@ -162,7 +222,7 @@ class TTSVisualizer {
             const patternIndex = Math.floor(x / width * this.textAnalysis.length);
             const pattern = this.textAnalysis[patternIndex] || this.textAnalysis[0];
             
-            const amplitude = pattern.amplitude * Math.sin(this.phase * pattern.frequency + x * 0.01);
+            const amplitude = this.level * pattern.amplitude * Math.sin(this.phase * pattern.frequency + x * 0.01);
             const y = centerY + amplitude * height * this.options.height * pattern.emphasis;
             
             this.ctx.lineTo(x, y);
@@ -183,7 +243,7 @@ class TTSVisualizer {
             const patternIndex = Math.floor(i / dotCount * this.textAnalysis.length);
             const pattern = this.textAnalysis[patternIndex] || this.textAnalysis[0];
             
-            const amplitude = pattern.amplitude * Math.sin(this.phase * pattern.frequency);
+            const amplitude = this.level * pattern.amplitude * Math.sin(this.phase * pattern.frequency);
             const y = centerY + amplitude * height * this.options.height * pattern.emphasis;
             
             this.ctx.beginPath();
@@ -0,0 +1,93 @@
+"""
+Shared test helpers
+
+slide_module_simplified modules are loaded straight from their files:
+importing the package initializes the application database. Modules with
+relative imports are loaded under a throwaway package (see fake_package).
+"""
+
+import importlib.util
+import sqlite3
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+MODULE_ROOT = ROOT / "slide_module_simplified"
+
+# Add parent directory to path to import project modules
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+
+def load_module(name, relative_path):
+    """
+    Load a slide_module_simplified module from its file
+
+    Args:
+        name: Module name to register in sys.modules (dotted under a
+            fake_package when the module uses relative imports)
+        relative_path: Path of the source file under slide_module_simplified
+
+    Returns:
+        The executed module
+    """
+    spec = importlib.util.spec_from_file_location(name, MODULE_ROOT / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def fake_package(name, **attributes):
+    """
+    Register an empty package in sys.modules so relative imports resolve
+
+    Args:
+        name: Dotted package name; parents must be registered first
+        **attributes: Names the package provides (e.g. a stand-in get_db_connection)
+
+    Returns:
+        The package module
+    """
+    package = types.ModuleType(name)
+    package.__path__ = []
+    for key, value in attributes.items():
+        setattr(package, key, value)
+    sys.modules[name] = package
+    return package
+
+
+class SharedConnection:
+    """Connection handle whose close() keeps a shared in-memory database"""
+
+    def __init__(self, db):
+        self._db = db
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def close(self):
+        pass
+
+
+def memory_db(script=None, row_factory=None):
+    """
+    Throwaway in-memory database shared across handles and threads
+
+    Returns:
+        (db, connect) where connect() stands in for get_db_connection
+    """
+    db = sqlite3.connect(":memory:", check_same_thread=False)
+    db.row_factory = row_factory
+    if script:
+        db.executescript(script)
+    return db, lambda: SharedConnection(db)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a fresh SQLite database file for one test"""
+    return str(tmp_path / "test.db")
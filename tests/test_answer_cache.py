@@ -0,0 +1,66 @@
+"""
+Tests for the near-duplicate answer cache
+"""
+
+import time
+
+from conftest import load_module
+
+answer_cache = load_module("answer_cache", "answer_cache.py")
+
+
+def make_cache(**kwargs):
+    options = {'threshold': 0.85, 'ttl_seconds': 60, 'max_entries_per_slide': 8, 'enabled': True}
+    options.update(kwargs)
+    return answer_cache.AnswerCache(**options)
+
+
+def test_near_duplicates_hit_and_different_questions_miss():
+    cache = make_cache()
+    assert cache.store("ux", 2, "prompt", "What is a wireframe?", "A wireframe is a layout sketch.")
+
+    assert cache.lookup("ux", 2, "prompt", "what are wireframes") == "A wireframe is a layout sketch."
+    assert cache.lookup("ux", 2, "prompt", "Can you tell me what a wireframe is, please?") is not None
+    assert cache.lookup("ux", 2, "prompt", "What is a prototype?") is None
+    assert cache.lookup("ux", 2, "prompt", "Why use wireframes?") is None
+    # Same question, different slide or system prompt
+    assert cache.lookup("ux", 3, "prompt", "What is a wireframe?") is None
+    assert cache.lookup("ux", 2, "other prompt", "What is a wireframe?") is None
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 2 and stats['lookups'] == 6
+    assert stats['lessons']['ux']['hit_rate'] == 0.333
+
+
+def test_questions_about_earlier_turns_are_not_cached():
+    cache = make_cache()
+    assert not cache.store("ux", 0, "prompt", "What is it?", "It is a wireframe.")
+    assert cache.lookup("ux", 0, "prompt", "Explain that again") is None
+    assert cache.get_stats()['uncacheable'] == 1
+
+
+def test_entries_expire_and_content_changes_invalidate():
+    cache = make_cache(ttl_seconds=0.05)
+    cache.store("ux", 0, "prompt", "What is UX?", "User experience.", content_version=1)
+    assert cache.lookup("ux", 0, "prompt", "what is ux", content_version=1) == "User experience."
+    time.sleep(0.1)
+    assert cache.lookup("ux", 0, "prompt", "what is ux", content_version=1) is None
+
+    cache = make_cache()
+    cache.store("ux", 0, "prompt", "What is UX?", "User experience.", content_version=1)
+    cache.store("ai", 0, "prompt", "What is UX?", "User experience.", content_version=1)
+    assert cache.lookup("ux", 0, "prompt", "what is ux", content_version=2) is None
+    assert cache.lookup("ai", 0, "prompt", "what is ux", content_version=1) == "User experience."
+    assert cache.get_stats()['invalidations'] == 1
+
+
+def test_negated_and_contrastive_questions_are_never_matched():
+    cache = make_cache()
+    cache.store("ux", 0, "prompt", "Why is a wireframe useful?", "It shows structure early.")
+
+    for question in ("Why is a wireframe not useful?", "Why isn't a wireframe useful?",
+                     "Why is a wireframe useful but slow?", "Why is a wireframe vs a mockup useful?"):
+        assert cache.lookup("ux", 0, "prompt", question) is None
+        assert not cache.store("ux", 0, "prompt", question, "Different answer.")
+
+    assert cache.lookup("ux", 0, "prompt", "why are wireframes useful") == "It shows structure early."
@@ -0,0 +1,141 @@
+"""
+Tests for the sentence-level TTS audio cache
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import tts module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tts.base import TTSProvider
+from tts.audio_cache import AudioCache, CachedTTSProvider
+
+
+class RecordingProvider(TTSProvider):
+    """Fake provider that returns the text as bytes and records calls"""
+
+    def __init__(self):
+        super().__init__(api_key="test")
+        self.calls = []
+
+    async def synthesize(self, text, voice_id, **options):
+        self.calls.append(text)
+        return text.encode()
+
+    async def stream(self, text, voice_id, **options):
+        self.calls.append(text)
+        yield text.encode()
+
+    def get_voices(self):
+        return [{"id": "voice"}]
+
+    def validate_text(self, text):
+        return True, ""
+
+    def stream_sync_generator(self, text, voice_id, **options):
+        self.calls.append(text)
+        yield text.encode()
+
+
+def make_cached(tmp_path, memory_budget=1024 * 1024):
+    provider = RecordingProvider()
+    cache = AudioCache(memory_budget_bytes=memory_budget, disk_budget_bytes=1024 * 1024,
+                       disk_dir=str(tmp_path / "cache"))
+    return provider, CachedTTSProvider(provider, "fake", cache)
+
+
+def test_shared_sentences_are_partial_hits(tmp_path):
+    provider, cached = make_cached(tmp_path)
+
+    first = b"".join(cached.stream_sync_generator("Welcome to the lesson. Let's look at wireframes.", "voice", speed="0"))
+    provider.calls.clear()
+    second = b"".join(cached.stream_sync_generator("Welcome to the lesson. Any questions so far?", "voice", speed="0"))
+
+    assert first.startswith(b"Welcome to the lesson.")
+    assert second == b"Welcome to the lesson.Any questions so far?"
+    assert provider.calls == ["Any questions so far?"]
+
+
+def test_key_includes_synthesis_options(tmp_path):
+    provider, cached = make_cached(tmp_path)
+
+    cached.synthesize_sync("This sentence is cached.", "voice", speed="0")
+    cached.synthesize_sync("This sentence is cached.", "voice", speed="0.5")
+    cached.synthesize_sync("This  sentence is cached. ", "voice", speed="0")
+
+    assert provider.calls == ["This sentence is cached.", "This sentence is cached."]
+
+
+def test_unkeyed_options_bypass_cache(tmp_path):
+    provider, cached = make_cached(tmp_path)
+
+    for _ in range(2):
+        cached.synthesize_sync("Feeling excited today.", "voice", emotional_parameters={"emotions": {"joy": 1}})
+
+    assert len(provider.calls) == 2
+    assert cached.get_cache_stats()["bypassed"] == 2
+
+
+def test_disk_tier_survives_memory_eviction(tmp_path):
+    provider, cached = make_cached(tmp_path, memory_budget=30)
+
+    cached.synthesize_sync("The first sentence is long enough.", "voice")
+    cached.synthesize_sync("The second sentence evicts the first.", "voice")
+    provider.calls.clear()
+
+    audio = cached.synthesize_sync("The first sentence is long enough.", "voice")
+
+    assert audio == b"The first sentence is long enough."
+    assert provider.calls == []
+    assert cached.get_cache_stats()["disk_hits"] == 1
+
+
+def test_disk_budget_evicts_oldest(tmp_path):
+    cache = AudioCache(memory_budget_bytes=1024, disk_budget_bytes=10, disk_dir=str(tmp_path / "cache"))
+
+    cache.put("a" * 64, b"123456")
+    cache.put("b" * 64, b"789012")
+
+    stats = cache.get_stats()
+    assert stats["disk_entries"] == 1
+    assert stats["disk_bytes"] == 6
+    assert not (tmp_path / "cache" / "aa" / ("a" * 64 + ".mp3")).exists()
+
+
+class TimingOutProvider(RecordingProvider):
+    """Fake provider whose stream stalls after the first chunk (uses the base sync bridge)"""
+
+    async def stream(self, text, voice_id, **options):
+        self.calls.append(text)
+        yield b"partial"
+        raise TimeoutError("stalled")
+
+    stream_sync_generator = TTSProvider.stream_sync_generator
+
+
+def test_timed_out_stream_is_not_cached(tmp_path):
+    provider = TimingOutProvider()
+    cached = CachedTTSProvider(provider, "fake", AudioCache(disk_dir=str(tmp_path / "cache")))
+
+    for _ in range(2):
+        chunks = []
+        try:
+            for chunk in cached.stream_sync_generator("Hello there.", "voice"):
+                chunks.append(chunk)
+        except TimeoutError:
+            pass
+        assert chunks == [b"partial"]
+
+    assert len(provider.calls) == 2
+    assert cached.get_cache_stats()['stores'] == 0
+
+
+def test_timed_streams_are_cached_whole(tmp_path):
+    provider, cached = make_cached(tmp_path)
+
+    first = list(cached.stream_with_timestamps_sync("Hello there. Welcome back.", "voice", speed="0"))
+    second = list(cached.stream_with_timestamps_sync("Hello there. Welcome back.", "voice", speed="0"))
+
+    assert first == second == [{'type': 'audio', 'data': b"Hello there. Welcome back."}]
+    assert provider.calls == ["Hello there. Welcome back."]
@@ -0,0 +1,60 @@
+"""
+Tests for signed auth tokens and revocation epochs
+"""
+
+from conftest import fake_package, load_module, memory_db
+
+# The module's .models import is pointed at a throwaway database
+_db, _connect = memory_db()
+fake_package("auth_tokens_test_pkg")
+fake_package("auth_tokens_test_pkg.models", get_db_connection=_connect)
+auth_tokens = load_module("auth_tokens_test_pkg.auth_tokens", "database/auth_tokens.py")
+auth_tokens.create_auth_token_tables(_db.cursor())
+
+
+def test_signed_token_roundtrip_and_tamper():
+    signer = auth_tokens.TokenSigner("a:secret-a")
+    token = signer.sign({"uid": "user-1", "exp": 123})
+
+    assert auth_tokens.is_signed_token(token)
+    assert signer.verify(token) == {"uid": "user-1", "exp": 123}
+
+    version, kid, body, signature = token.split(".")
+    forged = auth_tokens.TokenSigner("a:other").sign({"uid": "user-2", "exp": 123}).split(".")[2]
+    assert signer.verify(".".join([version, kid, forged, signature])) is None
+    assert signer.verify(token[:-2] + "xx") is None
+    assert signer.verify("not-a-token") is None
+
+
+def test_rotated_keys_still_verify_old_tokens():
+    old = auth_tokens.TokenSigner("a:secret-a")
+    token = old.sign({"uid": "user-1"})
+
+    rotated = auth_tokens.TokenSigner("b:secret-b,a:secret-a")
+    assert rotated.verify(token) == {"uid": "user-1"}
+    assert rotated.sign({"uid": "user-1"}).split(".")[1] == "b"
+    assert auth_tokens.TokenSigner("b:secret-b").verify(token) is None
+
+
+def test_database_keys_are_generated_once_and_rotate():
+    signer = auth_tokens.TokenSigner("")
+    token = signer.sign({"uid": "user-1"})
+    assert auth_tokens.TokenSigner("").verify(token) == {"uid": "user-1"}
+
+    new_kid = signer.rotate(keep=2)
+    assert signer.sign({"uid": "user-1"}).split(".")[1] == new_kid
+    assert signer.verify(token) == {"uid": "user-1"}
+
+
+def test_revocation_epoch_bump_is_visible_without_refresh():
+    epochs = auth_tokens.RevocationEpochs(refresh_seconds=3600)
+    assert epochs.current("user-1") == 0
+
+    cursor = _db.cursor()
+    assert epochs.bump(cursor, "user-1") == 1
+    assert epochs.bump(cursor, "user-1") == 2
+    _db.commit()
+
+    assert epochs.current("user-1") == 2
+    assert auth_tokens.RevocationEpochs.read(cursor, "user-1") == 2
+    assert epochs.get_stats()["refreshes"] == 1
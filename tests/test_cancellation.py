@@ -0,0 +1,118 @@
+"""
+Tests for client-disconnect cancellation of TTS streams
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path to import tts module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tts.base import TTSProvider
+from tts.cancellation import CancellationToken, cancellable_stream, cancellation_scope, cancellation_stats
+from tts.pipeline import pipelined_stream
+from tts.text_chunker import TextChunk
+
+
+class SlowAsyncProvider(TTSProvider):
+    """Fake async provider that streams one chunk every 50ms"""
+
+    def __init__(self):
+        super().__init__(api_key="test", default_voice="voice")
+        self.finished = False
+        self.cancelled = False
+
+    async def synthesize(self, text, voice_id, **options):
+        return b"audio"
+
+    async def stream(self, text, voice_id, **options):
+        try:
+            for _ in range(100):
+                await asyncio.sleep(0.05)
+                yield b"x"
+            self.finished = True
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+    def get_voices(self):
+        return [{"id": "voice"}]
+
+    def validate_text(self, text):
+        return True, ""
+
+
+def test_child_tokens_follow_parent_and_report_chars():
+    parent = CancellationToken()
+    child = parent.child()
+    calls = []
+    child.add_callback(lambda: calls.append("closed"))
+
+    child.record_request(12)
+    parent.cancel("client disconnected")
+
+    assert child.cancelled and child.reason == "client disconnected"
+    assert calls == ["closed"]
+    assert parent.chars_sent == 12
+
+
+def test_disconnect_cancels_provider_stream_and_records_avoided_chars():
+    provider = SlowAsyncProvider()
+    texts = ["First sentence here.", "Second sentence that never gets sent."]
+    before = cancellation_stats.get_stats()['chars_avoided']
+
+    def generate():
+        for text in texts:
+            yield from provider.stream_sync_generator(text, "voice")
+
+    response = cancellable_stream(generate, '/test', sum(len(t) for t in texts))
+    assert next(response) == b"x"
+    response.close()  # what the WSGI server does when the client goes away
+
+    time.sleep(0.2)
+    assert provider.cancelled and not provider.finished
+    assert cancellation_stats.get_stats()['chars_avoided'] - before == len(texts[1])
+
+
+def test_provider_errors_are_not_counted_as_disconnects():
+    before = cancellation_stats.get_stats()
+
+    def generate():
+        yield b"x"
+        raise RuntimeError("provider failed")
+
+    token = CancellationToken()
+    response = cancellable_stream(generate, '/test', 10, token)
+    assert next(response) == b"x"
+    with pytest.raises(RuntimeError):
+        next(response)
+
+    after = cancellation_stats.get_stats()
+    assert token.reason == "provider error"
+    assert after['failed_streams'] - before['failed_streams'] == 1
+    assert after['cancelled_streams'] == before['cancelled_streams']
+
+
+def test_cancelled_scope_skips_new_requests():
+    provider = SlowAsyncProvider()
+    token = CancellationToken()
+    token.cancel()
+
+    with cancellation_scope(token):
+        assert list(provider.stream_sync_generator("Hello there.", "voice")) == []
+    assert token.chars_sent == 0
+
+
+def test_cancelled_pipeline_ends_cleanly():
+    provider = SlowAsyncProvider()
+    token = CancellationToken()
+    token.cancel()
+    chunks = [TextChunk(text=f"Sentence {n}.", index=n, is_final=n == 2, original_start=0, original_end=0)
+              for n in range(3)]
+
+    with cancellation_scope(token):
+        assert list(pipelined_stream(provider, chunks, "voice")) == []
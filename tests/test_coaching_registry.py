@@ -0,0 +1,71 @@
+"""
+Tests for the per-session coaching manager registry
+"""
+
+from conftest import load_module
+
+coaching_registry = load_module("coaching_registry", "coaching_registry.py")
+
+
+class FakeManager:
+    """Stands in for LessonCoachingManager"""
+
+    def __init__(self, lesson_id):
+        self.lesson_id = lesson_id
+        self.history = ""
+
+    def estimated_size(self):
+        return 100 + len(self.history)
+
+    def get_status(self):
+        return {'lesson_id': self.lesson_id}
+
+
+def make_registry(**kwargs):
+    kwargs.setdefault('max_sessions', 10)
+    kwargs.setdefault('idle_ttl_seconds', 60)
+    kwargs.setdefault('memory_budget_mb', 1)
+    return coaching_registry.CoachingManagerRegistry(factory=FakeManager, **kwargs)
+
+
+def test_sessions_reuse_their_own_manager():
+    registry = make_registry()
+
+    alice = registry.get("lesson-1", user_id="alice")
+    assert registry.get("lesson-1", user_id="alice") is alice
+    assert registry.get("lesson-1", user_id="bob") is not alice
+    assert registry.get("lesson-2", user_id="alice") is not alice
+    assert registry.get("lesson-1", session_id="alice") is not alice
+
+    stats = registry.get_stats()
+    assert stats['sessions'] == 4 and stats['hits'] == 1 and stats['hit_rate'] == 0.2
+    assert registry.create_unregistered("lesson-1") is not registry.peek("lesson-1")
+
+
+def test_lru_and_ttl_eviction():
+    registry = make_registry(max_sessions=2)
+    first = registry.get("lesson", user_id="a")
+    registry.get("lesson", user_id="b")
+    registry.get("lesson", user_id="a")  # b is now least recently used
+    registry.get("lesson", user_id="c")
+
+    assert registry.peek("lesson", user_id="b") is None
+    assert registry.peek("lesson", user_id="a") is first
+    assert registry.get_stats()['evicted_lru'] == 1
+
+    registry.idle_ttl_seconds = 0
+    assert registry.get_stats()['sessions'] == 0
+    assert registry.get_stats()['evicted_ttl'] == 2
+
+
+def test_memory_budget_evicts_after_growth():
+    registry = make_registry(memory_budget_mb=0.001)  # ~1 KB
+    registry.get("lesson", user_id="a")
+    grown = registry.get("lesson", user_id="b")
+
+    grown.history = "x" * 900
+    registry.touch("lesson", user_id="b")
+
+    assert registry.peek("lesson", user_id="a") is None
+    assert registry.peek("lesson", user_id="b") is grown
+    assert registry.get_stats()['evicted_memory'] == 1
@@ -0,0 +1,84 @@
+"""
+Tests for the token-budgeted context window
+"""
+
+from types import SimpleNamespace
+
+from conftest import fake_package, load_module
+
+fake_package("context_window_test_pkg")
+fake_package("context_window_test_pkg.database")
+load_module("context_window_test_pkg.database.slide_context", "database/slide_context.py")
+context_window = load_module("context_window_test_pkg.context_window", "context_window.py")
+count_tokens = context_window.count_tokens
+
+
+def settings(**overrides):
+    values = dict(token_optimization_level='aggressive', max_conversation_history=5,
+                  max_system_prompt_length=1000, enable_context_pruning=True,
+                  enable_context_summarization=True)
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def message(role, words):
+    return {'role': role, 'content': ' '.join(['word'] * words)}
+
+
+def test_history_stays_within_budget_and_contiguous():
+    window = context_window.ContextWindow()
+    budget = window.apply_settings(settings(max_conversation_history=10))
+    history = [message('user' if n % 2 else 'assistant', 150) for n in range(12)] + [message('user', 10)]
+
+    fitted = window.fit(history)
+
+    assert fitted[-1] == history[-1]
+    assert sum(context_window.message_tokens(m) for m in fitted) <= budget.history_tokens
+    # Whole recent messages, then at most one clipped boundary message
+    whole = [m for m in fitted if m in history]
+    assert whole == history[len(history) - len(whole):]
+    assert len(fitted) - len(whole) <= 1
+    assert window.get_stats()['messages_dropped'] > 0
+
+
+def test_oversized_input_and_system_prompt_are_bounded():
+    window = context_window.ContextWindow()
+    budget = window.apply_settings(settings())
+    huge = {'role': 'user', 'content': "x" * 100000}
+
+    fitted = window.fit([message('assistant', 20), huge], system_tokens=budget.system_prompt_tokens + 10000)
+
+    assert len(fitted) == 1
+    assert fitted[0]['content'].endswith(context_window.TRUNCATION_MARKER)
+    assert count_tokens(fitted[0]['content']) <= context_window.MIN_CLIP_TOKENS
+
+
+def test_message_cap_applies_without_pruning():
+    window = context_window.ContextWindow()
+    window.apply_settings(settings(max_conversation_history=2, enable_context_pruning=False))
+    history = [message('user', 3000), message('assistant', 3000), message('user', 3000), message('user', 1)]
+
+    assert window.fit(history) == history[1:]
+    assert context_window.ContextBudget.from_settings(None) == context_window.ContextBudget()
+
+
+def test_settings_saved_by_another_worker_are_picked_up():
+    stored = {'row': settings(max_conversation_history=5)}
+    reads = []
+
+    def load_settings():
+        reads.append(1)
+        return stored['row']
+
+    window = context_window.ContextWindow(revalidate_seconds=0)
+    assert window.watch_settings(load_settings).max_messages == 5
+
+    stored['row'] = settings(max_conversation_history=1)  # Saved elsewhere
+    assert window.budget.max_messages == 1
+    assert window.get_stats()['settings_reloads'] == 1
+
+    # Within the revalidation interval the row isn't read again
+    window.revalidate_seconds = 60
+    count = len(reads)
+    window.fit([message('user', 1)])
+    assert len(reads) == count
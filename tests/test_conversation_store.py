@@ -0,0 +1,91 @@
+"""
+Tests for the server-held conversation history store
+"""
+
+import sqlite3
+import threading
+
+from conftest import load_module
+
+conversation_store = load_module("conversation_store", "database/conversation_store.py")
+
+
+def make_store(db_path, max_messages=40):
+    conn = sqlite3.connect(db_path)
+    conversation_store.create_conversation_table(conn.cursor())
+    conn.close()
+    return conversation_store.ConversationStore(lambda: sqlite3.connect(db_path), max_messages=max_messages)
+
+
+def turn(n):
+    return [{'role': 'user', 'content': f"question {n}"}, {'role': 'assistant', 'content': f"answer {n}"}]
+
+
+def test_turns_append_with_growing_seq(db_path):
+    store = make_store(db_path)
+    assert store.load("c1") == (0, [])
+
+    assert store.append("c1", turn(1)) == 2
+    assert store.append("c1", turn(2)) == 4
+    assert store.append("c2", turn(1)) == 2
+
+    seq, messages = store.load("c1")
+    assert seq == 4
+    assert messages == turn(1) + turn(2)
+
+
+def test_history_is_pruned_to_max_messages(db_path):
+    store = make_store(db_path, max_messages=4)
+    for n in range(5):
+        store.append("c1", turn(n))
+
+    seq, messages = store.load("c1")
+    assert seq == 10
+    assert messages == turn(3) + turn(4)
+
+
+def test_resync_replaces_history_without_reusing_seqs(db_path):
+    store = make_store(db_path)
+    store.append("c1", turn(1))
+
+    client_history = conversation_store.clean_messages(
+        turn(7) + [{'role': 'tool', 'content': 'x'}, "junk", {'role': 'user', 'content': None}]
+    )
+    assert store.replace("c1", client_history) == 4
+    assert store.load("c1") == (4, turn(7))
+    assert store.get_stats()['resyncs'] == 1
+
+
+def test_summary_is_kept_next_to_the_messages(db_path):
+    store = make_store(db_path)
+    assert store.load_summary("c1") == ("", 0)
+
+    store.append("c1", turn(1) + turn(2))
+    store.save_summary("c1", "Asked question 1.", 2)
+    store.save_summary("c1", "Asked questions 1 and 2.", 4)
+    assert store.load_summary("c1") == ("Asked questions 1 and 2.", 4)
+
+    store.delete("c1")
+    assert store.load_summary("c1") == ("", 0)
+    assert store.load("c1") == (0, [])
+
+
+def test_concurrent_appends_get_distinct_seqs(db_path):
+    store = make_store(db_path, max_messages=100)
+    errors = []
+
+    def append(n):
+        try:
+            store.append("c1", turn(n))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=append, args=(n,)) for n in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    seq, messages = store.load("c1")
+    assert seq == 20 and len(messages) == 20
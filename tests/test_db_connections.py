@@ -0,0 +1,103 @@
+"""
+Tests for the thread-local SQLite connection manager
+"""
+
+import threading
+
+from conftest import load_module
+
+connection = load_module("db_connection", "database/connection.py")
+
+
+def make_manager(db_path):
+    manager = connection.ConnectionManager()
+    conn = manager.acquire(db_path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+    return manager
+
+
+def test_connection_is_reused_and_tuned(db_path):
+    manager = make_manager(db_path)
+
+    for _ in range(5):
+        conn = manager.acquire(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("SELECT COUNT(*) AS n FROM items").fetchone()["n"] == 0
+        conn.close()
+
+    stats = manager.get_stats()
+    assert stats["opened"] == 1
+    assert stats["reused"] == 5
+
+
+def test_each_thread_gets_its_own_connection(db_path):
+    manager = make_manager(db_path)
+
+    def worker():
+        for _ in range(2):
+            manager.acquire(db_path).close()
+        manager.close_thread_connection()
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = manager.get_stats()
+    assert stats["opened"] == 4
+    assert stats["reused"] == 3
+    assert stats["open_connections"] == 1
+
+
+def test_uncommitted_work_is_discarded_on_close(db_path):
+    manager = make_manager(db_path)
+
+    conn = manager.acquire(db_path)
+    conn.execute("INSERT INTO items (name) VALUES ('lost')")
+    conn.close()
+
+    conn = manager.acquire(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    conn.close()
+    assert manager.get_stats()["rolled_back_on_release"] == 1
+
+
+def test_nested_handles_share_the_transaction(db_path):
+    manager = make_manager(db_path)
+
+    outer = manager.acquire(db_path)
+    outer.execute("INSERT INTO items (name) VALUES ('outer')")
+    inner = manager.acquire(db_path)
+    inner.execute("INSERT INTO items (name) VALUES ('inner')")
+    inner.close()  # must not roll back the outer caller's work
+    outer.commit()
+    outer.close()
+
+    conn = manager.acquire(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+    conn.close()
+
+
+def test_nested_commit_does_not_commit_the_outer_transaction(db_path):
+    manager = make_manager(db_path)
+
+    outer = manager.acquire(db_path)
+    outer.execute("INSERT INTO items (name) VALUES ('outer')")
+    inner = manager.acquire(db_path)
+    inner.execute("INSERT INTO items (name) VALUES ('inner')")
+    inner.commit()
+    inner.execute("INSERT INTO items (name) VALUES ('undone')")
+    inner.rollback()  # undoes only the inner handle's uncommitted work
+    inner.close()
+
+    assert [row["name"] for row in outer.execute("SELECT name FROM items ORDER BY id")] == ["outer", "inner"]
+    outer.rollback()
+    outer.close()
+
+    conn = manager.acquire(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,186 @@
+"""
+Tests for hedged TTS requests and the per-provider circuit breaker
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import tts module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tts.audio_cache import AudioCache, CachedTTSProvider
+from tts.base import TTSProvider
+from tts.hedging import CircuitBreaker, HedgedTTSProvider, map_options
+
+
+class DelayedProvider(TTSProvider):
+    """Fake provider with a configurable delay before its first chunk"""
+
+    def __init__(self, label, first_chunk_delay=0.0, fail=False):
+        super().__init__(api_key="test", default_voice=f"{label}_voice")
+        self.label = label
+        self.first_chunk_delay = first_chunk_delay
+        self.fail = fail
+        self.calls = 0
+        self.closed_early = False
+
+    async def synthesize(self, text, voice_id, **options):
+        return self.label.encode()
+
+    async def stream(self, text, voice_id, **options):
+        yield self.label.encode()
+
+    def get_voices(self):
+        return [{"id": f"{self.label}_voice"}]
+
+    def validate_text(self, text):
+        return True, ""
+
+    def stream_sync_generator(self, text, voice_id, **options):
+        self.calls += 1
+        completed = False
+        try:
+            time.sleep(self.first_chunk_delay)
+            if self.fail:
+                raise RuntimeError(f"{self.label} failed")
+            for part in (b"1", b"2", b"3"):
+                yield f"{self.label}:{voice_id}:".encode() + part
+            completed = True
+        finally:
+            if not completed:
+                self.closed_early = True
+
+
+def make_hedged(primary, secondary, **breaker_options):
+    return HedgedTTSProvider(primary, "primary", [("secondary", secondary)], hedge_after_ms=50,
+                             breaker_options=breaker_options)
+
+
+def test_fast_primary_is_not_hedged():
+    primary, secondary = DelayedProvider("p"), DelayedProvider("s")
+    hedged = make_hedged(primary, secondary)
+
+    audio = b"".join(hedged.stream_sync_generator("Hello there.", "p_voice"))
+
+    assert audio == b"p:p_voice:1p:p_voice:2p:p_voice:3"
+    assert secondary.calls == 0
+
+
+def test_slow_primary_loses_to_secondary_with_mapped_voice():
+    primary, secondary = DelayedProvider("p", first_chunk_delay=0.5), DelayedProvider("s")
+    hedged = make_hedged(primary, secondary)
+
+    audio = b"".join(hedged.stream_sync_generator("Hello there.", "p_voice"))
+
+    assert audio.startswith(b"s:s_voice:1")
+    stats = hedged.get_hedge_stats()
+    assert stats["hedged"] == 1
+    assert stats["secondary_wins"] == 1
+    time.sleep(0.6)
+    assert primary.closed_early
+
+
+def test_primary_error_fails_over_immediately():
+    primary, secondary = DelayedProvider("p", fail=True), DelayedProvider("s")
+    hedged = make_hedged(primary, secondary)
+
+    audio = b"".join(hedged.stream_sync_generator("Hello there.", "p_voice"))
+
+    assert audio.startswith(b"s:")
+    assert hedged.get_hedge_stats()["failovers"] == 1
+
+
+def test_open_circuit_skips_failing_primary():
+    primary, secondary = DelayedProvider("p", fail=True), DelayedProvider("s")
+    hedged = make_hedged(primary, secondary, failure_threshold=2, cooldown=60)
+
+    for _ in range(3):
+        b"".join(hedged.stream_sync_generator("Hello there.", "p_voice"))
+
+    assert primary.calls == 2
+    assert hedged.breakers["primary"].state == CircuitBreaker.OPEN
+
+
+def test_breaker_half_opens_after_cooldown():
+    breaker = CircuitBreaker("p", failure_threshold=1, slow_call_ms=100, cooldown=0.05)
+
+    breaker.record_success(500)  # slow call counts as a failure
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # only one trial while half-open
+    breaker.record_success(20)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_trial_is_released_when_unused_or_cancelled():
+    primary, secondary = DelayedProvider("p", first_chunk_delay=0.3), DelayedProvider("s")
+    hedged = make_hedged(primary, secondary, failure_threshold=1, cooldown=0.05)
+    hedged.breakers["primary"].record_failure()
+    hedged.breakers["secondary"].record_failure()
+    time.sleep(0.06)
+
+    # Primary takes its trial and loses the hedge; the secondary trial wins
+    audio = b"".join(hedged.stream_sync_generator("Hello there.", "p_voice"))
+    assert audio.startswith(b"s:")
+    assert hedged.breakers["primary"].state == CircuitBreaker.HALF_OPEN
+    assert hedged.breakers["primary"].allow_request()
+
+    # A secondary that is never launched never holds a trial
+    hedged.breakers["secondary"].record_failure()
+    time.sleep(0.06)
+    primary.first_chunk_delay = 0
+    hedged.breakers["primary"].record_success(10)
+    b"".join(hedged.stream_sync_generator("Hello there.", "p_voice"))
+    assert hedged.breakers["secondary"].allow_request()
+
+
+def test_async_half_open_trial_is_released_without_an_outcome():
+    class SilentProvider(DelayedProvider):
+        async def stream(self, text, voice_id, **options):
+            yield b""
+
+    hedged = make_hedged(SilentProvider("p"), DelayedProvider("s"), failure_threshold=1, cooldown=0.05)
+    breaker = hedged.breakers["primary"]
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    async def consume():
+        return [chunk async for chunk in hedged.stream("Hello there.", "p_voice")]
+
+    async def cancel_after_first_chunk():
+        stream = hedged.stream("Hello there.", "p_voice")
+        await stream.__anext__()
+        await stream.aclose()  # Barge-in before any audio
+
+    # Ended without audio, then cancelled: neither leaves the trial held
+    assert asyncio.run(consume()) == [b""]
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    asyncio.run(cancel_after_first_chunk())
+    assert hedged._first_available()[0] == "primary"
+
+
+def test_options_are_translated_for_the_secondary():
+    options = {"speed": "0.5", "pitch": "1", "temperature": 0.3}
+
+    assert map_options(options, "unrealspeech", "unrealspeech") == options
+    assert map_options(options, "unrealspeech", "hume") == {"speed": "1.5"}
+    assert map_options({"speed": "1.5"}, "hume", "unrealspeech") == {"speed": "0.5"}
+
+
+def test_secondary_wins_are_cached_under_the_secondary():
+    cache = AudioCache(disk_dir=None)
+    primary, secondary = DelayedProvider("p", first_chunk_delay=0.5), DelayedProvider("s")
+    hedged = HedgedTTSProvider(CachedTTSProvider(primary, "primary", cache), "primary",
+                               [("secondary", CachedTTSProvider(secondary, "secondary", cache))],
+                               hedge_after_ms=50)
+
+    audio = b"".join(hedged.stream_sync_generator("Hello there.", "p_voice"))
+
+    assert audio.startswith(b"s:s_voice")
+    assert cache.get(AudioCache.make_key("secondary", "s_voice", "Hello there.", {})) == audio
+    assert cache.get(AudioCache.make_key("primary", "p_voice", "Hello there.", {})) is None
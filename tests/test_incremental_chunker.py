@@ -0,0 +1,77 @@
+"""
+Tests for the incremental (streaming) text chunker
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import tts module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tts.text_chunker import IncrementalTextChunker
+
+
+def tokens(text, size=3):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_first_short_sentence_is_released_early():
+    chunker = IncrementalTextChunker(min_chunk_size=40)
+    released_at = None
+
+    text = "Great question! Wireframes help you plan the layout before any visual design happens."
+    for position, delta in enumerate(tokens(text)):
+        if chunker.feed(delta):
+            released_at = position
+            break
+
+    assert released_at is not None
+    assert released_at * 3 < len("Great question! ") + 3
+
+
+def test_boundary_requires_following_whitespace():
+    chunker = IncrementalTextChunker(first_chunk_min_size=1)
+
+    assert chunker.feed("The value is 3.") == []
+    assert chunker.feed("14 exactly") == []
+    assert [c.text for c in chunker.feed(". Next")] == ["The value is 3.14 exactly."]
+    assert chunker.buffered_text == "Next"
+
+
+def test_abbreviations_do_not_split():
+    chunker = IncrementalTextChunker(first_chunk_min_size=1)
+    chunks = list(chunker.iter_chunks(tokens("Ask Dr. Smith about it. Then continue with the next slide please.")))
+
+    assert chunks[0].text == "Ask Dr. Smith about it."
+
+
+def test_short_sentences_merge_after_first_chunk():
+    chunker = IncrementalTextChunker(min_chunk_size=40)
+    text = "Hi there. Yes. No. Maybe so. This sentence is comfortably long enough to stand alone."
+    chunks = list(chunker.iter_chunks(tokens(text, 5)))
+
+    assert [c.text for c in chunks] == [
+        "Hi there.",
+        "Yes. No. Maybe so. This sentence is comfortably long enough to stand alone."
+    ]
+    assert chunks[-1].is_final
+    assert [c.index for c in chunks] == [0, 1]
+
+
+def test_first_chunk_falls_back_to_clause_boundary():
+    chunker = IncrementalTextChunker(first_chunk_max_wait=60)
+    text = "When you build a wireframe for a mobile app, start with the navigation, then add content blocks"
+    chunks = chunker.feed(text)
+
+    assert chunks[0].text == "When you build a wireframe for a mobile app, start with the navigation,"
+
+
+def test_offsets_and_long_text_respect_max_size():
+    chunker = IncrementalTextChunker(max_chunk_size=50)
+    text = " ".join(["word"] * 60)
+    chunks = list(chunker.iter_chunks(tokens(text, 7)))
+
+    assert all(len(c.text) <= 50 for c in chunks)
+    assert " ".join(c.text for c in chunks) == text
+    for chunk in chunks:
+        assert text[chunk.original_start:chunk.original_end] == chunk.text
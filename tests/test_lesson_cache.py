@@ -0,0 +1,82 @@
+"""
+Tests for the version-checked lesson content cache
+"""
+
+import time
+
+from conftest import load_module
+
+lesson_cache = load_module("lesson_cache", "database/lesson_cache.py")
+
+
+class FakeStore:
+    """Stands in for the lessons tables"""
+
+    def __init__(self):
+        self.version = 1
+        self.title = "Wireframes"
+        self.loads = 0
+        self.version_reads = 0
+
+    def read_version(self, lesson_id):
+        self.version_reads += 1
+        return self.version
+
+    def load(self, lesson_id):
+        self.loads += 1
+        if self.version is None:
+            return None
+        slides = [{"slide_number": 1, "title": self.title, "content": "...", "notes": ""}]
+        return lesson_cache.LessonSnapshot(lesson_id, self.version, {"id": lesson_id, "title": self.title}, slides)
+
+
+def test_repeated_reads_are_served_from_memory():
+    cache, store = lesson_cache.LessonCache(revalidate_seconds=60), FakeStore()
+
+    for _ in range(5):
+        snapshot = cache.get("ux", store.read_version, store.load)
+
+    assert store.loads == 1 and store.version_reads == 0
+    assert snapshot.slide(1)["title"] == "Wireframes"
+    assert cache.get_stats()["hits"] == 4
+
+
+def test_snapshots_cannot_be_mutated_by_callers():
+    cache, store = lesson_cache.LessonCache(revalidate_seconds=60), FakeStore()
+
+    lesson = cache.get("ux", store.read_version, store.load).lesson_dict()
+    lesson["slides"][0]["title"] = "changed"
+
+    assert cache.get("ux", store.read_version, store.load).slide(1)["title"] == "Wireframes"
+
+
+def test_version_change_from_another_worker_reloads_after_revalidation():
+    cache, store = lesson_cache.LessonCache(revalidate_seconds=0.05), FakeStore()
+    cache.get("ux", store.read_version, store.load)
+
+    store.version, store.title = 2, "Prototypes"
+    assert cache.get("ux", store.read_version, store.load).slide(1)["title"] == "Wireframes"
+
+    time.sleep(0.06)
+    assert cache.get("ux", store.read_version, store.load).slide(1)["title"] == "Prototypes"
+    assert store.loads == 2
+
+
+def test_unchanged_version_is_revalidated_without_reload():
+    cache, store = lesson_cache.LessonCache(revalidate_seconds=0), FakeStore()
+
+    cache.get("ux", store.read_version, store.load)
+    cache.get("ux", store.read_version, store.load)
+
+    assert store.loads == 1 and store.version_reads == 1
+
+
+def test_local_invalidation_and_deletion():
+    cache, store = lesson_cache.LessonCache(revalidate_seconds=60), FakeStore()
+    cache.get("ux", store.read_version, store.load)
+
+    store.version = None  # deleted
+    cache.invalidate("ux")
+
+    assert cache.get("ux", store.read_version, store.load) is None
+    assert cache.get_stats()["lessons"] == 0
@@ -0,0 +1,74 @@
+"""
+Tests for the OpenAI-compatible mock LLM server
+"""
+
+import json
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+# Add parent directory to path to import project modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from mock_llm_server import MockLLMProfile, MockLLMServer
+
+
+def post(server, body):
+    request = urllib.request.Request(
+        f"{server.base_url}/chat/completions",
+        data=json.dumps(body).encode(),
+        headers={"Authorization": "Bearer mock", "Content-Type": "application/json"}
+    )
+    return urllib.request.urlopen(request)
+
+
+def test_streaming_sse_with_ttft_and_usage():
+    profile = MockLLMProfile(ttft_ms=100, tokens_per_second=0, mode="echo")
+    messages = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "What is a wireframe?"}]
+
+    with MockLLMServer(port=0, profile=profile) as server:
+        start = time.time()
+        with post(server, {"model": "gpt-4", "messages": messages, "stream": True,
+                           "stream_options": {"include_usage": True}}) as response:
+            assert response.headers["Content-Type"] == "text/event-stream"
+            lines = [line.decode().strip() for line in response if line.strip()]
+        elapsed = time.time() - start
+
+    assert elapsed >= 0.1
+    assert lines[-1] == "data: [DONE]"
+    events = [json.loads(line[len("data: "):]) for line in lines[:-1]]
+    text = "".join(e["choices"][0]["delta"].get("content", "") for e in events if e["choices"])
+    assert text == "You said: What is a wireframe?"
+    assert events[-1]["usage"]["completion_tokens"] == 6
+    assert events[-1]["usage"]["prompt_tokens"] > 0
+
+
+def test_non_streaming_canned_response():
+    profile = MockLLMProfile(ttft_ms=0, tokens_per_second=0, canned_response="Hello there.")
+
+    with MockLLMServer(port=0, profile=profile) as server:
+        with post(server, {"model": "gpt-4", "messages": [{"role": "user", "content": "Hi"}]}) as response:
+            body = json.loads(response.read())
+        assert server.get_stats()["requests"] == 1
+
+    assert body["choices"][0]["message"]["content"] == "Hello there."
+    assert body["usage"]["total_tokens"] == body["usage"]["prompt_tokens"] + 2
+
+
+def test_usage_reports_shared_prompt_prefix_as_cached():
+    profile = MockLLMProfile(ttft_ms=0, tokens_per_second=0, canned_response="Ok.")
+    system = {"role": "system", "content": "Stable coaching instructions. " * 200}
+
+    def cached(messages):
+        with post(server, {"model": "gpt-4", "messages": messages}) as response:
+            return json.loads(response.read())["usage"]["prompt_tokens_details"]["cached_tokens"]
+
+    with MockLLMServer(port=0, profile=profile) as server:
+        assert cached([system, {"role": "user", "content": "first"}]) == 0
+        hit = cached([system, {"role": "user", "content": "second"}])
+        # Short prompts are never cached
+        assert cached([{"role": "user", "content": "first"}]) == 0
+        assert server.get_stats()["cached_tokens"] == hit
+
+    assert hit >= 1024 and hit % 128 == 0
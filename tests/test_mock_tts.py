@@ -0,0 +1,90 @@
+"""
+Tests for the offline mock TTS provider and mock API server
+"""
+
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Add parent directory to path to import tts module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tts.factory import TTSFactory
+from tts.mock_server import MockTTSServer
+from tts.providers.mock import MockStreamProfile, MockTTSError
+
+
+def assert_mp3_frames(audio, frame_size):
+    assert len(audio) % frame_size == 0
+    for offset in range(0, len(audio), frame_size):
+        assert audio[offset:offset + 2] == b"\xff\xfb"
+
+
+def test_factory_mock_streams_mp3_after_ttfb():
+    provider = TTSFactory.create_provider("mock", {"options": {"ttfb_ms": 100, "throughput_kbps": 0}})
+
+    start = time.time()
+    chunks = provider.stream_sync_generator("Hello from the offline provider.", "mock_voice")
+    first = next(chunks)
+    ttfb = time.time() - start
+    audio = first + b"".join(chunks)
+
+    assert 0.09 <= ttfb < 0.5
+    assert_mp3_frames(audio, 384)  # 128kbps at 48kHz
+    assert provider.get_pool_stats()["requests"] == 1
+
+
+def test_error_injection_is_deterministic():
+    def failures(seed):
+        profile = MockStreamProfile(error_rate=0.3, seed=seed)
+        return [profile.should_fail() for _ in range(50)]
+
+    assert failures(7) == failures(7)
+    assert any(failures(7)) and not all(failures(7))
+
+    provider = TTSFactory.create_provider("mock", {"options": {"ttfb_ms": 0, "error_rate": 1.0}})
+    try:
+        provider.synthesize_sync("Hello there.", "mock_voice")
+        assert False, "expected injected failure"
+    except MockTTSError:
+        pass
+
+
+def test_mock_server_mimics_unreal_and_hume():
+    profile = MockStreamProfile(ttfb_ms=0, throughput_kbps=0)
+    with MockTTSServer(port=0, profile=profile) as server:
+        unreal = urllib.request.Request(
+            f"{server.base_url}/stream",
+            data=json.dumps({"Text": "Hello there.", "VoiceId": "af_sky", "Bitrate": "192k"}).encode(),
+            headers={"Authorization": "Bearer test", "Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(unreal) as response:
+            assert response.headers["Content-Type"] == "audio/mpeg"
+            assert_mp3_frames(response.read(), 576)
+
+        hume = urllib.request.Request(
+            f"{server.base_url}/v0/tts/stream/file",
+            data=json.dumps({"utterances": [{"text": "Hello there."}], "format": {"type": "mp3"}}).encode(),
+            headers={"X-Hume-Api-Key": "test", "Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(hume) as response:
+            assert_mp3_frames(response.read(), 384)
+
+        assert server.get_stats()["requests"] == 2
+
+
+def test_mock_server_error_injection_returns_500():
+    with MockTTSServer(port=0, profile=MockStreamProfile(ttfb_ms=0, error_rate=1.0)) as server:
+        failing = urllib.request.Request(
+            f"{server.base_url}/stream",
+            data=json.dumps({"Text": "Hello there."}).encode(),
+            headers={"Authorization": "Bearer test"}
+        )
+        try:
+            urllib.request.urlopen(failing)
+            assert False, "expected HTTP 500"
+        except urllib.error.HTTPError as e:
+            assert e.code == 500
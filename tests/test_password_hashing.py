@@ -0,0 +1,65 @@
+"""
+Tests for the off-thread password hashing pool
+"""
+
+import hashlib
+import threading
+
+import pytest
+
+from conftest import load_module
+
+password_hashing = load_module("password_hashing", "database/password_hashing.py")
+
+
+def test_pool_matches_inline_pbkdf2():
+    hasher = password_hashing.PasswordHasher(workers=1, iterations=1000)
+    try:
+        digest = hasher.hash("hunter2", "salt")
+        assert digest == hashlib.pbkdf2_hmac('sha256', b"hunter2", b"salt", 1000).hex()
+        assert hasher.verify("hunter2", "salt", digest, 1000)
+        assert not hasher.verify("hunter3", "salt", digest, 1000)
+        assert hasher.get_stats()['hashed'] == 3
+    finally:
+        hasher.shutdown()
+
+
+def test_legacy_hashes_need_upgrade():
+    hasher = password_hashing.PasswordHasher(workers=0, iterations=200000)
+    legacy = hashlib.pbkdf2_hmac('sha256', b"pw", b"salt", 100000).hex()
+
+    assert hasher.verify("pw", "salt", legacy, None)
+    assert hasher.needs_upgrade(None)
+    assert hasher.needs_upgrade(100000)
+    assert not hasher.needs_upgrade(200000)
+
+
+def test_full_queue_rejects_and_reports_depth():
+    hasher = password_hashing.PasswordHasher(workers=0, max_pending=1, queue_timeout=0.05, iterations=1)
+    hasher._slots.acquire()  # Another request holds the only slot
+    try:
+        with pytest.raises(password_hashing.PasswordHasherBusy):
+            hasher.hash("pw", "salt")
+    finally:
+        hasher._slots.release()
+
+    assert hasher.get_stats()['rejected'] == 1
+    assert hasher.hash("pw", "salt")
+
+
+def test_concurrent_hashes_share_the_pool():
+    hasher = password_hashing.PasswordHasher(workers=2, iterations=20000)
+    results = []
+    try:
+        threads = [threading.Thread(target=lambda i=i: results.append(hasher.hash(f"pw{i}", "salt")))
+                   for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = hasher.get_stats()
+    finally:
+        hasher.shutdown()
+
+    assert len(set(results)) == 6
+    assert stats['hashed'] == 6 and stats['in_flight'] == 0
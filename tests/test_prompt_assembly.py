@@ -0,0 +1,44 @@
+"""
+Tests for cache-friendly prompt assembly
+"""
+
+
+import pytest
+
+from conftest import load_module
+
+prompt_assembly = load_module("prompt_assembly", "prompt_assembly.py")
+
+
+def test_segments_are_ordered_stable_first_and_user_context_trails():
+    history = [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+        {"role": "user", "content": "what is a persona?"},
+    ]
+    segments = {"user": "USER", "slide": "SLIDE", "base": "BASE", "lesson": "LESSON",
+                "guidelines": "GUIDE", "modifiers": ""}
+
+    messages = prompt_assembly.assemble_messages(segments, history)
+
+    assert messages[0] == {"role": "system", "content": "BASE\n\nGUIDE\n\nLESSON\n\nSLIDE"}
+    assert messages[1:3] == history[:2]
+    assert messages[3] == {"role": "system", "content": "USER"}
+    assert messages[4] == history[-1]
+
+    with pytest.raises(ValueError):
+        prompt_assembly.assemble_messages({"extra": "x"}, history)
+
+
+def test_cache_stats_report_hit_ratio_per_lesson():
+    stats = prompt_assembly.PromptCacheStats()
+
+    stats.record("l1", {"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 0}})
+    stats.record("l1", {"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 1536}})
+    stats.record("l2", {"prompt_tokens": 100, "prompt_tokens_details": None})
+    assert stats.record("l2", None) is None
+
+    report = stats.get_stats()
+    assert report["l1"]["requests"] == 2 and report["l1"]["cache_hits"] == 1
+    assert report["l1"]["hit_ratio"] == 0.384
+    assert report["l2"]["hit_ratio"] == 0.0
@@ -0,0 +1,60 @@
+"""
+Tests for memoized system prompt variants
+"""
+
+import json
+import sqlite3
+import threading
+
+from conftest import fake_package, load_module, memory_db
+
+# The module's .database.models import is pointed at a throwaway database
+_, _connect = memory_db('''
+    CREATE TABLE system_settings (id INTEGER PRIMARY KEY, base_prompt TEXT, modifiers TEXT, updated_at TIMESTAMP);
+    INSERT INTO system_settings (id, base_prompt, modifiers) VALUES (1, 'You are a coach.', '{}');
+''', row_factory=sqlite3.Row)
+fake_package("prompt_variants_test_pkg")
+fake_package("prompt_variants_test_pkg.database")
+fake_package("prompt_variants_test_pkg.database.models", get_db_connection=_connect, json_serialize=json.dumps,
+             json_deserialize=lambda text: json.loads(text) if text else None)
+system_prompt_manager = load_module("prompt_variants_test_pkg.system_prompt_manager", "system_prompt_manager.py")
+
+
+def test_resolve_is_memoized_and_side_effect_free():
+    manager = system_prompt_manager.SystemPromptManager()
+
+    beginner = manager.resolve({'coaching', 'beginner'})
+    assert manager.resolve(['beginner', 'coaching', 'unknown']) is not beginner
+    assert manager.resolve(['beginner', 'coaching']) is beginner
+    assert beginner.text.startswith("You are a coach.\n\nBEGINNER-FRIENDLY")
+    assert "COACHING GUIDELINES" in beginner.text
+
+    # Another learner's contexts don't leak into this one's prompt
+    advanced = manager.resolve({'coaching', 'advanced'})
+    assert "BEGINNER" not in advanced.text
+    assert manager.active_contexts == frozenset()
+
+
+def test_concurrent_resolves_share_one_variant():
+    manager = system_prompt_manager.SystemPromptManager()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.resolve({'advanced'}))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(variant) for variant in results}) == 1
+
+
+def test_settings_changes_invalidate_variants():
+    manager = system_prompt_manager.SystemPromptManager()
+    before = manager.resolve({'coaching'})
+
+    manager.add_modifier('coaching', 'Be Socratic.')
+    assert manager.resolve({'coaching'}).modifiers == ('Be Socratic.',)
+
+    manager.set_base_prompt('You are a mentor.')
+    after = manager.resolve({'coaching'})
+    assert after.text == 'You are a mentor.\n\nBe Socratic.'
+    assert before.base_prompt == 'You are a coach.'  # Variants already handed out are immutable
@@ -0,0 +1,48 @@
+"""
+Tests for precompiled per-slide coaching contexts
+"""
+
+import json
+import sqlite3
+
+from conftest import load_module
+
+slide_context = load_module("slide_context", "database/slide_context.py")
+
+
+def test_compiled_context_renders_each_content_line():
+    compiled = slide_context.compile_slide_context(
+        2, "Personas", "- Who are the users\n- What do they need\n\nok", "Ask about their team"
+    )
+
+    assert "- Who are the users\n- What do they need\n- ok\n" in compiled['context']
+    assert compiled['key_concepts'] == ["Who are the users", "What do they need"]
+    assert compiled['coaching_notes'][0] == "Ask about their team"
+    assert compiled['questions_to_ask'][0] == "What do you think about Personas?"
+    assert compiled['token_count'] == slide_context.count_tokens(compiled['context']) > 0
+
+
+def test_store_replaces_a_lessons_contexts():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript('''
+        CREATE TABLE lessons (id TEXT PRIMARY KEY);
+        CREATE TABLE lesson_slides (lesson_id TEXT, slide_number INTEGER, title TEXT, content TEXT, notes TEXT);
+        INSERT INTO lessons VALUES ('old'), ('new');
+        INSERT INTO lesson_slides VALUES ('old', 1, 'Intro', 'Welcome to the workshop', NULL);
+    ''')
+    cursor = conn.cursor()
+
+    # Existing lessons are compiled when the table is created
+    slide_context.create_slide_context_table(cursor)
+    assert cursor.execute("SELECT lesson_id, slide_number FROM slide_contexts").fetchall() == [('old', 1)]
+
+    slides = [(1, "One", "First point", None), (2, "Two", "Second point", "note")]
+    total = slide_context.store_slide_contexts(cursor, "new", slides)
+    slide_context.store_slide_contexts(cursor, "new", slides)
+
+    rows = cursor.execute(
+        "SELECT slide_number, token_count, key_concepts FROM slide_contexts WHERE lesson_id = 'new'"
+    ).fetchall()
+    assert [row[0] for row in rows] == [1, 2]
+    assert sum(row[1] for row in rows) == total
+    assert json.loads(rows[1][2]) == ["Second point"]
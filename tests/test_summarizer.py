@@ -0,0 +1,65 @@
+"""
+Tests for background rolling conversation summaries
+"""
+
+import threading
+from types import SimpleNamespace
+
+from conftest import fake_package, load_module
+
+fake_package("summarizer_test_pkg")
+fake_package("summarizer_test_pkg.database")
+load_module("summarizer_test_pkg.database.slide_context", "database/slide_context.py")
+context_window = load_module("summarizer_test_pkg.context_window", "context_window.py")
+summarizer = load_module("summarizer_test_pkg.summarizer", "summarizer.py")
+
+TURNS = [
+    {'role': 'user', 'content': "My name is Ana and I design mobile apps. I want to learn wireframing."},
+    {'role': 'assistant', 'content': "Wireframes are low-fidelity layouts. They show structure first."},
+]
+
+
+def test_local_summary_is_bounded_and_keeps_recent_context():
+    summary = summarizer.local_summary("", TURNS, max_tokens=200)
+    assert summary == ("Learner: My name is Ana and I design mobile apps. "
+                       "Coach: Wireframes are low-fidelity layouts.")
+
+    long_summary = summarizer.local_summary("earlier " * 500, TURNS, max_tokens=40)
+    assert context_window.count_tokens(long_summary) <= 40
+    assert long_summary.endswith("low-fidelity layouts.")
+
+
+def test_worker_folds_in_background_and_falls_back_without_model():
+    def failing_client():
+        raise RuntimeError("no model")
+
+    worker = summarizer.ConversationSummarizer(backend='llm', max_tokens=100, client_factory=failing_client)
+    done = threading.Event()
+    results = []
+
+    def on_done(messages, summary):
+        results.append((messages, summary))
+        done.set()
+
+    assert worker.submit("session", "", TURNS, on_done)
+    assert done.wait(5)
+    worker.shutdown()
+
+    assert results[0][0] == TURNS and "Ana" in results[0][1]
+    stats = worker.get_stats()
+    assert stats['completed'] == 1 and stats['llm_failures'] == 1 and stats['pending'] == 0
+
+
+def test_llm_backend_uses_the_summary_model():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" Ana is learning wireframes. "))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    worker = summarizer.ConversationSummarizer(backend='llm', model='small-model', client_factory=lambda: client)
+
+    assert worker.summarize("", TURNS) == "Ana is learning wireframes."
+    assert calls[0]['model'] == 'small-model'
+    worker.shutdown()
@@ -0,0 +1,82 @@
+"""
+Tests for the write-behind interaction queue
+"""
+
+import sqlite3
+
+from conftest import load_module
+
+write_behind = load_module("write_behind", "database/write_behind.py")
+
+
+def make_connect(db_path):
+    commits = []
+
+    def connect():
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.set_trace_callback(lambda sql: commits.append(sql) if sql == "COMMIT" else None)
+        return conn
+
+    conn = connect()
+    conn.executescript('''
+        CREATE TABLE user_sessions (session_id TEXT PRIMARY KEY, last_activity TIMESTAMP);
+        CREATE TABLE coaching_interactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL REFERENCES user_sessions(session_id),
+            slide_number INTEGER, user_input TEXT, ai_response TEXT,
+            interaction_type TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO user_sessions VALUES ('s1', NULL), ('s2', NULL);
+    ''')
+    conn.close()
+    commits.clear()
+    return connect, commits
+
+
+def row(session_id, n):
+    return write_behind.interaction_row(session_id, n, f"question {n}", f"answer {n}", "general")
+
+
+def test_interactions_are_group_committed(db_path):
+    connect, commits = make_connect(db_path)
+    queue = write_behind.WriteBehindQueue(connect, flush_ms=60000)
+
+    for n in range(10):
+        queue.enqueue(row("s1" if n % 2 else "s2", n))
+    assert queue.has_pending("s1")
+    assert queue.flush() == 10
+
+    conn = connect()
+    assert conn.execute("SELECT COUNT(*) FROM coaching_interactions").fetchone()[0] == 10
+    assert conn.execute("SELECT COUNT(*) FROM user_sessions WHERE last_activity IS NOT NULL").fetchone()[0] == 2
+    assert len(commits) == 1
+    assert not queue.has_pending("s1")
+    queue.shutdown()
+
+
+def test_full_queue_flushes_inline_and_skips_deleted_sessions(db_path):
+    connect, _ = make_connect(db_path)
+    queue = write_behind.WriteBehindQueue(connect, flush_ms=60000, max_pending=3)
+
+    queue.enqueue(row("s1", 1))
+    queue.enqueue(row("gone", 2))
+    queue.enqueue(row("s1", 3))  # Hits max_pending
+
+    stats = queue.get_stats()
+    assert stats['pending'] == 0 and stats['inline_flushes'] == 1
+    assert stats['written'] == 2 and stats['skipped'] == 1
+    queue.shutdown()
+
+    rows = connect().execute("SELECT session_id, user_input FROM coaching_interactions ORDER BY id").fetchall()
+    assert rows == [("s1", "question 1"), ("s1", "question 3")]
+
+
+def test_shutdown_flushes_pending_writes(db_path):
+    connect, _ = make_connect(db_path)
+    queue = write_behind.WriteBehindQueue(connect, flush_ms=60000)
+
+    queue.enqueue(row("s1", 1))
+    queue.shutdown()
+
+    assert connect().execute("SELECT COUNT(*) FROM coaching_interactions").fetchone()[0] == 1
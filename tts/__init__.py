@@ -5,11 +5,15 @@ Provides a modular, provider-agnostic TTS interface
 
 from .base import TTSProvider
 from .factory import TTSFactory
-from .text_chunker import SmartTextChunker, chunk_text_for_tts
+from .text_chunker import SmartTextChunker, IncrementalTextChunker, chunk_text_for_tts
+from .audio_cache import AudioCache, CachedTTSProvider
+from .hedging import CircuitBreaker, HedgedTTSProvider
+from .cancellation import CancellationToken, cancellation_scope, cancellable_stream
 
 # Don't import providers here - let factory handle imports lazily
 # This prevents import errors from breaking the entire module
 
-__all__ = ['TTSProvider', 'TTSFactory', 'SmartTextChunker', 'chunk_text_for_tts']
+__all__ = ['TTSProvider', 'TTSFactory', 'SmartTextChunker', 'IncrementalTextChunker', 'chunk_text_for_tts', 'AudioCache', 'CachedTTSProvider',
+           'CircuitBreaker', 'HedgedTTSProvider', 'CancellationToken', 'cancellation_scope', 'cancellable_stream']
 
 # Providers are imported lazily by the factory when needed
@@ -0,0 +1,196 @@
+"""
+Shared Background Event Loop
+One long-lived asyncio loop per process plus a bounded, backpressured
+bridge that lets sync (Flask) generators consume async provider streams
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import CancelledError as FutureCancelledError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from .cancellation import current_token
+
+
+class BackgroundLoop:
+    """A single asyncio event loop running forever in a daemon thread"""
+
+    def __init__(self, name: str = "tts-event-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive() and not self.loop.is_closed()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop and return a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and block until it finishes"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Operation timed out after {timeout}s")
+
+    def stop(self) -> None:
+        """Cancel outstanding tasks and stop the loop"""
+        if not self.is_running:
+            return
+
+        async def _cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self.submit(_cancel_all()).result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+
+
+_background_loop: Optional[BackgroundLoop] = None
+_background_loop_pid: Optional[int] = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """
+    Get the process-wide background loop, starting it on first use
+
+    A new loop is started after fork so worker processes never share the
+    parent's loop thread.
+    """
+    global _background_loop, _background_loop_pid
+
+    loop = _background_loop
+    if loop is not None and _background_loop_pid == os.getpid() and loop.is_running:
+        return loop
+
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop_pid != os.getpid() or not _background_loop.is_running:
+            _background_loop = BackgroundLoop()
+            _background_loop_pid = os.getpid()
+            print(f"🔁 Started shared TTS event loop (pid {_background_loop_pid})")
+        return _background_loop
+
+
+def shutdown_background_loop() -> None:
+    """Stop the background loop (registered to run at exit)"""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is not None and _background_loop_pid == os.getpid():
+            _background_loop.stop()
+        _background_loop = None
+
+
+atexit.register(shutdown_background_loop)
+
+_DONE = object()
+
+
+def iterate_async_sync(stream_factory: Callable[[], AsyncIterator], max_pending: int = 8,
+                       timeout: float = 30.0) -> Iterator:
+    """
+    Consume an async iterator from synchronous code via the shared loop
+
+    A producer task on the background loop pulls from the async iterator
+    into an asyncio.Queue bounded at max_pending items, so a slow consumer
+    applies backpressure all the way to the provider. Closing this
+    generator (e.g. client disconnect) cancels the producer, which closes
+    the provider stream. If the calling thread has a cancellation token
+    (see tts.cancellation), cancelling it does the same even while this
+    generator is blocked waiting for the next item; iteration then ends.
+
+    Args:
+        stream_factory: Zero-argument callable returning the async iterator.
+            Called on the loop thread so providers bind to the shared loop.
+        max_pending: Maximum items buffered ahead of the consumer
+        timeout: Seconds to wait for the next item before giving up
+
+    Yields:
+        Items from the async iterator, in order
+
+    Raises:
+        TimeoutError: If no item arrives within timeout seconds
+        Exception: Whatever the async iterator raised
+    """
+    background = get_background_loop()
+    token = current_token()
+    if token is not None and token.cancelled:
+        return
+    queue_holder = {}
+    ready = threading.Event()
+
+    async def produce():
+        queue = asyncio.Queue(maxsize=max_pending)
+        queue_holder['queue'] = queue
+        ready.set()
+
+        stream = stream_factory()
+        try:
+            async for item in stream:
+                await queue.put(('item', item))
+            await queue.put(('done', _DONE))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(('error', e))
+        finally:
+            aclose = getattr(stream, 'aclose', None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    pass
+
+    producer = background.submit(produce())
+    remove_callback = token.add_callback(producer.cancel) if token is not None else None
+    try:
+        if not ready.wait(timeout):
+            raise TimeoutError("Shared event loop did not start the stream")
+        queue = queue_holder['queue']
+
+        while True:
+            pending_get = background.submit(queue.get())
+            remove_get_callback = token.add_callback(pending_get.cancel) if token is not None else None
+            try:
+                kind, value = pending_get.result(timeout)
+            except FutureTimeoutError:
+                pending_get.cancel()
+                raise TimeoutError(f"No data received from stream for {timeout:.0f}s")
+            except FutureCancelledError:
+                return  # Cancelled through the token
+            finally:
+                if remove_get_callback is not None:
+                    remove_get_callback()
+
+            if kind == 'item':
+                yield value
+            elif kind == 'error':
+                raise value
+            else:
+                return
+    finally:
+        if remove_callback is not None:
+            remove_callback()
+        if not producer.done():
+            producer.cancel()
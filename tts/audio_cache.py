@@ -0,0 +1,497 @@
+"""
+Content-Addressed TTS Audio Cache
+Caches synthesized audio per sentence so repeated phrasing is served
+without calling the provider
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import unicodedata
+import re
+from collections import OrderedDict
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
+
+from .base import TTSProvider
+from .cancellation import current_token
+from .text_chunker import SmartTextChunker
+
+# Options that are part of the cache key. Any other non-empty option
+# (e.g. emotional_parameters) changes the audio in ways we can't key on,
+# so those requests bypass the cache.
+CACHE_KEY_OPTIONS = ('speed', 'pitch', 'temperature', 'bitrate')
+
+
+def encode_frames(frames: List[Dict]) -> bytes:
+    """Serialize timed-stream frames (audio + word timings) for the cache"""
+    return json.dumps([
+        {'type': 'audio', 'data': base64.b64encode(frame['data']).decode('ascii')}
+        if frame['type'] == 'audio' else frame
+        for frame in frames
+    ]).encode('utf-8')
+
+
+def decode_frames(blob: bytes) -> List[Dict]:
+    """Inverse of encode_frames"""
+    return [
+        {'type': 'audio', 'data': base64.b64decode(frame['data'])} if frame['type'] == 'audio' else frame
+        for frame in json.loads(blob)
+    ]
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keying (unicode form and whitespace)"""
+    text = unicodedata.normalize('NFC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class AudioCache:
+    """
+    Two-tier audio cache: in-memory LRU with a byte budget in front of a
+    size-bounded disk tier
+    """
+
+    def __init__(self, memory_budget_bytes: int = 64 * 1024 * 1024,
+                 disk_budget_bytes: int = 512 * 1024 * 1024,
+                 disk_dir: Optional[str] = ".tts_cache"):
+        """
+        Initialize the cache
+
+        Args:
+            memory_budget_bytes: Maximum bytes held in the memory tier
+            disk_budget_bytes: Maximum bytes held in the disk tier
+            disk_dir: Directory for the disk tier (None disables it)
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self.disk_dir = disk_dir
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> bytes, least recently used first
+        self._memory_bytes = 0
+        self._disk_index = OrderedDict()  # key -> size, least recently used first
+        self._disk_bytes = 0
+
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'bypassed': 0,
+            'bytes_served': 0,
+            'chars_saved': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0
+        }
+
+        if self.disk_dir:
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(provider: str, voice_id: str, text: str, options: Dict) -> str:
+        """
+        Build the content address for a piece of audio
+
+        Args:
+            provider: Provider name
+            voice_id: Voice identifier
+            text: Text being synthesized
+            options: Synthesis options (speed, pitch, temperature, bitrate)
+
+        Returns:
+            Hex digest identifying the audio
+        """
+        parts = [provider.lower(), str(voice_id)]
+        parts.extend(f"{name}={options.get(name, '')}" for name in CACHE_KEY_OPTIONS)
+        parts.append(normalize_text(text))
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Disk tier helpers
+    # ------------------------------------------------------------------
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.mp3")
+
+    def _load_disk_index(self) -> None:
+        """Scan the disk tier and rebuild the LRU index (oldest first)"""
+        entries = []
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    if not name.endswith('.mp3'):
+                        continue
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        except OSError as e:
+            print(f"⚠️ TTS cache: disk tier unavailable ({e}), using memory only")
+            self.disk_dir = None
+            return
+
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used files until under the disk budget"""
+        while self._disk_bytes > self.disk_budget_bytes and self._disk_index:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            self._stats['disk_evictions'] += 1
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def _write_disk(self, key: str, audio: bytes) -> None:
+        """Atomically write audio to the disk tier"""
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ TTS cache: failed to write {key[:8]}... to disk: {e}")
+            return
+
+        with self._lock:
+            previous = self._disk_index.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous
+            self._disk_index[key] = len(audio)
+            self._disk_bytes += len(audio)
+            self._evict_disk()
+
+    # ------------------------------------------------------------------
+    # Memory tier helpers
+    # ------------------------------------------------------------------
+
+    def _put_memory(self, key: str, audio: bytes) -> None:
+        """Insert into the memory tier (caller holds the lock)"""
+        if len(audio) > self.memory_budget_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+
+        while self._memory_bytes > self.memory_budget_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats['memory_evictions'] += 1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, text_length: int = 0) -> Optional[bytes]:
+        """
+        Look up audio by key
+
+        Args:
+            key: Cache key from make_key
+            text_length: Characters the cached audio represents (for stats)
+
+        Returns:
+            Audio bytes or None on a miss
+        """
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                self._stats['bytes_served'] += len(audio)
+                self._stats['chars_saved'] += text_length
+                return audio
+
+            on_disk = self.disk_dir is not None and key in self._disk_index
+
+        if on_disk:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    audio = f.read()
+                os.utime(path, None)
+            except OSError:
+                audio = None
+
+            with self._lock:
+                if audio is None:
+                    size = self._disk_index.pop(key, None)
+                    if size is not None:
+                        self._disk_bytes -= size
+                else:
+                    if key in self._disk_index:
+                        self._disk_index.move_to_end(key)
+                    self._put_memory(key, audio)
+                    self._stats['disk_hits'] += 1
+                    self._stats['bytes_served'] += len(audio)
+                    self._stats['chars_saved'] += text_length
+                    return audio
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, key: str, audio: bytes) -> None:
+        """
+        Store audio under key in both tiers
+
+        Args:
+            key: Cache key from make_key
+            audio: Complete audio for the keyed text
+        """
+        if not audio:
+            return
+
+        with self._lock:
+            self._put_memory(key, audio)
+            self._stats['stores'] += 1
+
+        if self.disk_dir is not None and len(audio) <= self.disk_budget_bytes:
+            self._write_disk(key, audio)
+
+    def record_bypass(self) -> None:
+        """Count a request that could not be served from the cache"""
+        with self._lock:
+            self._stats['bypassed'] += 1
+
+    def clear(self) -> None:
+        """Drop every cached entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            keys = list(self._disk_index.keys())
+            self._disk_index.clear()
+            self._disk_bytes = 0
+
+        for key in keys:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'disk_entries': len(self._disk_index),
+                'disk_bytes': self._disk_bytes,
+                'disk_budget_bytes': self.disk_budget_bytes,
+                'disk_enabled': self.disk_dir is not None
+            })
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+class CachedTTSProvider(TTSProvider):
+    """
+    TTSProvider wrapper that serves sentence-level audio from an AudioCache
+
+    Text is split into sentences; cached sentences are served directly and
+    only the misses are sent to the wrapped provider. Timed streams (audio
+    with word timings) are cached whole per request text, since timings are
+    relative to the start of the text.
+    """
+
+    def __init__(self, provider: TTSProvider, provider_name: str, cache: AudioCache,
+                 chunker: Optional[SmartTextChunker] = None):
+        """
+        Wrap a provider with caching
+
+        Args:
+            provider: The real TTS provider
+            provider_name: Provider name used in cache keys
+            cache: AudioCache instance
+            chunker: Chunker used to split text into sentences
+        """
+        super().__init__(provider.api_key, **provider.config)
+        self.provider = provider
+        self.provider_name = provider_name
+        self.cache = cache
+        self.chunker = chunker or SmartTextChunker(max_chunk_size=995)
+
+    def __getattr__(self, name):
+        # Delegate provider-specific attributes (emotional_context, base_url, ...)
+        if name == 'provider':
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def _cacheable(self, options: Dict) -> bool:
+        for name, value in options.items():
+            if name not in CACHE_KEY_OPTIONS and value:
+                self.cache.record_bypass()
+                return False
+        return True
+
+    def _timed_key(self, text: str, voice_id: str, options: Dict) -> Optional[str]:
+        """Cache key for a whole timed stream, or None if it must bypass the cache"""
+        if not self._cacheable(options):
+            return None
+        return AudioCache.make_key(f"{self.provider_name}:timed", voice_id, text, options)
+
+    def _plan(self, text: str, voice_id: str, options: Dict) -> Optional[List[Tuple[str, str]]]:
+        """
+        Split text into (sentence, cache_key) pairs
+
+        Returns:
+            List of pairs, or None if the request must bypass the cache
+        """
+        if not self._cacheable(options):
+            return None
+
+        return [
+            (sentence, AudioCache.make_key(self.provider_name, voice_id, sentence, options))
+            for sentence in self.chunker.split_sentences(text)
+        ]
+
+    async def synthesize(self, text: str, voice_id: str, **options) -> bytes:
+        plan = self._plan(text, voice_id, options)
+        if plan is None:
+            return await self.provider.synthesize(text, voice_id, **options)
+
+        parts = []
+        for sentence, key in plan:
+            audio = self.cache.get(key, len(sentence))
+            if audio is None:
+                audio = await self.provider.synthesize(sentence, voice_id, **options)
+                self.cache.put(key, audio)
+            parts.append(audio)
+        return b''.join(parts)
+
+    async def stream(self, text: str, voice_id: str, **options) -> AsyncGenerator[bytes, None]:
+        plan = self._plan(text, voice_id, options)
+        if plan is None:
+            async for chunk in self.provider.stream(text, voice_id, **options):
+                yield chunk
+            return
+
+        for sentence, key in plan:
+            audio = self.cache.get(key, len(sentence))
+            if audio is not None:
+                yield audio
+                continue
+
+            buffer = bytearray()
+            async for chunk in self.provider.stream(sentence, voice_id, **options):
+                if chunk:
+                    buffer.extend(chunk)
+                    yield chunk
+            self.cache.put(key, bytes(buffer))
+
+    def synthesize_sync(self, text: str, voice_id: str, **options) -> bytes:
+        plan = self._plan(text, voice_id, options)
+        if plan is None:
+            return self.provider.synthesize_sync(text, voice_id, **options)
+
+        parts = []
+        for sentence, key in plan:
+            audio = self.cache.get(key, len(sentence))
+            if audio is None:
+                audio = self.provider.synthesize_sync(sentence, voice_id, **options)
+                self.cache.put(key, audio)
+            parts.append(audio)
+        return b''.join(parts)
+
+    def stream_sync_generator(self, text: str, voice_id: str, **options):
+        plan = self._plan(text, voice_id, options)
+        if plan is None:
+            yield from self.provider.stream_sync_generator(text, voice_id, **options)
+            return
+
+        token = current_token()
+        hits = 0
+        for sentence, key in plan:
+            if token is not None and token.cancelled:
+                return
+            audio = self.cache.get(key, len(sentence))
+            if audio is not None:
+                hits += 1
+                yield audio
+                continue
+
+            buffer = bytearray()
+            # A failed or timed-out stream raises here, so only complete audio is cached
+            for chunk in self.provider.stream_sync_generator(sentence, voice_id, **options):
+                if chunk:
+                    buffer.extend(chunk)
+                    yield chunk
+            # A cancelled stream ends early; never cache partial audio
+            if buffer and not (token is not None and token.cancelled):
+                self.cache.put(key, bytes(buffer))
+
+        if hits:
+            print(f"💾 TTS cache: {hits}/{len(plan)} sentences served from cache")
+
+    async def stream_with_timestamps(self, text: str, voice_id: str, **options) -> AsyncGenerator[Dict, None]:
+        key = self._timed_key(text, voice_id, options)
+        cached = self.cache.get(key, len(text)) if key is not None else None
+        if cached is not None:
+            for frame in decode_frames(cached):
+                yield frame
+            return
+
+        frames = []
+        async for frame in self.provider.stream_with_timestamps(text, voice_id, **options):
+            frames.append(frame)
+            yield frame
+        self._put_frames(key, frames)
+
+    def stream_with_timestamps_sync(self, text: str, voice_id: str, **options):
+        key = self._timed_key(text, voice_id, options)
+        cached = self.cache.get(key, len(text)) if key is not None else None
+        if cached is not None:
+            yield from decode_frames(cached)
+            return
+
+        frames = []
+        for frame in self.provider.stream_with_timestamps_sync(text, voice_id, **options):
+            frames.append(frame)
+            yield frame
+        self._put_frames(key, frames)
+
+    def _put_frames(self, key: Optional[str], frames: List[Dict]) -> None:
+        # Only reached when the provider stream completed; a cancelled one may have ended early
+        token = current_token()
+        if key is None or (token is not None and token.cancelled):
+            return
+        if any(frame['type'] == 'audio' and frame['data'] for frame in frames):
+            self.cache.put(key, encode_frames(frames))
+
+    @property
+    def supports_timestamps(self) -> bool:
+        return self.provider.supports_timestamps
+
+    def get_voices(self) -> List[Dict]:
+        return self.provider.get_voices()
+
+    def validate_text(self, text: str) -> Tuple[bool, str]:
+        return self.provider.validate_text(text)
+
+    def get_pool_stats(self) -> Dict:
+        return self.provider.get_pool_stats()
+
+    def get_cache_stats(self) -> Dict:
+        """Get audio cache statistics"""
+        return self.cache.get_stats()
+
+    def close(self) -> None:
+        self.provider.close()
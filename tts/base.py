@@ -7,6 +7,9 @@ from abc import ABC, abstractmethod
 from typing import AsyncGenerator, Optional, Dict, List, Tuple
 import asyncio
 
+from .async_bridge import get_background_loop, iterate_async_sync
+from .cancellation import current_token
+
 class TTSProvider(ABC):
     """Abstract base class for all TTS providers"""
     
@@ -69,94 +72,110 @@ class TTSProvider(ABC):
         """
         pass
     
+    async def stream_with_timestamps(self, text: str, voice_id: str, **options) -> AsyncGenerator[Dict, None]:
+        """
+        Stream audio interleaved with word timing frames
+        
+        Providers that report word timings override this; the default
+        streams audio only.
+        
+        Args:
+            text: Text to synthesize
+            voice_id: Voice identifier
+            **options: Additional options
+            
+        Yields:
+            {'type': 'audio', 'data': bytes} and
+            {'type': 'timestamps', 'words': [{'word': str, 'start': ms, 'end': ms}, ...]} frames
+        """
+        async for chunk in self.stream(text, voice_id, **options):
+            if chunk:
+                yield {'type': 'audio', 'data': chunk}
+    
+    @property
+    def supports_timestamps(self) -> bool:
+        """Whether stream_with_timestamps reports word timings"""
+        return False
+    
+    def get_pool_stats(self) -> Dict:
+        """Get connection pool statistics (providers without a pool report none)"""
+        return {}
+    
+    def close(self) -> None:
+        """Release long-lived resources such as pooled HTTP connections"""
+        pass
+    
     # Synchronous wrappers for backward compatibility
     def synthesize_sync(self, text: str, voice_id: str, **options) -> bytes:
-        """Synchronous wrapper for synthesize"""
-        return asyncio.run(self.synthesize(text, voice_id, **options))
+        """Synchronous wrapper for synthesize (runs on the shared event loop)"""
+        return get_background_loop().run(self.synthesize(text, voice_id, **options))
     
     def stream_sync_generator(self, text: str, voice_id: str, **options):
         """
         Optimized synchronous streaming generator for Flask compatibility
-        Uses larger chunks for better performance and reduced latency
+        Consumes the async stream on the process-wide event loop through a
+        bounded, backpressured bridge (no thread or loop per request)
         """
-        import threading
-        import queue
         import time
         
+        # Don't start (and bill) a request whose client has already gone
+        token = current_token()
+        if token is not None:
+            if token.cancelled:
+                return
+            token.record_request(len(text))
+        
         # Performance monitoring
         start_time = time.time()
         chunk_count = 0
         total_bytes = 0
         first_chunk_time = None
         
-        # Create queues for results and exceptions
-        result_queue = queue.Queue()
-        exception_holder = [None]
-        
-        def run_async():
-            """Run async stream in background thread"""
-            try:
-                # Create new event loop for this thread
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+        try:
+            for chunk in iterate_async_sync(
+                lambda: self.stream(text, voice_id, **options),
+                max_pending=self.config.get('stream_max_pending', 8),
+                timeout=30  # 30 second timeout
+            ):
+                if not chunk:
+                    continue
                 
-                async def collect_chunks():
-                    """Collect chunks from async stream"""
-                    try:
-                        async for chunk in self.stream(text, voice_id, **options):
-                            if chunk:
-                                result_queue.put(('chunk', chunk))
-                        result_queue.put(('done', None))
-                    except Exception as e:
-                        result_queue.put(('error', e))
+                chunk_count += 1
+                total_bytes += len(chunk)
                 
-                # Run async collection
-                loop.run_until_complete(collect_chunks())
-                loop.close()
+                if first_chunk_time is None:
+                    first_chunk_time = (time.time() - start_time) * 1000
+                    print(f"⚡ First chunk in {first_chunk_time:.0f}ms")
+                    print(f"📦 First chunk size: {len(chunk)} bytes")
                 
-            except Exception as e:
-                exception_holder[0] = e
-                result_queue.put(('error', e))
-        
-        # Start async collection in background thread
-        thread = threading.Thread(target=run_async)
-        thread.daemon = True  # Allow thread to be killed when main thread exits
-        thread.start()
+                yield chunk
+            
+            total_time = (time.time() - start_time) * 1000
+            print(f"✅ Stream complete: {chunk_count} chunks, {total_bytes} bytes in {total_time:.0f}ms")
+            
+        except TimeoutError:
+            # Re-raised so callers (e.g. the audio cache) never treat truncated audio as complete
+            print("❌ Streaming timeout after 30 seconds")
+            raise
+        except Exception as e:
+            print(f"❌ Streaming error: {e}")
+            raise
+    
+    def stream_with_timestamps_sync(self, text: str, voice_id: str, **options):
+        """
+        Synchronous wrapper for stream_with_timestamps (runs on the shared event loop)
         
-        # Yield chunks as they become available
-        while True:
-            try:
-                # Get next item with timeout
-                item_type, item_value = result_queue.get(timeout=30)  # 30 second timeout
-                
-                if item_type == 'chunk':
-                    chunk_count += 1
-                    total_bytes += len(item_value)
-                    
-                    if first_chunk_time is None:
-                        first_chunk_time = (time.time() - start_time) * 1000
-                        print(f"⚡ First chunk in {first_chunk_time:.0f}ms")
-                        print(f"📦 First chunk size: {len(item_value)} bytes")
-                    
-                    yield item_value
-                    
-                elif item_type == 'done':
-                    total_time = (time.time() - start_time) * 1000
-                    print(f"✅ Stream complete: {chunk_count} chunks, {total_bytes} bytes in {total_time:.0f}ms")
-                    break
-                    
-                elif item_type == 'error':
-                    print(f"❌ Streaming error: {item_value}")
-                    raise item_value
-                    
-            except queue.Empty:
-                print("❌ Streaming timeout after 30 seconds")
-                break
-            except Exception as e:
-                print(f"❌ Unexpected error: {e}")
-                break
+        Yields:
+            Audio and timestamp frames, see stream_with_timestamps
+        """
+        token = current_token()
+        if token is not None:
+            if token.cancelled:
+                return
+            token.record_request(len(text))
         
-        # Ensure thread cleanup
-        thread.join(timeout=1)
-        if thread.is_alive():
-            print("⚠️ Background thread did not exit cleanly")
+        yield from iterate_async_sync(
+            lambda: self.stream_with_timestamps(text, voice_id, **options),
+            max_pending=self.config.get('stream_max_pending', 8),
+            timeout=30
+        )
@@ -0,0 +1,198 @@
+"""
+Stream Cancellation
+Propagates client disconnects (barge-in, navigation) from the Flask response
+generator down to in-flight provider requests, and accounts for the
+characters that were never sent for synthesis as a result
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+# Cancellation reasons set by cancellable_stream
+CLIENT_DISCONNECTED = "client disconnected"
+PROVIDER_ERROR = "provider error"
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag with callbacks
+
+    Providers register callbacks (e.g. closing an HTTP response) so a
+    cancel from another thread interrupts blocking reads immediately.
+    Child tokens are cancelled with their parent and report the characters
+    they send upstream to it.
+    """
+
+    def __init__(self, parent: Optional['CancellationToken'] = None):
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._callbacks = []
+        self._parent = parent
+        self.reason = None
+        self.chars_sent = 0
+        if parent is not None:
+            parent.add_callback(lambda: self.cancel(parent.reason))
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel the token and run its callbacks (idempotent)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Cancellation callback failed: {e}")
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run callback on cancel (immediately if already cancelled)
+
+        Returns:
+            A function that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    def child(self) -> 'CancellationToken':
+        """Create a token that is cancelled along with this one"""
+        return CancellationToken(parent=self)
+
+    def record_request(self, chars: int) -> None:
+        """Record characters sent to a provider under this token"""
+        token = self
+        while token is not None:
+            with token._lock:
+                token.chars_sent += chars
+            token = token._parent
+
+
+_scope = threading.local()
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken]):
+    """
+    Make token the current cancellation token for this thread
+
+    Provider sync paths consult current_token() so routes and pipeline
+    workers can cancel them without changing provider signatures.
+    """
+    previous = getattr(_scope, 'token', None)
+    _scope.token = token
+    try:
+        yield token
+    finally:
+        _scope.token = previous
+
+
+def current_token() -> Optional[CancellationToken]:
+    """The cancellation token bound to the calling thread, if any"""
+    return getattr(_scope, 'token', None)
+
+
+class CancellationStats:
+    """
+    Process-wide counters for cancelled streams
+
+    Streams aborted by a provider error are counted as failed_streams, not
+    cancelled_streams, so the disconnect count only reflects clients going
+    away; the characters they never sent still count as avoided.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {'cancelled_streams': 0, 'failed_streams': 0, 'chars_avoided': 0,
+                       'chars_sent_before_cancel': 0}
+        self._by_endpoint = {}
+
+    def record(self, endpoint: str, planned_chars: int, token: CancellationToken) -> int:
+        """
+        Record a cancelled (or failed) stream
+
+        Args:
+            endpoint: Route or component that was cancelled
+            planned_chars: Characters the stream would have synthesized
+            token: The stream's token (its chars_sent were already billed)
+
+        Returns:
+            Characters avoided (never sent to a provider)
+        """
+        avoided = max(0, planned_chars - token.chars_sent)
+        counter = 'failed_streams' if token.reason == PROVIDER_ERROR else 'cancelled_streams'
+        with self._lock:
+            self._stats[counter] += 1
+            self._stats['chars_avoided'] += avoided
+            self._stats['chars_sent_before_cancel'] += token.chars_sent
+            endpoint_stats = self._by_endpoint.setdefault(
+                endpoint, {'cancelled_streams': 0, 'failed_streams': 0, 'chars_avoided': 0}
+            )
+            endpoint_stats[counter] += 1
+            endpoint_stats['chars_avoided'] += avoided
+        print(f"🛑 {endpoint}: stream cancelled ({token.reason}), avoided {avoided} chars")
+        return avoided
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['by_endpoint'] = {name: dict(values) for name, values in self._by_endpoint.items()}
+        return stats
+
+
+cancellation_stats = CancellationStats()
+
+
+def cancellable_stream(generate: Callable[[], Iterator], endpoint: str,
+                       planned_chars, token: Optional[CancellationToken] = None) -> Iterator:
+    """
+    Wrap a streaming response generator with client-disconnect cancellation
+
+    WSGI servers close the response iterable when the client goes away
+    (barge-in, navigation); that close cancels the token, which aborts any
+    in-flight provider request, and the avoided characters are recorded.
+    An exception from the wrapped generator cancels it as a provider error
+    instead, so it is not counted as a disconnect.
+
+    Args:
+        generate: Zero-argument callable returning the response generator
+        endpoint: Name used in cancellation statistics
+        planned_chars: Characters the stream would synthesize (int or callable)
+        token: Token to use (a new one by default)
+
+    Yields:
+        Whatever the wrapped generator yields
+    """
+    token = token or CancellationToken()
+    with cancellation_scope(token):
+        try:
+            yield from generate()
+        except GeneratorExit:
+            token.cancel(CLIENT_DISCONNECTED)
+            raise
+        except Exception:
+            token.cancel(PROVIDER_ERROR)
+            raise
+        finally:
+            if token.cancelled:
+                planned = planned_chars() if callable(planned_chars) else planned_chars
+                cancellation_stats.record(endpoint, planned, token)
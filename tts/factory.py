@@ -3,20 +3,42 @@ TTS Provider Factory
 Handles creation and configuration of TTS providers
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .base import TTSProvider
+from .audio_cache import AudioCache, CachedTTSProvider
+from .hedging import HedgedTTSProvider
 
 class TTSFactory:
     """Factory for creating TTS provider instances"""
     
-    @staticmethod
-    def create_provider(provider_name: str, config: Dict[str, Any]) -> TTSProvider:
+    # Process-wide audio cache, shared across provider switches
+    _audio_cache: Optional[AudioCache] = None
+    
+    @classmethod
+    def get_audio_cache(cls, cache_config: Dict[str, Any]) -> AudioCache:
+        """Get (or lazily create) the shared audio cache"""
+        if cls._audio_cache is None:
+            cls._audio_cache = AudioCache(
+                memory_budget_bytes=int(cache_config.get('memory_mb', 64)) * 1024 * 1024,
+                disk_budget_bytes=int(cache_config.get('disk_mb', 512)) * 1024 * 1024,
+                disk_dir=cache_config.get('disk_dir') or None
+            )
+        return cls._audio_cache
+    
+    @classmethod
+    def create_provider(cls, provider_name: str, config: Dict[str, Any]) -> TTSProvider:
         """
         Create a TTS provider instance
         
         Args:
-            provider_name: Name of the provider ('unrealspeech', 'hume', 'hume_evi3')
-            config: Configuration dictionary with provider-specific settings
+            provider_name: Name of the provider ('unrealspeech', 'hume', 'hume_evi3', 'mock')
+            config: Configuration dictionary with provider-specific settings.
+                An optional 'cache' dict ({'enabled', 'memory_mb', 'disk_mb',
+                'disk_dir'}) wraps the provider with the sentence-level audio cache.
+                An optional 'hedge' dict ({'enabled', 'secondaries', 'hedge_after_ms',
+                'breaker'}) races secondary providers when the first chunk is slow;
+                each raced provider gets its own cache wrapper, so audio is keyed
+                by the provider and voice that actually produced it.
             
         Returns:
             TTSProvider instance
@@ -25,6 +47,52 @@ class TTSFactory:
             ValueError: If provider_name is not supported
             KeyError: If required config keys are missing
         """
+        cache_config = config.get('cache') or {}
+        provider = cls._with_cache(cls._create_base_provider(provider_name, config),
+                                   provider_name.lower(), cache_config)
+        
+        hedge_config = config.get('hedge') or {}
+        if hedge_config.get('enabled'):
+            provider = cls._create_hedged_provider(provider, provider_name.lower(), hedge_config, cache_config)
+        
+        return provider
+    
+    @classmethod
+    def _with_cache(cls, provider: TTSProvider, provider_name: str,
+                    cache_config: Dict[str, Any]) -> TTSProvider:
+        """Wrap a provider with the shared audio cache if caching is enabled"""
+        if not cache_config.get('enabled'):
+            return provider
+        return CachedTTSProvider(provider, provider_name=provider_name, cache=cls.get_audio_cache(cache_config))
+    
+    @classmethod
+    def _create_hedged_provider(cls, primary: TTSProvider, primary_name: str,
+                                hedge_config: Dict[str, Any], cache_config: Dict[str, Any]) -> TTSProvider:
+        """Wrap the (cached) primary provider with hedging across the configured secondaries"""
+        secondaries = []
+        for secondary_config in hedge_config.get('secondaries', []):
+            name = secondary_config['provider']
+            try:
+                secondaries.append((name, cls._with_cache(cls._create_base_provider(name, secondary_config),
+                                                          name.lower(), cache_config)))
+            except Exception as e:
+                print(f"⚠️ Hedge provider '{name}' unavailable: {e}")
+        
+        if not secondaries:
+            return primary
+        
+        print(f"🏁 TTS hedging enabled: {primary_name} -> {[name for name, _ in secondaries]}")
+        return HedgedTTSProvider(
+            primary,
+            primary_name=primary_name,
+            secondaries=secondaries,
+            hedge_after_ms=float(hedge_config.get('hedge_after_ms', 0)),
+            breaker_options=hedge_config.get('breaker')
+        )
+    
+    @staticmethod
+    def _create_base_provider(provider_name: str, config: Dict[str, Any]) -> TTSProvider:
+        """Create the underlying (uncached) provider instance"""
         provider_name = provider_name.lower()
         
         if provider_name == "unrealspeech":
@@ -78,14 +146,22 @@ class TTSFactory:
                 **config.get('options', {})
             )
         
+        elif provider_name == "mock":
+            # Offline stand-in for load testing; no dependencies or network
+            from .providers.mock import MockTTSProvider
+            return MockTTSProvider(
+                api_key=config.get('api_key') or 'mock',
+                **config.get('options', {})
+            )
+        
         else:
-            available_providers = ['unrealspeech', 'hume', 'hume_evi3']
+            available_providers = ['unrealspeech', 'hume', 'hume_evi3', 'mock']
             raise ValueError(f"Unknown provider '{provider_name}'. Available providers: {available_providers}")
     
     @staticmethod
     def get_available_providers() -> List[str]:
         """Get list of available TTS providers"""
-        return ['unrealspeech', 'hume', 'hume_evi3']
+        return ['unrealspeech', 'hume', 'hume_evi3', 'mock']
     
     @staticmethod
     def get_provider_info(provider_name: str) -> Dict[str, Any]:
@@ -119,6 +195,15 @@ class TTSFactory:
                 'languages': 1,
                 'voices': 'custom',
                 'evi3_enabled': True
+            },
+            'mock': {
+                'name': 'Mock TTS',
+                'description': 'Deterministic offline stand-in (silent MP3) for load testing',
+                'features': ['streaming', 'word_timestamps', 'configurable_latency', 'error_injection'],
+                'cost_per_million_chars': 0,
+                'max_text_length': 1000,
+                'languages': 1,
+                'voices': 1
             }
         }
         
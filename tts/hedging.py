@@ -0,0 +1,560 @@
+"""
+Hedged TTS Requests
+Races a secondary provider when the primary is slow to produce its first
+chunk, with a per-provider circuit breaker that sheds failing/slow providers
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import AsyncGenerator, Dict, Iterator, List, Optional, Tuple
+
+from .base import TTSProvider
+from .cancellation import CancellationToken, cancellation_scope, current_token
+
+
+# Options each provider understands; others are dropped when a request
+# moves to that provider (unlisted providers get every option)
+PROVIDER_OPTIONS = {
+    'unrealspeech': {'speed', 'pitch', 'temperature', 'bitrate'},
+    'hume': {'speed', 'voice_description'},
+    'mock': {'bitrate'},
+}
+
+# Providers whose speed is an offset from normal (0); the rest take a multiplier (1.0)
+SPEED_OFFSET_PROVIDERS = {'unrealspeech'}
+
+
+def map_options(options: Dict, source: str, target: str) -> Dict:
+    """
+    Translate synthesis options written for one provider to another
+
+    Args:
+        options: Options as normalized for the source provider
+        source: Provider the options were written for
+        target: Provider the request is sent to
+
+    Returns:
+        Options for the target provider
+    """
+    if source == target:
+        return dict(options)
+    supported = PROVIDER_OPTIONS.get(target)
+    mapped = {name: value for name, value in options.items() if supported is None or name in supported}
+
+    if mapped.get('speed') not in (None, ''):
+        try:
+            speed = float(mapped['speed'])
+        except (TypeError, ValueError):
+            del mapped['speed']
+        else:
+            if source in SPEED_OFFSET_PROVIDERS and target not in SPEED_OFFSET_PROVIDERS:
+                speed += 1.0
+            elif target in SPEED_OFFSET_PROVIDERS and source not in SPEED_OFFSET_PROVIDERS:
+                speed -= 1.0
+            mapped['speed'] = str(speed)
+    return mapped
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker
+
+    Closed: traffic flows. After `failure_threshold` consecutive failures
+    (errors, or first chunks slower than slow_call_ms) the breaker opens and
+    the provider is skipped for `cooldown` seconds. It then half-opens and
+    lets a single trial request through; success closes it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, slow_call_ms: float = 5000,
+                 cooldown: float = 30.0, window: int = 100):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_ms = slow_call_ms
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._latencies = deque(maxlen=window)
+        self._stats = {'successes': 0, 'failures': 0, 'slow_calls': 0, 'rejected': 0, 'opened': 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.time() - self._opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent to this provider now"""
+        return self.admit() is not None
+
+    def admit(self) -> Optional[str]:
+        """
+        Admit a request to this provider
+
+        Returns:
+            CLOSED for normal traffic, HALF_OPEN if the request is the single
+            trial (release it with release_trial() if it ends without a
+            recorded outcome), or None if rejected
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return self.CLOSED
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return self.HALF_OPEN
+            self._stats['rejected'] += 1
+            return None
+
+    def release_trial(self) -> None:
+        """Give back a trial that ended without an outcome (cancelled, or lost a hedge)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self, first_chunk_ms: float) -> None:
+        """Record a call that produced audio, with its time to first chunk"""
+        if first_chunk_ms > self.slow_call_ms:
+            self._stats['slow_calls'] += 1
+            self.record_failure()
+            return
+
+        with self._lock:
+            self._latencies.append(first_chunk_ms)
+            self._stats['successes'] += 1
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+            if self._state != self.CLOSED:
+                print(f"✅ Circuit closed for TTS provider '{self.name}'")
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """Record an error or an excessively slow call"""
+        with self._lock:
+            self._stats['failures'] += 1
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            state = self._current_state()
+            if state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if state != self.OPEN:
+                    self._stats['opened'] += 1
+                    print(f"🔌 Circuit opened for TTS provider '{self.name}' ({self._consecutive_failures} failures)")
+                self._state = self.OPEN
+                self._opened_at = time.time()
+
+    def first_chunk_percentile(self, percentile: float = 0.95) -> Optional[float]:
+        """Observed time-to-first-chunk percentile in ms (None without samples)"""
+        with self._lock:
+            if not self._latencies:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['state'] = self._current_state()
+            stats['consecutive_failures'] = self._consecutive_failures
+            stats['samples'] = len(self._latencies)
+        p95 = self.first_chunk_percentile(0.95)
+        stats['first_chunk_p95_ms'] = round(p95, 1) if p95 is not None else None
+        return stats
+
+
+class _Racer:
+    """One provider's attempt at a request, streaming into a bounded queue"""
+
+    def __init__(self, name: str, provider: TTSProvider, breaker: CircuitBreaker, text: str,
+                 voice_id: str, options: Dict, signals: queue.Queue, max_pending: int,
+                 token: CancellationToken, trial: bool = False):
+        self.name = name
+        self.token = token
+        self.provider = provider
+        self.breaker = breaker
+        self.voice_id = voice_id
+        self.trial = trial  # Holds the breaker's half-open trial until an outcome is recorded
+        self.started = time.time()
+        self.first_chunk_at = None
+        self.error = None
+        self.cancelled = threading.Event()
+        self.audio = queue.Queue(maxsize=max_pending)
+        self._signals = signals
+
+        self._thread = threading.Thread(
+            target=self._run, args=(text, voice_id, options),
+            name=f"tts-hedge-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, text: str, voice_id: str, options: Dict) -> None:
+        with cancellation_scope(self.token):
+            self._stream(text, voice_id, options)
+
+    def _stream(self, text: str, voice_id: str, options: Dict) -> None:
+        generator = self.provider.stream_sync_generator(text=text, voice_id=voice_id, **options)
+        try:
+            for chunk in generator:
+                if not chunk:
+                    continue
+                if self.first_chunk_at is None:
+                    self.first_chunk_at = time.time()
+                    self._signals.put(self)
+                if not self._put(('chunk', chunk)):
+                    return
+            if self.first_chunk_at is None:
+                self.error = RuntimeError(f"Provider '{self.name}' returned no audio")
+                self._signals.put(self)
+            self._put(('done', None))
+        except Exception as e:
+            if self.first_chunk_at is None:
+                self.error = e
+                self._signals.put(self)
+            self._put(('error', e))
+        finally:
+            generator.close()
+
+    def _put(self, item) -> bool:
+        # Block while the consumer is behind, but give up once cancelled
+        while not self.cancelled.is_set():
+            try:
+                self.audio.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def record_success(self) -> None:
+        self.trial = False
+        self.breaker.record_success(self.first_chunk_ms)
+
+    def record_failure(self) -> None:
+        self.trial = False
+        self.breaker.record_failure()
+
+    def release(self) -> None:
+        """Release the breaker trial if this attempt ended without an outcome"""
+        if self.trial:
+            self.trial = False
+            self.breaker.release_trial()
+
+    @property
+    def first_chunk_ms(self) -> float:
+        end = self.first_chunk_at or time.time()
+        return (end - self.started) * 1000
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        # Abort the provider request even if it is still waiting for a first byte
+        self.token.cancel("hedge cancelled")
+
+    def drain(self, timeout: float) -> Iterator[bytes]:
+        while True:
+            try:
+                kind, value = self.audio.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No audio from '{self.name}' for {timeout:.0f}s")
+            if kind == 'chunk':
+                yield value
+            elif kind == 'error':
+                raise value
+            else:
+                return
+
+
+class HedgedTTSProvider(TTSProvider):
+    """
+    TTSProvider wrapper that hedges slow first chunks across providers
+
+    The primary provider is tried first. If it has not produced a first chunk
+    within hedge_after_ms (or fails before producing one), the same request
+    is fired at the next secondary provider whose circuit is closed; the
+    first to produce audio wins and the loser is cancelled.
+    """
+
+    def __init__(self, primary: TTSProvider, primary_name: str,
+                 secondaries: List[Tuple[str, TTSProvider]], hedge_after_ms: float = 0,
+                 min_hedge_after_ms: float = 300, default_hedge_after_ms: float = 1500,
+                 chunk_timeout: float = 30.0, max_pending: int = 8,
+                 breaker_options: Optional[Dict] = None):
+        """
+        Wrap a primary provider with hedging
+
+        Args:
+            primary: The preferred TTS provider
+            primary_name: Name of the primary provider
+            secondaries: (name, provider) pairs to hedge with, in preference order
+            hedge_after_ms: Fixed hedge delay; 0 uses the primary's observed p95
+                time to first chunk (clamped to min_hedge_after_ms)
+            min_hedge_after_ms: Lower bound for the adaptive hedge delay
+            default_hedge_after_ms: Hedge delay until enough samples exist
+            chunk_timeout: Seconds to wait for audio once a provider has won
+            max_pending: Audio chunks buffered ahead of the consumer per provider
+            breaker_options: CircuitBreaker keyword arguments
+        """
+        super().__init__(primary.api_key, **primary.config)
+        self.provider = primary
+        self.primary_name = primary_name
+        self.secondaries = list(secondaries)
+        self.hedge_after_ms = hedge_after_ms
+        self.min_hedge_after_ms = min_hedge_after_ms
+        self.default_hedge_after_ms = default_hedge_after_ms
+        self.chunk_timeout = chunk_timeout
+        self.max_pending = max_pending
+
+        breaker_options = breaker_options or {}
+        self.breakers = {
+            name: CircuitBreaker(name, **breaker_options)
+            for name in [primary_name] + [name for name, _ in self.secondaries]
+        }
+        self._stats_lock = threading.Lock()
+        self._hedge_stats = {'requests': 0, 'hedged': 0, 'secondary_wins': 0, 'failovers': 0}
+
+    def __getattr__(self, name):
+        # Delegate provider-specific attributes to the primary
+        if name == 'provider':
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._hedge_stats[key] += 1
+
+    def _candidates(self) -> List[Tuple[str, TTSProvider]]:
+        return [(self.primary_name, self.provider)] + self.secondaries
+
+    def _hedge_delay(self) -> float:
+        """Seconds to wait for the primary's first chunk before hedging"""
+        if self.hedge_after_ms > 0:
+            return self.hedge_after_ms / 1000
+        p95 = self.breakers[self.primary_name].first_chunk_percentile(0.95)
+        if p95 is None or self.breakers[self.primary_name].get_stats()['samples'] < 20:
+            return self.default_hedge_after_ms / 1000
+        return max(self.min_hedge_after_ms, p95) / 1000
+
+    @staticmethod
+    def _voice_for(provider: TTSProvider, voice_id: str) -> str:
+        """Map the requested voice to one the provider supports"""
+        try:
+            voice_ids = {voice['id'] for voice in provider.get_voices()}
+        except Exception:
+            return voice_id
+        if voice_id in voice_ids:
+            return voice_id
+        return provider.config.get('default_voice') or voice_id
+
+    def stream_sync_generator(self, text: str, voice_id: str, **options):
+        """
+        Stream audio from whichever provider produces a first chunk first
+
+        Yields:
+            Audio data chunks as bytes
+        """
+        self._count('requests')
+        candidates = self._candidates()
+        next_candidate = 0
+        signals = queue.Queue()
+        racers = []
+        winner = None
+        parent_token = current_token() or CancellationToken()
+
+        def start(name: str, provider: TTSProvider, trial: bool) -> None:
+            if racers:
+                print(f"🏁 Hedging TTS request to '{name}' after {racers[0].first_chunk_ms:.0f}ms")
+            racers.append(_Racer(name, provider, self.breakers[name], text,
+                                 self._voice_for(provider, voice_id), map_options(options, self.primary_name, name),
+                                 signals, self.max_pending, parent_token.child(), trial=trial))
+
+        def launch() -> bool:
+            # Breakers are asked only when a provider is actually started, so
+            # a half-open trial is never taken by a provider that isn't
+            nonlocal next_candidate
+            while next_candidate < len(candidates):
+                name, provider = candidates[next_candidate]
+                next_candidate += 1
+                admission = self.breakers[name].admit()
+                if admission is not None:
+                    start(name, provider, trial=admission == CircuitBreaker.HALF_OPEN)
+                    return True
+            if not racers:
+                # Every circuit is open: try the primary anyway rather than fail outright
+                start(self.primary_name, self.provider, trial=False)
+                return True
+            return False
+
+        try:
+            launch()
+            hedged = False
+            deadline = time.time() + self.chunk_timeout
+            while winner is None:
+                if parent_token.cancelled:
+                    return
+                running = [r for r in racers if r.error is None]
+                # Hedge once the primary is slow, or immediately if every racer has failed
+                wait = self._hedge_delay() if not hedged else max(0.0, deadline - time.time())
+                if not running:
+                    if not launch():
+                        raise racers[-1].error
+                    self._count('failovers')
+                    continue
+
+                try:
+                    racer = signals.get(timeout=wait)
+                except queue.Empty:
+                    if not hedged and launch():
+                        hedged = True
+                        self._count('hedged')
+                        continue
+                    if time.time() >= deadline:
+                        raise TimeoutError(f"No audio from any TTS provider for {self.chunk_timeout:.0f}s")
+                    hedged = True
+                    continue
+
+                if parent_token.cancelled:
+                    return  # Consumer went away; not the provider's fault
+                if racer.error is not None:
+                    print(f"⚠️ TTS provider '{racer.name}' failed before first chunk: {racer.error}")
+                    racer.record_failure()
+                    continue
+                winner = racer
+
+            winner.record_success()
+            if winner.name != self.primary_name:
+                self._count('secondary_wins')
+                print(f"🏁 '{winner.name}' won the hedge in {winner.first_chunk_ms:.0f}ms")
+
+            for racer in racers:
+                if racer is not winner:
+                    racer.cancel()
+                    # A cancelled loser was at least as slow as the winner
+                    if racer.error is None and racer.first_chunk_ms > racer.breaker.slow_call_ms:
+                        racer.record_failure()
+
+            try:
+                yield from winner.drain(self.chunk_timeout)
+            except Exception:
+                if parent_token.cancelled:
+                    return
+                winner.record_failure()
+                raise
+        finally:
+            for racer in racers:
+                racer.cancel()
+                racer.release()
+
+    def synthesize_sync(self, text: str, voice_id: str, **options) -> bytes:
+        return b''.join(self.stream_sync_generator(text, voice_id, **options))
+
+    def _first_available(self) -> Tuple[str, TTSProvider, bool]:
+        """
+        Pick the first provider whose breaker admits a request
+
+        Returns:
+            (name, provider, trial) where trial is True if the request holds
+            the breaker's half-open trial (see _release_trial)
+        """
+        for name, provider in self._candidates():
+            state = self.breakers[name].admit()
+            if state is not None:
+                return name, provider, state == CircuitBreaker.HALF_OPEN
+        return self.primary_name, self.provider, False
+
+    def _release_trial(self, name: str, trial: bool) -> None:
+        # A cancelled request (CancelledError/GeneratorExit) or one that ended
+        # without audio recorded no outcome; give the trial back so the
+        # breaker doesn't stay half-open with a trial that never finishes
+        if trial:
+            self.breakers[name].release_trial()
+
+    async def synthesize(self, text: str, voice_id: str, **options) -> bytes:
+        # Async callers are not raced; they go to the first provider with a closed circuit
+        name, provider, trial = self._first_available()
+        started = time.time()
+        try:
+            audio = await provider.synthesize(text, self._voice_for(provider, voice_id),
+                                              **map_options(options, self.primary_name, name))
+        except Exception:
+            trial = False
+            self.breakers[name].record_failure()
+            raise
+        finally:
+            self._release_trial(name, trial)
+        self.breakers[name].record_success((time.time() - started) * 1000)
+        return audio
+
+    async def stream(self, text: str, voice_id: str, **options) -> AsyncGenerator[bytes, None]:
+        name, provider, trial = self._first_available()
+        started = time.time()
+        first = True
+        try:
+            async for chunk in provider.stream(text, self._voice_for(provider, voice_id),
+                                               **map_options(options, self.primary_name, name)):
+                if first and chunk:
+                    first = trial = False
+                    self.breakers[name].record_success((time.time() - started) * 1000)
+                yield chunk
+        except Exception:
+            trial = False
+            self.breakers[name].record_failure()
+            raise
+        finally:
+            self._release_trial(name, trial)
+
+    async def stream_with_timestamps(self, text: str, voice_id: str, **options) -> AsyncGenerator[Dict, None]:
+        # Timed streams are not raced: a secondary would report different timings
+        name, provider, trial = self._first_available()
+        started = time.time()
+        first = True
+        try:
+            async for frame in provider.stream_with_timestamps(text, self._voice_for(provider, voice_id),
+                                                               **map_options(options, self.primary_name, name)):
+                if first and frame.get('type') == 'audio':
+                    first = trial = False
+                    self.breakers[name].record_success((time.time() - started) * 1000)
+                yield frame
+        except Exception:
+            trial = False
+            self.breakers[name].record_failure()
+            raise
+        finally:
+            self._release_trial(name, trial)
+
+    @property
+    def supports_timestamps(self) -> bool:
+        return self.provider.supports_timestamps
+
+    def get_voices(self) -> List[Dict]:
+        return self.provider.get_voices()
+
+    def validate_text(self, text: str) -> Tuple[bool, str]:
+        return self.provider.validate_text(text)
+
+    def get_pool_stats(self) -> Dict:
+        return self.provider.get_pool_stats()
+
+    def get_hedge_stats(self) -> Dict:
+        """Get hedging counters and per-provider circuit breaker state"""
+        with self._stats_lock:
+            stats = dict(self._hedge_stats)
+        stats['hedge_after_ms'] = round(self._hedge_delay() * 1000, 1)
+        stats['breakers'] = {name: breaker.get_stats() for name, breaker in self.breakers.items()}
+        return stats
+
+    def close(self) -> None:
+        for _, provider in self._candidates():
+            try:
+                provider.close()
+            except Exception as e:
+                print(f"⚠️ Failed to close TTS provider: {e}")
@@ -0,0 +1,244 @@
+"""
+Mock TTS HTTP Server
+Local stand-in for the Unreal Speech and Hume TTS APIs
+
+Serves valid (silent) MP3 audio using the same timing profile as the
+`mock` provider, so the real provider classes, connection pools and
+streaming endpoints can be load-tested offline. Point the app at it with
+UNREALSPEECH_BASE_URL / HUME_BASE_URL.
+
+Endpoints:
+    POST /stream                  Unreal Speech streaming synthesis
+    POST /v0/tts/stream/file      Hume streaming synthesis (raw MP3)
+    POST /v0/tts                  Hume JSON synthesis (base64 MP3)
+    GET  /health                  Liveness and request counters
+
+Usage:
+    python -m tts.mock_server --port 8765 --ttfb-ms 200 --throughput-kbps 48 --jitter-ms 30 --error-rate 0.02
+"""
+
+import argparse
+import base64
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from .providers.mock import MockStreamProfile, parse_bitrate
+
+
+class _MockTTSHandler(BaseHTTPRequestHandler):
+    """Request handler; the profile and counters live on the server"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so client connection pools behave as in production
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            self._send_json(200, {'status': 'ok', 'stats': self.server.get_stats()})
+        else:
+            self._send_json(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        path = self.path.split('?')[0].rstrip('/')
+        try:
+            payload = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {'error': f'Invalid JSON body: {e}'})
+            return
+
+        if path == '/stream':
+            if not self.headers.get('Authorization', '').startswith('Bearer '):
+                self._send_json(401, {'error': 'Missing bearer token'})
+                return
+            text = str(payload.get('Text', ''))
+            self._stream_audio(text, parse_bitrate(payload.get('Bitrate', '192k')))
+        elif path == '/v0/tts/stream/file':
+            self._stream_audio(self._hume_text(payload), 128)
+        elif path == '/v0/tts':
+            self._hume_json(self._hume_text(payload))
+        else:
+            self._send_json(404, {'error': f'Unknown path {self.path}'})
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        body = self.rfile.read(length) if length else b'{}'
+        return json.loads(body or b'{}')
+
+    @staticmethod
+    def _hume_text(payload: Dict) -> str:
+        return ' '.join(str(utterance.get('text', '')) for utterance in payload.get('utterances', []))
+
+    def _send_json(self, status: int, body: Dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _check_request(self, text: str) -> bool:
+        """Validate text and apply error injection; False if an error was sent"""
+        profile = self.server.profile
+        if not text.strip():
+            self._send_json(400, {'error': 'Text cannot be empty'})
+            return False
+        failed = profile.should_fail()
+        self.server.record(len(text), failed)
+        if failed:
+            time.sleep(profile.first_byte_delay())
+            self._send_json(500, {'error': 'Mock TTS injected failure'})
+            return False
+        return True
+
+    def _stream_audio(self, text: str, bitrate_kbps: int) -> None:
+        if not self._check_request(text):
+            return
+
+        profile = self.server.profile
+        audio = profile.audio_for(text, bitrate_kbps)
+        time.sleep(profile.first_byte_delay())
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for index, chunk in enumerate(profile.chunks(audio)):
+                if index:
+                    time.sleep(profile.chunk_delay(len(chunk)))
+                self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+            self.server.record_bytes(len(audio))
+        except (BrokenPipeError, ConnectionResetError):
+            # Client cancelled mid-stream
+            self.close_connection = True
+
+    def _hume_json(self, text: str) -> None:
+        if not self._check_request(text):
+            return
+
+        profile = self.server.profile
+        audio = profile.audio_for(text, 128)
+        time.sleep(profile.first_byte_delay() + profile.chunk_delay(len(audio)))
+        self.server.record_bytes(len(audio))
+        self._send_json(200, {
+            'request_id': str(uuid.uuid4()),
+            'generations': [{
+                'generation_id': str(uuid.uuid4()),
+                'audio': base64.b64encode(audio).decode('ascii'),
+                'duration': profile.duration_ms(text) / 1000,
+                'encoding': {'format': 'mp3', 'sample_rate': 48000},
+                'file_size': len(audio),
+                'snippets': [[]]
+            }]
+        })
+
+
+class MockTTSServer(ThreadingHTTPServer):
+    """
+    Threaded mock TTS server
+
+    Can be run from the command line or started in-process (e.g. from a
+    benchmark or test) with start()/stop() or as a context manager.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        profile: Timing/failure profile (defaults to MockStreamProfile())
+        verbose: Log every request
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765,
+                 profile: Optional[MockStreamProfile] = None, verbose: bool = False):
+        super().__init__((host, port), _MockTTSHandler)
+        self.profile = profile or MockStreamProfile()
+        self.verbose = verbose
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'chars': 0, 'bytes': 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, chars: int, failed: bool) -> None:
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats['chars'] += chars
+            if failed:
+                self._stats['errors'] += 1
+
+    def record_bytes(self, size: int) -> None:
+        with self._stats_lock:
+            self._stats['bytes'] += size
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['profile'] = self.profile.get_config()
+        return stats
+
+    def start(self) -> 'MockTTSServer':
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-tts-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'MockTTSServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Unreal Speech / Hume TTS server for offline load testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ttfb-ms', type=float, default=150, help='Delay before the first audio byte')
+    parser.add_argument('--throughput-kbps', type=float, default=64, help='Delivery rate in KB/s (0 = unthrottled)')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- jitter per chunk')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--chars-per-second', type=float, default=15, help='Speaking rate used to size the audio')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    profile = MockStreamProfile(
+        ttfb_ms=args.ttfb_ms,
+        throughput_kbps=args.throughput_kbps,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        chars_per_second=args.chars_per_second,
+        seed=args.seed
+    )
+    server = MockTTSServer(args.host, args.port, profile=profile, verbose=args.verbose)
+    print(f"🧪 Mock TTS server listening on {server.base_url}")
+    print(f"   UNREALSPEECH_BASE_URL={server.base_url}  HUME_BASE_URL={server.base_url}")
+    print(f"   Profile: {profile.get_config()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Mock TTS server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Pipelined Chunk Synthesis
+Prefetches upcoming text chunks concurrently while emitting audio strictly in order
+"""
+
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from .base import TTSProvider
+from .cancellation import CancellationToken, cancellation_scope, current_token
+from .text_chunker import TextChunk
+
+
+class ChunkAudioBuffer:
+    """
+    Byte-bounded buffer between one chunk's synthesis worker and the consumer
+
+    The worker blocks once max_bytes are buffered (backpressure), so a
+    prefetched chunk never holds more than max_bytes in memory.
+    """
+
+    def __init__(self, max_bytes: int, token: Optional[CancellationToken] = None):
+        self.max_bytes = max_bytes
+        self.token = token or CancellationToken()
+        self._parts = []
+        self._size = 0
+        self._done = False
+        self._error = None
+        self._cancelled = False
+        self._cond = threading.Condition()
+
+    def put(self, data: bytes) -> bool:
+        """
+        Append audio, blocking while the buffer is full
+
+        Returns:
+            False if the consumer cancelled and the worker should stop
+        """
+        with self._cond:
+            while self._size > 0 and self._size + len(data) > self.max_bytes and not self._cancelled:
+                self._cond.wait()
+            if self._cancelled:
+                return False
+            self._parts.append(data)
+            self._size += len(data)
+            self._cond.notify_all()
+            return True
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Mark the chunk complete (optionally with the worker's error)"""
+        with self._cond:
+            self._done = True
+            self._error = error
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        """Stop the worker (aborting its provider request) and drop buffered audio"""
+        with self._cond:
+            self._cancelled = True
+            self._parts.clear()
+            self._size = 0
+            self._cond.notify_all()
+        self.token.cancel("pipeline cancelled")
+
+    def drain(self, timeout: float) -> Iterator[bytes]:
+        """
+        Yield buffered audio until the worker finishes
+
+        Raises:
+            TimeoutError: If no audio arrives within timeout seconds
+            Exception: Whatever the worker raised
+        """
+        while True:
+            with self._cond:
+                deadline = time.time() + timeout
+                while not self._parts and not self._done:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No audio received for {timeout:.0f}s")
+                    self._cond.wait(remaining)
+
+                if self._parts:
+                    parts, self._parts = self._parts, []
+                    self._size = 0
+                    self._cond.notify_all()
+                elif self._error is not None:
+                    raise self._error
+                else:
+                    return
+
+            for part in parts:
+                yield part
+
+
+def pipelined_stream(provider: TTSProvider, chunks: List[TextChunk], voice_id: str,
+                     lookahead: int = 2, max_buffer_bytes: int = 512 * 1024,
+                     chunk_timeout: float = 30.0, **options) -> Iterator[bytes]:
+    """
+    Stream audio for a list of text chunks with bounded concurrent prefetch
+
+    The chunk being played streams live; up to `lookahead` following chunks
+    are synthesized concurrently into byte-bounded buffers. Audio is always
+    emitted in chunk order, so total wall time approaches that of the
+    slowest chunk instead of the sum of all chunks.
+
+    Args:
+        provider: TTS provider to synthesize with
+        chunks: Text chunks in playback order
+        voice_id: Voice identifier
+        lookahead: Number of chunks to prefetch beyond the current one
+        max_buffer_bytes: Maximum buffered audio per prefetched chunk
+        chunk_timeout: Seconds to wait for audio before giving up on a chunk
+        **options: Synthesis options passed to the provider
+
+    Yields:
+        Audio data chunks as bytes, in order
+    """
+    buffers = {}
+    # Workers inherit the consumer's cancellation token (e.g. client disconnect)
+    parent_token = current_token() or CancellationToken()
+
+    def synthesize_chunk(chunk: TextChunk, buffer: ChunkAudioBuffer) -> None:
+        with cancellation_scope(buffer.token):
+            generator = provider.stream_sync_generator(text=chunk.text, voice_id=voice_id, **options)
+            try:
+                for audio in generator:
+                    if audio and not buffer.put(audio):
+                        break
+                buffer.finish()
+            except BaseException as e:
+                buffer.finish(e)
+            finally:
+                generator.close()
+
+    def start(index: int) -> None:
+        if index >= len(chunks) or index in buffers or parent_token.cancelled:
+            return
+        buffer = ChunkAudioBuffer(max_buffer_bytes, token=parent_token.child())
+        buffers[index] = buffer
+        worker = threading.Thread(
+            target=synthesize_chunk,
+            args=(chunks[index], buffer),
+            name=f"tts-prefetch-{index}",
+            daemon=True
+        )
+        worker.start()
+
+    try:
+        for index in range(min(len(chunks), lookahead + 1)):
+            start(index)
+
+        for index in range(len(chunks)):
+            start(index)
+            if index not in buffers:
+                return  # Cancelled before this chunk could start
+            print(f"🎵 Pipelined chunk {index + 1}/{len(chunks)}: '{chunks[index].text[:30]}...'")
+            yield from buffers[index].drain(chunk_timeout)
+            del buffers[index]
+
+            # Keep `lookahead` chunks in flight beyond the one being played
+            start(index + lookahead + 1)
+    finally:
+        # Consumer finished or disconnected: stop any outstanding prefetches
+        for buffer in buffers.values():
+            buffer.cancel()
@@ -18,7 +18,9 @@ class HumeProvider(TTSProvider):
         from hume import HumeClient
         from hume.tts import PostedUtterance, FormatMp3
         
-        self.client = HumeClient(api_key=api_key)
+        # base_url points the client at a stand-in (e.g. tts/mock_server.py)
+        base_url = kwargs.get('base_url')
+        self.client = HumeClient(api_key=api_key, base_url=base_url) if base_url else HumeClient(api_key=api_key)
         self.PostedUtterance = PostedUtterance
         self.FormatMp3 = FormatMp3
     
@@ -129,9 +131,5 @@ class HumeProvider(TTSProvider):
         
         return True, ""
     
-    # Synchronous methods for compatibility with Flask
-    def synthesize_sync(self, text: str, voice_id: str, **options) -> bytes:
-        """Synchronous synthesis"""
-        return asyncio.run(self.synthesize(text, voice_id, **options))
-    
-    # Remove custom stream_sync_generator to use the improved base class implementation
+    # Remove custom synthesize_sync / stream_sync_generator to use the base class
+    # implementations, which run on the shared background event loop
@@ -0,0 +1,253 @@
+"""
+Mock TTS Provider
+Deterministic, network-free stand-in for load testing and CI
+
+Produces valid (silent) MPEG-1 Layer III frames whose duration tracks the
+text length, delivered with a configurable time-to-first-byte, throughput,
+jitter and error rate. The same timing profile drives tts/mock_server.py,
+which mimics the Unreal Speech and Hume HTTP APIs.
+"""
+
+import asyncio
+import random
+import threading
+from typing import AsyncGenerator, Dict, List, Tuple
+from ..base import TTSProvider
+
+# MPEG-1 Layer III bitrate indices at 48 kHz (frame size = 144 * bitrate / 48000)
+_BITRATE_INDEX = {32: 1, 64: 5, 96: 7, 128: 9, 160: 10, 192: 11, 256: 13, 320: 14}
+_SAMPLE_RATE = 48000
+_SAMPLES_PER_FRAME = 1152
+
+
+class MockTTSError(Exception):
+    """Injected synthesis failure"""
+
+
+def mp3_frame(bitrate_kbps: int = 128) -> bytes:
+    """
+    Build one silent MPEG-1 Layer III frame (mono, 48 kHz, no CRC)
+
+    Zeroed side information decodes as 24ms of silence in every player.
+    """
+    if bitrate_kbps not in _BITRATE_INDEX:
+        raise ValueError(f"Unsupported bitrate {bitrate_kbps}kbps. Choose from {sorted(_BITRATE_INDEX)}")
+    header = bytes([0xFF, 0xFB, (_BITRATE_INDEX[bitrate_kbps] << 4) | 0x04, 0xC0])
+    frame_size = 144 * bitrate_kbps * 1000 // _SAMPLE_RATE
+    return header + bytes(frame_size - len(header))
+
+
+def parse_bitrate(value, default: int = 128) -> int:
+    """Parse '192k' / 192 style bitrates, snapping to the nearest supported value"""
+    try:
+        kbps = int(str(value).lower().rstrip('k'))
+    except (TypeError, ValueError):
+        return default
+    return min(_BITRATE_INDEX, key=lambda supported: abs(supported - kbps))
+
+
+class MockStreamProfile:
+    """
+    Timing and failure behaviour shared by the mock provider and mock server
+
+    Args:
+        ttfb_ms: Delay before the first audio chunk
+        throughput_kbps: Delivery rate in kilobytes per second (0 = unthrottled)
+        jitter_ms: Uniform +/- jitter added to the first byte and every chunk
+        error_rate: Probability (0-1) that a request fails before any audio
+        chars_per_second: Speaking rate used to size the audio
+        chunk_bytes: Size of each streamed chunk
+        seed: Seed for the jitter/error sequence, so runs are reproducible
+    """
+
+    def __init__(self, ttfb_ms: float = 150, throughput_kbps: float = 64, jitter_ms: float = 0,
+                 error_rate: float = 0.0, chars_per_second: float = 15, chunk_bytes: int = 1024,
+                 seed: int = 0):
+        self.ttfb_ms = float(ttfb_ms)
+        self.throughput_kbps = float(throughput_kbps)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.chars_per_second = float(chars_per_second)
+        self.chunk_bytes = int(chunk_bytes)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _jitter(self) -> float:
+        if not self.jitter_ms:
+            return 0.0
+        with self._lock:
+            return self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+
+    def should_fail(self) -> bool:
+        """Draw from the error sequence for a new request"""
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def duration_ms(self, text: str) -> float:
+        """Spoken duration of text at the configured rate"""
+        return max(len(text), 1) / self.chars_per_second * 1000
+
+    def audio_for(self, text: str, bitrate_kbps: int = 128) -> bytes:
+        """Silent MP3 lasting as long as text takes to speak"""
+        frame_count = max(1, int(self.duration_ms(text) / 1000 * _SAMPLE_RATE / _SAMPLES_PER_FRAME))
+        return mp3_frame(bitrate_kbps) * frame_count
+
+    def first_byte_delay(self) -> float:
+        """Seconds to wait before the first chunk"""
+        return max(0.0, self.ttfb_ms + self._jitter()) / 1000
+
+    def chunk_delay(self, size: int) -> float:
+        """Seconds to wait before sending a follow-up chunk of size bytes"""
+        base_ms = size / (self.throughput_kbps * 1024) * 1000 if self.throughput_kbps > 0 else 0.0
+        return max(0.0, base_ms + self._jitter()) / 1000
+
+    def chunks(self, audio: bytes) -> List[bytes]:
+        return [audio[i:i + self.chunk_bytes] for i in range(0, len(audio), self.chunk_bytes)]
+
+    def word_timestamps(self, text: str) -> List[Dict]:
+        """Evenly paced word timings (ms) matching the generated audio"""
+        words = text.split()
+        total_chars = sum(len(word) + 1 for word in words) or 1
+        per_char = self.duration_ms(text) / total_chars
+        timings = []
+        position = 0.0
+        for word in words:
+            end = position + (len(word) + 1) * per_char
+            timings.append({'word': word, 'start': round(position), 'end': round(end)})
+            position = end
+        return timings
+
+    def get_config(self) -> Dict:
+        return {
+            'ttfb_ms': self.ttfb_ms,
+            'throughput_kbps': self.throughput_kbps,
+            'jitter_ms': self.jitter_ms,
+            'error_rate': self.error_rate,
+            'chars_per_second': self.chars_per_second,
+            'chunk_bytes': self.chunk_bytes
+        }
+
+
+class MockTTSProvider(TTSProvider):
+    """Offline TTS provider that streams silent MP3 audio on a simulated schedule"""
+
+    def __init__(self, api_key: str = "mock", **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.default_voice = kwargs.get('default_voice', 'mock_voice')
+        self.default_bitrate = parse_bitrate(kwargs.get('bitrate', '128k'))
+        self.profile = MockStreamProfile(
+            ttfb_ms=kwargs.get('ttfb_ms', 150),
+            throughput_kbps=kwargs.get('throughput_kbps', 64),
+            jitter_ms=kwargs.get('jitter_ms', 0),
+            error_rate=kwargs.get('error_rate', 0.0),
+            chars_per_second=kwargs.get('chars_per_second', 15),
+            chunk_bytes=kwargs.get('chunk_bytes', 1024),
+            seed=kwargs.get('seed', 0)
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'chars': 0, 'bytes': 0}
+
+    def _start_request(self, text: str, voice_id: str, options: Dict) -> bytes:
+        is_valid, error_msg = self.validate_text(text)
+        if not is_valid:
+            raise ValueError(error_msg)
+
+        failed = self.profile.should_fail()
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats['chars'] += len(text)
+            if failed:
+                self._stats['errors'] += 1
+        if failed:
+            raise MockTTSError("Mock TTS injected failure")
+
+        audio = self.profile.audio_for(text, parse_bitrate(options.get('bitrate'), self.default_bitrate))
+        with self._stats_lock:
+            self._stats['bytes'] += len(audio)
+        return audio
+
+    async def synthesize(self, text: str, voice_id: str, **options) -> bytes:
+        """
+        Synthesize text to audio (non-streaming)
+
+        Args:
+            text: Text to synthesize
+            voice_id: Voice identifier (ignored)
+            **options: bitrate
+
+        Returns:
+            Complete MP3 audio as bytes
+        """
+        chunks = []
+        async for chunk in self.stream(text, voice_id, **options):
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    async def stream(self, text: str, voice_id: str, **options) -> AsyncGenerator[bytes, None]:
+        """
+        Stream MP3 chunks on the configured schedule
+
+        Args:
+            text: Text to synthesize
+            voice_id: Voice identifier (ignored)
+            **options: bitrate
+
+        Yields:
+            Audio data chunks as bytes
+        """
+        async for frame in self.stream_with_timestamps(text, voice_id, **options):
+            if frame['type'] == 'audio':
+                yield frame['data']
+
+    @property
+    def supports_timestamps(self) -> bool:
+        return True
+
+    async def stream_with_timestamps(self, text: str, voice_id: str, **options) -> AsyncGenerator[Dict, None]:
+        """
+        Stream audio with evenly paced word timings (Unreal Speech frame format)
+
+        Yields:
+            {'type': 'audio', 'data': bytes} and
+            {'type': 'timestamps', 'words': [{'word', 'start', 'end'}, ...]} frames
+        """
+        audio = self._start_request(text, voice_id, options)
+        await asyncio.sleep(self.profile.first_byte_delay())
+
+        words = self.profile.word_timestamps(text)
+        if words:
+            yield {'type': 'timestamps', 'words': words}
+
+        for index, chunk in enumerate(self.profile.chunks(audio)):
+            if index:
+                await asyncio.sleep(self.profile.chunk_delay(len(chunk)))
+            yield {'type': 'audio', 'data': chunk}
+
+    def get_voices(self) -> List[Dict]:
+        """Get available voices"""
+        return [
+            {
+                'id': self.default_voice,
+                'name': 'Mock Voice',
+                'gender': 'neutral',
+                'language': 'en-US',
+                'description': 'Silent audio for offline testing'
+            }
+        ]
+
+    def validate_text(self, text: str) -> Tuple[bool, str]:
+        """Validate text for synthesis"""
+        if not text or not text.strip():
+            return False, "Text cannot be empty"
+        if len(text) > 1000:
+            return False, f"Text too long ({len(text)} chars). Maximum is 1000 characters"
+        return True, ""
+
+    def get_pool_stats(self) -> Dict:
+        """Request counters and the active timing profile"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['profile'] = self.profile.get_config()
+        return stats
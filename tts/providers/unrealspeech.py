@@ -6,18 +6,62 @@ High-performance streaming TTS with low latency
 import requests
 import asyncio
 import aiohttp
-from typing import AsyncGenerator, Dict, List, Tuple
+import json
+import threading
+import time
+import weakref
+from requests.adapters import HTTPAdapter
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
 from ..base import TTSProvider
+from ..cancellation import current_token
 
 class UnrealSpeechProvider(TTSProvider):
     """Unreal Speech TTS provider with streaming support"""
     
     def __init__(self, api_key: str, **kwargs):
         super().__init__(api_key, **kwargs)
-        self.base_url = "https://api.v8.unrealspeech.com"
+        self.base_url = kwargs.get('base_url', "https://api.v8.unrealspeech.com").rstrip('/')
         self.default_voice = kwargs.get('default_voice', 'af_sky')
         self.default_bitrate = kwargs.get('bitrate', '192k')
         
+        # Connection pool configuration (shared by the sync and async paths)
+        self.pool_limit = int(kwargs.get('pool_limit', 20))
+        self.pool_limit_per_host = int(kwargs.get('pool_limit_per_host', 10))
+        self.keepalive_timeout = float(kwargs.get('keepalive_timeout', 30))
+        self.dns_cache_ttl = int(kwargs.get('dns_cache_ttl', 300))
+        
+        # Long-lived requests session used by the Flask (sync) code paths
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,  # Only one host is ever contacted
+            pool_maxsize=self.pool_limit_per_host,
+            pool_block=False
+        )
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
+        
+        # aiohttp sessions are bound to an event loop, so keep one per loop
+        self._aio_sessions = weakref.WeakKeyDictionary()
+        
+        # Idle streamWithTimestamps WebSockets, kept open for reuse (per loop)
+        self.ws_url = kwargs.get('ws_url', "wss://api.v8.unrealspeech.com/streamWithTimestamps")
+        self.ws_pool_size = int(kwargs.get('ws_pool_size', 4))
+        self.ws_heartbeat = float(kwargs.get('ws_heartbeat', 15))
+        self._idle_ws = weakref.WeakKeyDictionary()
+        self._closed = False
+        
+        # Pool hit/miss accounting (a "miss" pays for a new TCP+TLS handshake)
+        self._stats_lock = threading.Lock()
+        self._pool_stats = {
+            'hits': 0,
+            'misses': 0,
+            'ttfa_hit_ms_total': 0.0,
+            'ttfa_miss_ms_total': 0.0,
+            'sessions_created': 1,
+            'ws_connects': 0,
+            'ws_reuses': 0
+        }
+        
         # Voice mapping from provider format to internal format
         self._voice_map = {
             'friendly_casual': 'af_sky',
@@ -81,6 +125,196 @@ class UnrealSpeechProvider(TTSProvider):
             'Haruto': 'Haruto',
         }
     
+    def _build_payload(self, text: str, voice_id: str, options: Dict) -> Dict:
+        """Build the /stream request payload shared by all synthesis paths"""
+        # Map voice ID if needed
+        actual_voice_id = self._voice_map.get(voice_id, voice_id)
+        
+        return {
+            'Text': text,
+            'VoiceId': actual_voice_id,
+            'Bitrate': options.get('bitrate', self.default_bitrate),
+            'Speed': str(options.get('speed', '0')),
+            'Pitch': str(options.get('pitch', '1')),
+            'Codec': 'libmp3lame',
+            'Temperature': float(options.get('temperature', 0.25))  # UnrealSpeech DOES support temperature (0.1 to 0.8)
+        }
+    
+    def _build_headers(self) -> Dict[str, str]:
+        """Build request headers"""
+        return {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+    
+    # ------------------------------------------------------------------
+    # Connection pooling
+    # ------------------------------------------------------------------
+    
+    async def _get_aio_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled aiohttp session for the running event loop
+        
+        Returns:
+            A long-lived ClientSession with keep-alive and DNS caching enabled
+        """
+        if self._closed:
+            raise RuntimeError("UnrealSpeechProvider has been closed")
+        
+        loop = asyncio.get_running_loop()
+        session = self._aio_sessions.get(loop)
+        if session is not None and not session.closed:
+            return session
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_reuseconn.append(self._on_aio_connection_reused)
+        trace_config.on_connection_create_end.append(self._on_aio_connection_created)
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_limit,
+            limit_per_host=self.pool_limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self._build_headers(),
+            timeout=aiohttp.ClientTimeout(sock_connect=5, sock_read=30),
+            trace_configs=[trace_config]
+        )
+        self._aio_sessions[loop] = session
+        with self._stats_lock:
+            self._pool_stats['sessions_created'] += 1
+        return session
+    
+    async def _on_aio_connection_reused(self, session, ctx, params):
+        """aiohttp trace hook: a pooled connection was reused"""
+        if isinstance(ctx.trace_request_ctx, dict):
+            ctx.trace_request_ctx['pool_hit'] = True
+    
+    async def _on_aio_connection_created(self, session, ctx, params):
+        """aiohttp trace hook: a new connection (and handshake) was made"""
+        if isinstance(ctx.trace_request_ctx, dict):
+            ctx.trace_request_ctx['pool_hit'] = False
+    
+    async def _acquire_ws(self) -> Tuple[aiohttp.ClientWebSocketResponse, bool]:
+        """
+        Get an open streamWithTimestamps WebSocket for the running loop
+        
+        Returns:
+            Tuple of (websocket, reused) where reused is True for a pooled socket
+        """
+        idle = self._idle_ws.setdefault(asyncio.get_running_loop(), [])
+        while idle:
+            ws = idle.pop()
+            if not ws.closed:
+                with self._stats_lock:
+                    self._pool_stats['ws_reuses'] += 1
+                return ws, True
+        
+        session = await self._get_aio_session()
+        ws = await session.ws_connect(self.ws_url, heartbeat=self.ws_heartbeat)
+        with self._stats_lock:
+            self._pool_stats['ws_connects'] += 1
+        return ws, False
+    
+    async def _release_ws(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Return a WebSocket that finished cleanly to the idle pool"""
+        idle = self._idle_ws.setdefault(asyncio.get_running_loop(), [])
+        if ws.closed or self._closed or len(idle) >= self.ws_pool_size:
+            await ws.close()
+        else:
+            idle.append(ws)
+    
+    def _record_pool_usage(self, hit: bool, ttfa_ms: Optional[float]) -> None:
+        """Record whether a request reused a pooled connection"""
+        with self._stats_lock:
+            if hit:
+                self._pool_stats['hits'] += 1
+                if ttfa_ms is not None:
+                    self._pool_stats['ttfa_hit_ms_total'] += ttfa_ms
+            else:
+                self._pool_stats['misses'] += 1
+                if ttfa_ms is not None:
+                    self._pool_stats['ttfa_miss_ms_total'] += ttfa_ms
+    
+    def _sync_connection_count(self, url: str) -> int:
+        """Number of connections the urllib3 pool for url has opened so far"""
+        try:
+            adapter = self._http.get_adapter(url)
+            pool = adapter.poolmanager.connection_from_url(url)
+            return pool.num_connections
+        except Exception:
+            return 0
+    
+    def get_pool_stats(self) -> Dict:
+        """
+        Get connection pool statistics
+        
+        Returns:
+            Dictionary with pool hit/miss counts, hit rate and the average
+            time-to-first-audio for reused vs. freshly handshaken connections
+        """
+        with self._stats_lock:
+            stats = dict(self._pool_stats)
+        
+        total = stats['hits'] + stats['misses']
+        return {
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'hit_rate': stats['hits'] / total if total else 0.0,
+            'avg_ttfa_hit_ms': stats['ttfa_hit_ms_total'] / stats['hits'] if stats['hits'] else None,
+            'avg_ttfa_miss_ms': stats['ttfa_miss_ms_total'] / stats['misses'] if stats['misses'] else None,
+            'sessions_created': stats['sessions_created'],
+            'ws_connects': stats['ws_connects'],
+            'ws_reuses': stats['ws_reuses'],
+            'ws_idle': sum(len(sockets) for sockets in self._idle_ws.values()),
+            'pool_limit': self.pool_limit,
+            'pool_limit_per_host': self.pool_limit_per_host,
+            'keepalive_timeout': self.keepalive_timeout,
+            'dns_cache_ttl': self.dns_cache_ttl
+        }
+    
+    async def aclose(self) -> None:
+        """Close the pooled aiohttp session (and idle WebSockets) bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        await self._close_loop_resources(self._idle_ws.pop(loop, []), self._aio_sessions.pop(loop, None))
+    
+    @staticmethod
+    async def _close_loop_resources(sockets, session) -> None:
+        for ws in sockets:
+            await ws.close()
+        if session is not None and not session.closed:
+            await session.close()
+    
+    def close(self) -> None:
+        """Close all pooled connections (called when the provider shuts down)"""
+        if self._closed:
+            return
+        self._closed = True
+        
+        for loop in set(self._aio_sessions.keys()) | set(self._idle_ws.keys()):
+            if loop.is_closed():
+                continue
+            closing = self._close_loop_resources(self._idle_ws.get(loop, []), self._aio_sessions.get(loop))
+            try:
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(closing, loop).result(timeout=5)
+                else:
+                    loop.run_until_complete(closing)
+            except Exception as e:
+                print(f"⚠️ Failed to close aiohttp session: {e}")
+        self._aio_sessions.clear()
+        self._idle_ws.clear()
+        
+        self._http.close()
+        print("🔌 UnrealSpeech connection pool closed")
+    
+    # ------------------------------------------------------------------
+    # Synthesis
+    # ------------------------------------------------------------------
+    
     async def synthesize(self, text: str, voice_id: str, **options) -> bytes:
         """
         Synthesize text to audio (non-streaming)
@@ -97,36 +331,23 @@ class UnrealSpeechProvider(TTSProvider):
         if not is_valid:
             raise ValueError(error_msg)
         
-        # Map voice ID if needed
-        actual_voice_id = self._voice_map.get(voice_id, voice_id)
+        payload = self._build_payload(text, voice_id, options)
+        session = await self._get_aio_session()
+        trace_ctx = {}
+        start_time = time.time()
         
-        # Prepare request
-        payload = {
-            'Text': text,
-            'VoiceId': actual_voice_id,
-            'Bitrate': options.get('bitrate', self.default_bitrate),
-            'Speed': str(options.get('speed', '0')),
-            'Pitch': str(options.get('pitch', '1')),
-            'Codec': 'libmp3lame',
-            'Temperature': float(options.get('temperature', 0.25))  # UnrealSpeech DOES support temperature (0.1 to 0.8)
-        }
-        
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/stream",
-                json=payload,
-                headers=headers
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Unreal Speech API error: {error_text}")
-                
-                return await response.read()
+        async with session.post(
+            f"{self.base_url}/stream",
+            json=payload,
+            trace_request_ctx=trace_ctx
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"Unreal Speech API error: {error_text}")
+            
+            audio = await response.read()
+            self._record_pool_usage(trace_ctx.get('pool_hit', True), (time.time() - start_time) * 1000)
+            return audio
     
     async def stream(self, text: str, voice_id: str, **options) -> AsyncGenerator[bytes, None]:
         """
@@ -144,39 +365,107 @@ class UnrealSpeechProvider(TTSProvider):
         if not is_valid:
             raise ValueError(error_msg)
         
-        # Map voice ID if needed
-        actual_voice_id = self._voice_map.get(voice_id, voice_id)
+        payload = self._build_payload(text, voice_id, options)
+        session = await self._get_aio_session()
+        trace_ctx = {}
+        start_time = time.time()
+        first_chunk = True
         
-        # Prepare request
-        payload = {
-            'Text': text,
-            'VoiceId': actual_voice_id,
-            'Bitrate': options.get('bitrate', self.default_bitrate),
-            'Speed': str(options.get('speed', '0')),
-            'Pitch': str(options.get('pitch', '1')),
-            'Codec': 'libmp3lame',
-            'Temperature': float(options.get('temperature', 0.25))  # UnrealSpeech DOES support temperature (0.1 to 0.8)
-        }
+        async with session.post(
+            f"{self.base_url}/stream",
+            json=payload,
+            trace_request_ctx=trace_ctx
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"Unreal Speech API error: {error_text}")
+            
+            # Stream chunks as they arrive
+            async for chunk in response.content.iter_chunked(1024):
+                if chunk:
+                    if first_chunk:
+                        self._record_pool_usage(trace_ctx.get('pool_hit', True), (time.time() - start_time) * 1000)
+                        first_chunk = False
+                    yield chunk
+    
+    @property
+    def supports_timestamps(self) -> bool:
+        return True
+    
+    async def stream_with_timestamps(self, text: str, voice_id: str, **options) -> AsyncGenerator[Dict, None]:
+        """
+        Stream audio with per-word timings over a pooled streamWithTimestamps WebSocket
         
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
+        Sockets that complete cleanly go back to the idle pool; a pooled
+        socket that turns out to be stale is replaced once transparently.
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/stream",
-                json=payload,
-                headers=headers
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Unreal Speech API error: {error_text}")
+        Args:
+            text: Text to synthesize
+            voice_id: Voice identifier
+            **options: speed, pitch, bitrate, etc.
+            
+        Yields:
+            {'type': 'audio', 'data': bytes} and
+            {'type': 'timestamps', 'words': [{'word', 'start', 'end'}, ...]} frames
+        """
+        is_valid, error_msg = self.validate_text(text)
+        if not is_valid:
+            raise ValueError(error_msg)
+        
+        payload = self._build_payload(text, voice_id, options)
+        payload['Authorization'] = f'Bearer {self.api_key}'
+        
+        for attempt in range(2):
+            ws, reused = await self._acquire_ws()
+            start_time = time.time()
+            received = False
+            completed = False
+            try:
+                try:
+                    await ws.send_json(payload)
+                except (aiohttp.ClientError, ConnectionError, RuntimeError):
+                    if reused:
+                        continue  # Stale pooled socket: retry on a fresh one
+                    raise
                 
-                # Stream chunks as they arrive
-                async for chunk in response.content.iter_chunked(1024):
-                    if chunk:
-                        yield chunk
+                async for message in ws:
+                    if message.type == aiohttp.WSMsgType.BINARY:
+                        if not received:
+                            self._record_pool_usage(reused, (time.time() - start_time) * 1000)
+                            received = True
+                        yield {'type': 'audio', 'data': message.data}
+                    
+                    elif message.type == aiohttp.WSMsgType.TEXT:
+                        data = json.loads(message.data)
+                        kind = data.get('type')
+                        if kind == 'progress' and isinstance(data.get('message'), list):
+                            words = [
+                                {'word': ts['word'], 'start': ts.get('start', 0), 'end': ts.get('end')}
+                                for ts in data['message'] if ts and 'word' in ts
+                            ]
+                            if words:
+                                received = True
+                                yield {'type': 'timestamps', 'words': words}
+                        elif kind == 'complete':
+                            completed = True
+                            break
+                        elif kind == 'error':
+                            raise Exception(f"Unreal Speech WebSocket error: {data.get('message', 'Unknown error')}")
+                    
+                    elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+                
+                if completed:
+                    return
+                if reused and not received and attempt == 0:
+                    continue  # Pooled socket was closed by the server before answering
+                raise Exception("Unreal Speech WebSocket closed before the stream completed")
+            finally:
+                # Only sockets that finished a request cleanly are safe to reuse
+                if completed:
+                    await self._release_ws(ws)
+                else:
+                    await ws.close()
     
     def get_voices(self) -> List[Dict]:
         """Get available Unreal Speech voices"""
@@ -273,51 +562,74 @@ class UnrealSpeechProvider(TTSProvider):
     
     # Synchronous methods for compatibility with Flask
     def synthesize_sync(self, text: str, voice_id: str, **options) -> bytes:
-        """Synchronous synthesis"""
-        return asyncio.run(self.synthesize(text, voice_id, **options))
+        """Synchronous synthesis over the pooled requests session"""
+        is_valid, error_msg = self.validate_text(text)
+        if not is_valid:
+            raise ValueError(error_msg)
+        
+        token = current_token()
+        if token is not None:
+            if token.cancelled:
+                raise Exception("Synthesis cancelled before the request was sent")
+            token.record_request(len(text))
+        
+        url = f"{self.base_url}/stream"
+        payload = self._build_payload(text, voice_id, options)
+        connections_before = self._sync_connection_count(url)
+        start_time = time.time()
+        
+        try:
+            response = self._http.post(
+                url,
+                json=payload,
+                headers=self._build_headers(),
+                timeout=(5, 30)  # 5s connect, 30s read timeout
+            )
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Request error: {e}")
+            raise Exception(f"Network error: {e}")
+        
+        if response.status_code != 200:
+            raise Exception(f"Unreal Speech API error: {response.text}")
+        
+        pool_hit = self._sync_connection_count(url) == connections_before
+        self._record_pool_usage(pool_hit, (time.time() - start_time) * 1000)
+        return response.content
     
     def stream_sync_generator(self, text: str, voice_id: str, **options):
         """
         Optimized synchronous streaming generator for Flask compatibility
-        Uses larger chunks for better performance and reduced latency
+        Uses larger chunks and a pooled keep-alive session for reduced latency
         """
         is_valid, error_msg = self.validate_text(text)
         if not is_valid:
             raise ValueError(error_msg)
         
-        # Map voice ID if needed
-        actual_voice_id = self._voice_map.get(voice_id, voice_id)
+        # Don't start (and bill) a request whose client has already gone
+        token = current_token()
+        if token is not None:
+            if token.cancelled:
+                return
+            token.record_request(len(text))
         
-        # Prepare request
-        payload = {
-            'Text': text,
-            'VoiceId': actual_voice_id,
-            'Bitrate': options.get('bitrate', self.default_bitrate),
-            'Speed': str(options.get('speed', '0')),
-            'Pitch': str(options.get('pitch', '1')),
-            'Codec': 'libmp3lame',
-            'Temperature': float(options.get('temperature', 0.25))  # UnrealSpeech DOES support temperature (0.1 to 0.8)
-        }
-        
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
+        url = f"{self.base_url}/stream"
+        payload = self._build_payload(text, voice_id, options)
         
-        print(f"🌊 Optimized Streaming: '{text[:50]}...' with voice {actual_voice_id}")
+        print(f"🌊 Optimized Streaming: '{text[:50]}...' with voice {payload['VoiceId']}")
         
         try:
-            import time
             start_time = time.time()
+            connections_before = self._sync_connection_count(url)
             
-            # Use requests with streaming enabled
-            response = requests.post(
-                f"{self.base_url}/stream",
+            # Use the pooled session with streaming enabled
+            response = self._http.post(
+                url,
                 json=payload,
-                headers=headers,
+                headers=self._build_headers(),
                 stream=True,  # Enable streaming
                 timeout=(5, 30)  # 5s connect, 30s read timeout
             )
+            pool_hit = self._sync_connection_count(url) == connections_before
             
             if response.status_code != 200:
                 error_text = response.text
@@ -331,18 +643,34 @@ class UnrealSpeechProvider(TTSProvider):
             # Use much larger chunks for better performance (16KB instead of 1KB)
             OPTIMIZED_CHUNK_SIZE = 16384  # 16KB chunks
             
-            # Stream chunks as they arrive
-            for chunk in response.iter_content(chunk_size=OPTIMIZED_CHUNK_SIZE):
-                if chunk:
-                    chunk_count += 1
-                    total_bytes += len(chunk)
-                    
-                    if first_chunk:
-                        latency = (time.time() - start_time) * 1000
-                        print(f"⚡ First chunk in {latency:.0f}ms")
-                        first_chunk = False
-                    
-                    yield chunk
+            # A cancel from another thread closes the upstream connection,
+            # which interrupts a blocking read immediately
+            remove_callback = token.add_callback(response.close) if token is not None else None
+            
+            try:
+                # Stream chunks as they arrive
+                for chunk in response.iter_content(chunk_size=OPTIMIZED_CHUNK_SIZE):
+                    if chunk:
+                        chunk_count += 1
+                        total_bytes += len(chunk)
+                        
+                        if first_chunk:
+                            latency = (time.time() - start_time) * 1000
+                            self._record_pool_usage(pool_hit, latency)
+                            print(f"⚡ First chunk in {latency:.0f}ms ({'pooled' if pool_hit else 'new'} connection)")
+                            first_chunk = False
+                        
+                        yield chunk
+            except Exception:
+                if token is not None and token.cancelled:
+                    print(f"🛑 Upstream stream closed: {token.reason}")
+                    return
+                raise
+            finally:
+                if remove_callback is not None:
+                    remove_callback()
+                # Return the connection to the pool (or drop it if the body was not fully read)
+                response.close()
             
             total_time = (time.time() - start_time) * 1000
             print(f"✅ Optimized stream: {chunk_count} chunks, {total_bytes} bytes in {total_time:.0f}ms")
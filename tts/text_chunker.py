@@ -4,7 +4,7 @@ Intelligently splits text into chunks while preserving natural speech boundaries
 """
 
 import re
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 from dataclasses import dataclass
 
 @dataclass
@@ -129,6 +129,52 @@ class SmartTextChunker:
         
         return chunks
     
+    def split_sentences(self, text: str, min_sentence_length: int = 12) -> List[str]:
+        """
+        Split text into sentence-sized units (each within max_chunk_size)
+        
+        Used by the audio cache so answers that share sentences can reuse
+        previously synthesized audio. Very short fragments are merged with
+        the following sentence to avoid tiny synthesis requests.
+        
+        Args:
+            text: Text to split
+            min_sentence_length: Fragments shorter than this are merged forward
+            
+        Returns:
+            List of sentence strings
+        """
+        if not text or not text.strip():
+            return []
+        
+        sentences = []
+        pending = ""
+        for part in re.split(r'(?<=[.!?])\s+', text.strip()):
+            part = part.strip()
+            if not part:
+                continue
+            
+            if pending:
+                part = f"{pending} {part}"
+                pending = ""
+            
+            if len(part) < min_sentence_length:
+                pending = part
+                continue
+            
+            if len(part) > self.max_chunk_size:
+                sentences.extend(chunk.text for chunk in self.chunk_text(part))
+            else:
+                sentences.append(part)
+        
+        if pending:
+            if sentences and len(sentences[-1]) + len(pending) + 1 <= self.max_chunk_size:
+                sentences[-1] = f"{sentences[-1]} {pending}"
+            else:
+                sentences.append(pending)
+        
+        return sentences
+    
     def _find_best_split(self, text: str, max_size: int) -> Tuple[str, int]:
         """
         Find the best split point in the text that respects natural boundaries
@@ -206,6 +252,176 @@ class SmartTextChunker:
             'max_chunk_size_used': max(len(chunk.text) for chunk in chunks) if chunks else 0
         }
 
+
+class IncrementalTextChunker:
+    """
+    Chunks streaming text (e.g. LLM token deltas) as it arrives
+
+    A sentence boundary is only confirmed once whitespace follows the
+    punctuation, so "3.14" or "Dr. Smith" arriving token by token is not
+    split early. Later chunks merge short sentences up to min_chunk_size;
+    the first chunk is released as soon as a short sentence (or, failing
+    that, a clause) is available so TTS can start before the LLM finishes.
+    """
+
+    # Words whose trailing period does not end a sentence
+    ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'e.g', 'i.e', 'etc', 'approx'}
+
+    def __init__(self, max_chunk_size: int = 995, min_chunk_size: int = 40,
+                 first_chunk_min_size: int = 8, first_chunk_max_wait: int = 80):
+        """
+        Initialize the incremental chunker
+
+        Args:
+            max_chunk_size: Maximum characters per chunk
+            min_chunk_size: Sentences are merged until a chunk reaches this size
+            first_chunk_min_size: Minimum size of the first chunk ("first chunk fast")
+            first_chunk_max_wait: Characters to buffer before the first chunk is
+                released at a clause/phrase/word boundary if no sentence has ended
+        """
+        self._chunker = SmartTextChunker(max_chunk_size)
+        self.max_chunk_size = max_chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.first_chunk_min_size = first_chunk_min_size
+        self.first_chunk_max_wait = first_chunk_max_wait
+
+        self._confirmed_sentence = re.compile(r'[.!?]+["\')\]]*\s+')
+        self._clause_boundary = re.compile(r'[;:,]\s+')
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard buffered text and start a new stream"""
+        self._buffer = ""
+        self._position = 0
+        self._index = 0
+
+    @property
+    def buffered_text(self) -> str:
+        """Text received but not yet emitted"""
+        return self._buffer
+
+    def feed(self, delta: str) -> List[TextChunk]:
+        """
+        Add a text delta and return any chunks that are now ready
+
+        Args:
+            delta: Newly received text
+
+        Returns:
+            List of TextChunk objects ready for synthesis (possibly empty)
+        """
+        if delta:
+            self._buffer += delta
+        return self._drain(final=False)
+
+    def flush(self) -> List[TextChunk]:
+        """
+        Emit all remaining text once the stream has ended
+
+        Returns:
+            List of remaining TextChunk objects; the last one is marked final
+        """
+        chunks = self._drain(final=True)
+        if chunks:
+            chunks[-1].is_final = True
+        self.reset()
+        return chunks
+
+    def iter_chunks(self, deltas: Iterable[str]) -> Iterator[TextChunk]:
+        """
+        Chunk an iterable of text deltas
+
+        Args:
+            deltas: Text deltas in arrival order
+
+        Yields:
+            TextChunk objects as soon as each one is ready
+        """
+        for delta in deltas:
+            yield from self.feed(delta)
+        yield from self.flush()
+
+    def _drain(self, final: bool) -> List[TextChunk]:
+        chunks = []
+        while True:
+            split_position = self._next_split(final)
+            if split_position is None:
+                break
+
+            chunk_text = self._buffer[:split_position]
+            stripped = chunk_text.strip()
+            if stripped:
+                leading = len(chunk_text) - len(chunk_text.lstrip())
+                chunks.append(TextChunk(
+                    text=stripped,
+                    index=self._index,
+                    is_final=False,
+                    original_start=self._position + leading,
+                    original_end=self._position + leading + len(stripped)
+                ))
+                self._index += 1
+
+            self._buffer = self._buffer[split_position:]
+            self._position += split_position
+        return chunks
+
+    def _next_split(self, final: bool):
+        """Find where the next ready chunk ends in the buffer, or None"""
+        text = self._buffer
+        if not text.strip():
+            return None
+
+        first_chunk = self._index == 0
+        min_size = self.first_chunk_min_size if first_chunk else self.min_chunk_size
+
+        # Confirmed sentence boundaries, earliest first
+        for match in self._confirmed_sentence.finditer(text):
+            if match.end() > self.max_chunk_size:
+                break
+            candidate = text[:match.end()].strip()
+            if len(candidate) >= min_size and not self._ends_with_abbreviation(candidate):
+                return match.end()
+
+        # First chunk fast: no sentence yet, release at the best clause/phrase/word boundary
+        if first_chunk and len(text) >= self.first_chunk_max_wait:
+            split_position = self._find_early_split(text)
+            if split_position:
+                return split_position
+
+        # Buffer is over the limit with no sentence boundary: use the regular preferences
+        if len(text) > self.max_chunk_size:
+            _, split_position = self._chunker._find_best_split(text, self.max_chunk_size)
+            return split_position
+
+        if final:
+            return len(text)
+        return None
+
+    def _find_early_split(self, text: str):
+        """Latest clause, phrase or word boundary past first_chunk_min_size"""
+        limit = min(len(text), self.max_chunk_size)
+
+        matches = [m for m in self._clause_boundary.finditer(text, 0, limit)
+                   if m.end() >= self.first_chunk_min_size]
+        if matches:
+            return matches[-1].end()
+
+        for pattern in self._chunker.phrase_boundaries:
+            matches = [m for m in re.finditer(pattern, text[:limit], re.IGNORECASE)
+                       if m.start() >= self.first_chunk_min_size]
+            if matches:
+                return matches[-1].start()
+
+        matches = [m for m in re.finditer(self._chunker.word_boundary, text[:limit])
+                   if m.start() >= self.first_chunk_min_size]
+        if matches:
+            return matches[-1].start()
+        return None
+
+    def _ends_with_abbreviation(self, candidate: str) -> bool:
+        last_word = candidate.split()[-1].rstrip('"\')]').rstrip('.').lower()
+        return last_word in self.ABBREVIATIONS
+
 # Convenience function for quick chunking
 def chunk_text_for_tts(text: str, max_chunk_size: int = 995) -> List[str]:
     """